@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from pyfunct.browsers import BaseBrowserDriver, element_action
+
+
+class StubBrowserDriver(BaseBrowserDriver):
+    """
+        A browser driver that does nothing, returning right away from every
+        call, so benchmarks only measure pyfunct's own overhead.
+    """
+
+    driver_name = 'benchmark_stub'
+
+    #: What every finder returns.
+    element = ['element']
+
+    @property
+    def page_url(self):
+        return 'http://localhost/'
+
+    @property
+    def page_title(self):
+        return ''
+
+    def open_url(self, url):
+        pass
+
+    def reload(self):
+        pass
+
+    def close(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def clear_session(self):
+        pass
+
+    def wait_pageload(self, timeout=30):
+        pass
+
+    def is_element_visible(self, element):
+        return True
+
+    def get_element_text(self, element):
+        return ''
+
+    def execute_javascript(self, script):
+        return None
+
+    def get_element_by_xpath(self, selector):
+        return self.element
+
+    def get_element_by_css(self, selector):
+        return self.element
+
+    def get_element_by_id(self, selector):
+        return self.element
+
+    def get_element_by_tag(self, selector):
+        return self.element
+
+    def get_element_by_text(self, selector):
+        return self.element
+
+    def get_element_by_name(self, selector):
+        return self.element
+
+    @element_action
+    def click(self, element):
+        pass
+
+    @element_action
+    def fill(self, element, text):
+        pass
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+    Measures the overhead of pyfunct itself, running the benchmark scenarios
+    against a browser driver that does nothing. For example::
+
+        python -m benchmarks.run --output before.json
+        python -m benchmarks.run --compare before.json
+
+    Results are written as JSON, with the time per call of each scenario in
+    seconds, so runs can be compared.
+"""
+
+import sys
+import json
+import platform
+import argparse
+from timeit import default_timer
+
+from benchmarks.scenarios import SCENARIOS
+
+
+def time_scenario(name, number=10000, repeat=5):
+    """
+        Times the operation of a scenario `repeat` times, calling it `number`
+        times on each of them. Returns a dict with the best and the median
+        time per call, in seconds.
+    """
+    scenario = SCENARIOS[name]()
+    operation = next(scenario)
+    timings = []
+    try:
+        for _ in range(repeat):
+            start = default_timer()
+            for _ in range(number):
+                operation()
+            timings.append((default_timer() - start) / number)
+    finally:
+        scenario.close()
+
+    timings.sort()
+    return {
+        'number': number,
+        'repeat': repeat,
+        'best': timings[0],
+        'median': timings[len(timings) // 2],
+    }
+
+
+def run_benchmarks(names=None, number=10000, repeat=5):
+    """
+        Runs the given scenarios, or all of them, returning the results
+        as a dict that can be JSON encoded.
+    """
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'scenarios': dict((name, time_scenario(name, number, repeat))
+                          for name in names or SCENARIOS),
+    }
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+        Compares the best time of each scenario against the `baseline`
+        results. Returns a list of `(name, ratio, regressed)` tuples, where
+        `regressed` tells if the scenario got more than `threshold` slower.
+    """
+    comparison = []
+    for name, result in sorted(results['scenarios'].items()):
+        try:
+            baseline_best = baseline['scenarios'][name]['best']
+        except KeyError:
+            continue
+        ratio = result['best'] / baseline_best if baseline_best else 1.0
+        comparison.append((name, ratio, ratio > 1 + threshold))
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run',
+        description="Benchmarks pyfunct's own overhead.")
+    parser.add_argument('scenarios', nargs='*',
+                        help='Scenarios to run. Defaults to all of them.')
+    parser.add_argument('-n', '--number', type=int, default=10000,
+                        help='Calls per timing.')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='Timings per scenario.')
+    parser.add_argument('-o', '--output',
+                        help='Writes the results to this JSON file.')
+    parser.add_argument('-c', '--compare', metavar='BASELINE',
+                        help='Compares the results with a previous run, '
+                             'exiting with 1 if a scenario got slower.')
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+                        help='How much slower a scenario may get when '
+                             'comparing, as a fraction. Defaults to 0.1.')
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error('unknown scenarios: %s. Choose from %s.' % (
+            ', '.join(sorted(unknown)), ', '.join(SCENARIOS)))
+
+    results = run_benchmarks(args.scenarios, args.number, args.repeat)
+
+    for name, result in sorted(results['scenarios'].items()):
+        sys.stdout.write('%-32s %10.3f us/call\n' % (name,
+                                                      result['best'] * 1e6))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressed = False
+    sys.stdout.write('\nCompared to %s:\n' % args.compare)
+    for name, ratio, slower in compare(results, baseline, args.threshold):
+        regressed = regressed or slower
+        sys.stdout.write('%-32s %9.2fx%s\n' % (
+            name, ratio, '  REGRESSION' if slower else ''))
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+    Benchmark scenarios. Each scenario is a generator function that sets up
+    what it needs and yields the operation to be timed, which takes no
+    arguments. Anything after the `yield` runs once the timing is done.
+"""
+
+import unittest
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from pyfunct import FunctTestCase, Page, BaseConfig, action, config
+from pyfunct.actions import Actions
+from pyfunct.context import DefaultConfig
+
+from benchmarks.driver import StubBrowserDriver
+
+# Scenarios by name, in the order they're run. `scenario` adds them here.
+SCENARIOS = OrderedDict()
+
+# Number of elements of the benchmark page.
+PAGE_SIZE = 20
+
+
+def scenario(func):
+    """
+        Registers a benchmark scenario, named after the function.
+    """
+    SCENARIOS[func.__name__] = func
+    return func
+
+
+def page_elements_selectors(page):
+    return [('element %d' % i, '//div[@id="element-%d"]' % i, 'xpath')
+            for i in range(PAGE_SIZE)]
+
+
+class BenchmarkPage(Page):
+
+    page_name = 'benchmark page'
+
+    def get_url(self):
+        return '/'
+
+    elements_selectors = property(page_elements_selectors)
+
+
+@contextmanager
+def overridden_config(name, value):
+    """
+        Sets a `config` setting while the block runs, restoring it afterwards.
+    """
+    original = getattr(config, name)
+    setattr(config, name, value)
+    try:
+        yield
+    finally:
+        setattr(config, name, original)
+
+
+@action
+def benchmark_action(browser):
+    return browser
+
+
+def _stub_driver():
+    driver = StubBrowserDriver()
+    driver.switch_page('benchmark page')
+    return driver
+
+
+@scenario
+def actions_dispatch():
+    """
+        Gets an action through `Actions.__getattr__`.
+    """
+    actions = Actions()
+    yield lambda: actions.benchmark_action
+
+
+@scenario
+def element_action_with_element():
+    """
+        Performs an action on an element, going through `element_action`.
+    """
+    driver = _stub_driver()
+    element = driver.element
+    yield lambda: driver.click(element)
+
+
+@scenario
+def element_action_with_alias():
+    """
+        Performs an action on an element given by its alias.
+    """
+    driver = _stub_driver()
+    yield lambda: driver.click('element 10')
+
+
+@scenario
+def get_page_element():
+    """
+        Gets a page element by alias, with the element cache disabled.
+    """
+    driver = _stub_driver()
+    yield lambda: driver.get_page_element('element 10')
+
+
+@scenario
+def get_page_element_cached():
+    """
+        Gets a page element by alias from the element cache.
+    """
+    driver = _stub_driver()
+    with overridden_config('cache_page_elements', True):
+        yield lambda: driver.get_page_element('element 10')
+
+
+@scenario
+def page_registration():
+    """
+        Defines a page class with `PAGE_SIZE` elements.
+    """
+    def run():
+        type(BenchmarkPage)('RegisteredPage', (Page, ), {
+            'page_name': 'benchmark registered page',
+            'elements_selectors': property(page_elements_selectors),
+        })
+    yield run
+
+
+@scenario
+def config_propagation():
+    """
+        Defines a config class, which copies its settings to the global
+        config.
+    """
+    attributes = dict((name, value) for name, value in vars(DefaultConfig)
+                      .items() if not name.startswith('_'))
+
+    def run():
+        type(BaseConfig)('BenchmarkConfig', (BaseConfig, ), attributes)
+    yield run
+
+
+@scenario
+def testcase_setup_teardown():
+    """
+        Runs an empty `FunctTestCase` test, reusing its browser.
+    """
+    class BenchmarkTestCase(FunctTestCase):
+
+        def test_nothing(self):
+            pass
+
+    result = unittest.TestResult()
+    test = BenchmarkTestCase('test_nothing')
+    with overridden_config('default_driver_name', 'benchmark_stub'):
+        yield lambda: test.run(result)
+    BenchmarkTestCase.tearDownClass()
@@ -4,7 +4,11 @@ from pyfunct.actions import action
 from pyfunct.pages import Page
 from pyfunct.context import config, BaseConfig
 from pyfunct.case import FunctTestCase
+from pyfunct.sessions import restores_session
 from pyfunct.contrib.splinter_driver import SplinterBrowserDriver
+from pyfunct.contrib.lxml_driver import LxmlBrowserDriver
+from pyfunct.contrib.wsgi_driver import WSGIBrowserDriver
+from pyfunct.contrib.attached_driver import AttachedBrowserDriver
 
 __all__ = [
     'action',
@@ -12,5 +16,9 @@ __all__ = [
     'config',
     'BaseConfig',
     'FunctTestCase',
-    'SplinterBrowserDriver'
+    'restores_session',
+    'SplinterBrowserDriver',
+    'LxmlBrowserDriver',
+    'WSGIBrowserDriver',
+    'AttachedBrowserDriver'
 ]
@@ -1,5 +1,39 @@
 # -*- coding: utf-8 -*-
 
+import os
+import uuid
+import atexit
+import pickle
+import shutil
+import hashlib
+import tempfile
+from functools import wraps
+from collections import OrderedDict
+
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.context import config
+from pyfunct.utils import makedirs
+
+#: Scopes an action result can be cached for. `FunctTestCase` clears the
+#: `test` and `class` scopes as tests and test case classes finish. The
+#: `process` scope lasts for the whole process and the `session` one for the
+#: whole test run, being shared by all the `pyfunct.runner` workers.
+CACHE_SCOPES = ('test', 'class', 'process', 'session')
+
+# Environment variable holding the id of the current test run. It's set by
+# the process starting the run, so the processes it starts, like the
+# `pyfunct.runner` workers, share the `session` scope.
+SESSION_ID_VARIABLE = 'PYFUNCT_SESSION_ID'
+
+# Types of the arguments that can be part of a `session` scope key. Keys are
+# shared by processes, so they can't have values whose `repr` changes from one
+# process to another, like the memory address of most objects.
+STABLE_KEY_TYPES = (type(None), bool, int, float, str, type(u''))
+try:
+    STABLE_KEY_TYPES += (long, )
+except NameError:
+    pass
+
 
 class Actions(object):
     """
@@ -38,14 +72,270 @@ class Actions(object):
         cls.registered_actions[action_name] = action_fn
 
 
-def action(func):
+class ActionCache(object):
+    """
+        Keeps the results of the actions memoized through
+        `@action(cache=...)`, by scope. Each action keeps up to `maxsize`
+        results per scope, evicting the least recently used ones.
+
+        Results in the `session` scope are pickled to disk instead, in a
+        directory for the test run, so the runner workers share them. The
+        directory is removed when the process that started the run exits.
+        Results that can't be pickled aren't cached in that scope.
+    """
+
+    def __init__(self):
+        self._scopes = dict((scope, {}) for scope in CACHE_SCOPES
+                            if scope != 'session')
+
+    def _session_directory(self, action_name=None):
+        directory = os.path.join(
+            config.action_cache_dir or tempfile.gettempdir(),
+            'pyfunct-actions-%s' % session_id())
+        if action_name is None:
+            return directory
+        digest = hashlib.sha1(action_name.encode('utf-8')).hexdigest()
+        return os.path.join(directory, digest)
+
+    def _session_path(self, action_name, key):
+        directory = self._session_directory(action_name)
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return directory, os.path.join(directory, digest)
+
+    def _evict_session_results(self, directory, maxsize):
+        """
+            Removes the least recently used results of an action, from its
+            session directory, until there are at most `maxsize` left.
+        """
+        paths = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                paths.append((os.path.getmtime(path), path))
+            except OSError:
+                # Removed by another process meanwhile.
+                continue
+
+        paths.sort()
+        for _, path in paths[:max(len(paths) - maxsize, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, scope, action_name, key):
+        """
+            Returns `(True, result)` for a cached result, or `(False, None)`.
+        """
+        if scope == 'session':
+            directory, path = self._session_path(action_name, key)
+            try:
+                with open(path, 'rb') as result_file:
+                    result = pickle.load(result_file)
+            except (IOError, OSError, EOFError, pickle.UnpicklingError):
+                return False, None
+
+            # The modification time tells the most recently used results.
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            return True, result
+
+        results = self._scopes[scope].get(action_name)
+        if results is None or key not in results:
+            return False, None
+
+        # Moves it to the end, as the most recently used result.
+        result = results[key] = results.pop(key)
+        return True, result
+
+    def set(self, scope, action_name, key, result, maxsize=None):
+        if scope == 'session':
+            directory, path = self._session_path(action_name, key)
+            makedirs(directory)
+            descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+            try:
+                with os.fdopen(descriptor, 'wb') as result_file:
+                    pickle.dump(result, result_file, pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                os.remove(temporary_path)
+                return
+            os.rename(temporary_path, path)
+
+            if maxsize is not None:
+                self._evict_session_results(directory, maxsize)
+            return
+
+        results = self._scopes[scope].setdefault(action_name, OrderedDict())
+        results.pop(key, None)
+        results[key] = result
+        while maxsize is not None and len(results) > maxsize:
+            results.popitem(last=False)
+
+    def invalidate(self, scope, action_name, key=None):
+        """
+            Removes the result cached for `key`, or every result of the
+            action if no key is given.
+        """
+        if scope == 'session':
+            if key is not None:
+                directory, path = self._session_path(action_name, key)
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            else:
+                shutil.rmtree(self._session_directory(action_name),
+                              ignore_errors=True)
+            return
+
+        if key is None:
+            self._scopes[scope].pop(action_name, None)
+        else:
+            self._scopes[scope].get(action_name, {}).pop(key, None)
+
+    def clear(self, scope):
+        """
+            Removes every result cached in `scope`.
+        """
+        if scope != 'session':
+            self._scopes[scope].clear()
+            return
+
+        shutil.rmtree(self._session_directory(), ignore_errors=True)
+
+
+#: The cache used by all the memoized actions.
+action_cache = ActionCache()
+
+
+def session_id():
+    """
+        Returns the id of the current test run. If no run was started yet,
+        this process starts one, with a new id that is passed on to the
+        processes it starts, and removes the `session` scope results when it
+        exits.
+    """
+    if not os.environ.get(SESSION_ID_VARIABLE):
+        os.environ[SESSION_ID_VARIABLE] = uuid.uuid4().hex
+        atexit.register(_end_session, os.getpid())
+    return os.environ[SESSION_ID_VARIABLE]
+
+
+def _end_session(pid):
+    # Forked processes inherit the `atexit` functions, but only the process
+    # that started the run removes its results.
+    if os.getpid() == pid:
+        action_cache.clear('session')
+
+
+def _is_stable(value):
+    """
+        Tells if a key value has the same `repr` in every process.
+    """
+    if isinstance(value, tuple):
+        return all(_is_stable(item) for item in value)
+    return isinstance(value, STABLE_KEY_TYPES)
+
+
+def _cache_key(args, kwargs, scope):
+    """
+        Builds the key of an action call from its arguments. Browser drivers
+        are identified by `instance_id`, as each browser has its own state
+        and an `id` may be reused once a browser is gone, but by driver name
+        in the `session` scope, whose results are shared by processes.
+    """
+    def identify(value):
+        if isinstance(value, BaseBrowserDriver):
+            if scope == 'session':
+                return ('driver', value.driver_name)
+            return ('driver', value.driver_name, value.instance_id)
+        return value
+
+    return (tuple(identify(arg) for arg in args),
+            tuple(sorted((name, identify(value))
+                         for name, value in kwargs.items())))
+
+
+def memoize_action(func, scope, maxsize=128):
+    """
+        Returns a version of `func` whose results are cached for `scope`. The
+        returned function also gets `invalidate(*args, **kwargs)`, for
+        removing the result of a call, and `cache_clear()`, for removing all
+        of them.
+
+        Calls whose arguments aren't hashable aren't cached. In the `session`
+        scope, neither are calls whose arguments aren't browser drivers,
+        strings, numbers, booleans, `None` or tuples of these, as other
+        objects can't be told apart from one process to another.
+    """
+    if scope not in CACHE_SCOPES:
+        raise ValueError("Unknown cache scope %r; Choose one of %s." % (
+            scope, ', '.join(CACHE_SCOPES)))
+
+    action_name = '%s.%s' % (func.__module__, func.__name__)
+
+    def get_key(args, kwargs):
+        key = _cache_key(args, kwargs, scope)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        if scope == 'session' and not _is_stable(key):
+            return None
+        return key
+
+    @wraps(func)
+    def memoized(*args, **kwargs):
+        key = get_key(args, kwargs)
+        if key is None:
+            return func(*args, **kwargs)
+
+        cached, result = action_cache.get(scope, action_name, key)
+        if not cached:
+            result = func(*args, **kwargs)
+            action_cache.set(scope, action_name, key, result, maxsize)
+        return result
+
+    def invalidate(*args, **kwargs):
+        key = get_key(args, kwargs)
+        if key is not None:
+            action_cache.invalidate(scope, action_name, key)
+
+    memoized.invalidate = invalidate
+    memoized.cache_clear = lambda: action_cache.invalidate(scope,
+                                                           action_name)
+    memoized.cache_scope = scope
+    return memoized
+
+
+def action(func=None, cache=None, maxsize=128):
     """
         It's a decorator that should be used to create actions.
         Every action that uses it will be available at `FunctTestCase`,
         via `actions` attribute.
+
+        Expensive actions can have their results cached, by giving one of the
+        `CACHE_SCOPES` as `cache`, so they run once per scope for the same
+        arguments. For example::
+
+            @action(cache='class')
+            def create_article(browser, title):
+                ...
+                return article_id
+
+        See `memoize_action` for the details.
     """
+    if func is None:
+        return lambda func: action(func, cache, maxsize)
+
+    if cache is not None:
+        func = memoize_action(func, cache, maxsize)
+
     Actions.register_action(func.__name__, func)
 
+    @wraps(func)
     def execute(*args, **kwargs):
         return func(*args, **kwargs)
     return execute
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    from Queue import Queue, Full
+except ImportError:
+    from queue import Queue, Full
+
+from pyfunct.context import config
+from pyfunct.utils import ProcessLocal, makedirs
+
+
+class ArtifactStore(object):
+    """
+        Keeps the artifacts captured for failed tests, such as screenshots
+        and page sources, in `directory`::
+
+            objects/3f/3f786850e387550fdab836ed7e6dc881de23001b.gz
+            tests/tests.test_search.SearchTest.test_x.json
+
+        Artifacts are gzipped and stored by the SHA-1 of their content, so
+        identical ones, like the same DOM captured by many failing tests, are
+        stored once. The JSON file of each test maps the artifact names to
+        their digests.
+
+        `put` only hashes the data, leaving the compression and the writing
+        to a background thread, through a queue of up to `buffer_size`
+        artifacts. Artifacts that don't fit in the queue, or that would make
+        the stored objects go over `quota` bytes, are dropped and counted in
+        `dropped`.
+
+        Many processes, like the runner workers, may store artifacts in the
+        same directory. The stored objects are measured again before each
+        write, holding a lock on `objects.lock` where `fcntl` is available,
+        so the quota holds for all of them together.
+    """
+
+    def __init__(self, directory, quota=None, buffer_size=100):
+        self.directory = directory
+        self.quota = quota
+        self.dropped = 0
+        self._known = set()
+        # Guards `dropped` and `_known`, which are changed by both the test
+        # thread and the writer thread.
+        self._lock = threading.Lock()
+        self._queue = Queue(buffer_size)
+        self._writer = threading.Thread(target=self._write_artifacts,
+                                        name='pyfunct-artifact-writer')
+        self._writer.daemon = True
+        self._writer.start()
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2],
+                            '%s.gz' % digest)
+
+    def manifest_path(self, test_id):
+        return os.path.join(self.directory, 'tests', '%s.json' % test_id)
+
+    def put(self, data):
+        """
+            Queues `data` (bytes) to be stored, unless it's already stored,
+            and returns its digest.
+        """
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            known = digest in self._known
+            self._known.add(digest)
+        if not known:
+            self._enqueue(('object', digest, data))
+        return digest
+
+    def put_test(self, test_id, artifacts):
+        """
+            Stores the artifacts of a test, given as a dict of bytes by name.
+            Artifacts that end up dropped are left out of the test manifest.
+        """
+        digests = dict((name, self.put(data))
+                       for name, data in artifacts.items())
+        self._enqueue(('manifest', test_id, digests))
+
+    def load(self, digest):
+        """
+            Returns the content of a stored artifact.
+        """
+        with gzip.open(self.object_path(digest), 'rb') as artifact_file:
+            return artifact_file.read()
+
+    def _enqueue(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except Full:
+            with self._lock:
+                self.dropped += 1
+                if item[0] == 'object':
+                    self._known.discard(item[1])
+
+    def _write_artifacts(self):
+        for kind, key, value in iter(self._queue.get, None):
+            if kind == 'object':
+                self._write_object(key, value)
+            else:
+                self._write_manifest(key, value)
+
+    def _stored_size(self):
+        size = 0
+        for directory, _, file_names in os.walk(os.path.join(self.directory,
+                                                             'objects')):
+            for file_name in file_names:
+                size += os.path.getsize(os.path.join(directory, file_name))
+        return size
+
+    def _write_object(self, digest, data):
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return
+
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as gzip_file:
+            gzip_file.write(data)
+        compressed = buffer.getvalue()
+
+        with self._quota_lock():
+            if self.quota is not None and \
+                    self._stored_size() + len(compressed) > self.quota:
+                with self._lock:
+                    self._known.discard(digest)
+                    self.dropped += 1
+                return
+            self._write_file(path, compressed)
+
+    @contextmanager
+    def _quota_lock(self):
+        """
+            Keeps other processes from writing objects until the block ends.
+        """
+        if fcntl is None or self.quota is None:
+            yield
+            return
+
+        makedirs(self.directory)
+        with open(os.path.join(self.directory, 'objects.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write_manifest(self, test_id, digests):
+        digests = dict((name, digest) for name, digest in digests.items()
+                       if os.path.exists(self.object_path(digest)))
+        self._write_file(self.manifest_path(test_id),
+                         json.dumps(digests, indent=2,
+                                    sort_keys=True).encode('utf-8'))
+
+    def _write_file(self, path, data):
+        """
+            Writes a file atomically, so readers never get partial artifacts.
+        """
+        directory = os.path.dirname(path)
+        makedirs(directory)
+
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(descriptor, 'wb') as artifact_file:
+            artifact_file.write(data)
+        os.rename(temporary_path, path)
+
+    def close(self):
+        """
+            Waits for the queued artifacts to be written.
+        """
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+
+
+_stores = ProcessLocal(
+    lambda directory: ArtifactStore(directory, config.artifacts_quota),
+    ArtifactStore.close)
+
+
+def get_artifact_store():
+    """
+        Returns the `ArtifactStore` of this process for
+        `config.artifacts_dir`, creating it on first use, or `None` if no
+        directory is set.
+    """
+    return _stores.get(config.artifacts_dir)
+
+
+def close_artifact_store():
+    """
+        Waits for the queued artifacts of the store of this process to be
+        written.
+    """
+    _stores.close()
+
+
+def capture_browser_artifacts(browser):
+    """
+        Returns the artifacts of a browser as a dict of bytes by name: the
+        `screenshot.png`, the `page.html` source and the `console.json` log.
+        Artifacts the browser can't provide, or that fail to be captured, as
+        when the browser is gone, are left out.
+    """
+    captures = [
+        ('screenshot.png', browser.get_screenshot),
+        ('page.html', lambda: browser.page_source.encode('utf-8')),
+        ('console.json',
+         lambda: json.dumps(browser.get_console_log()).encode('utf-8')),
+    ]
+
+    artifacts = {}
+    for name, capture in captures:
+        try:
+            artifacts[name] = capture()
+        except Exception:
+            continue
+    return artifacts
@@ -1,24 +1,137 @@
 # -*- coding: utf-8 -*-
 
+import json
 from time import sleep
+from inspect import isfunction
+from itertools import count
+from functools import wraps
+from collections import Counter, deque, namedtuple
 
 from pyfunct.exceptions import (
+    InvalidConfigurationException,
     SelectorTypeNotSupportedException,
+    ActionNotPerformableException,
     InvalidUrlException,
-    UnregisteredElementException)
+    UnregisteredElementException,
+    WaitTimeoutException)
 from pyfunct.pages import REGISTERED_PAGES
-from pyfunct import config
+from pyfunct.waits import backoff_intervals, wait_until
+from pyfunct.instrumentation import INSTRUMENTED_METHODS, instrumented
+from pyfunct.reporting import get_reporter
+from pyfunct.scripts import ELEMENTS_STATE_SCRIPT, PAGE_SNAPSHOT_SCRIPT
+from pyfunct.snapshots import ElementSnapshot, FrozenDict, PageSnapshot
+from pyfunct.context import config
 
 # Should contain all browsers that were registered and are available.
 # `BrowserDriverMetaclass` takes care of adding the browsers here.
 REGISTERED_DRIVERS = {}
 
+#: State of a page element, as returned by `get_page_elements_state`. `text`
+#: and `visible` are taken from the first element found by the selector and
+#: `count` is the number of elements found by it.
+ElementState = namedtuple('ElementState', 'present visible text count')
+
+# Methods that change the page loaded by the browser. Elements found before
+# calling them can't be reused, so they clear the element cache.
+NAVIGATION_METHODS = ('open_page', 'open_url', 'reload', 'go_back',
+                      'go_forward', 'wait_pageload')
+
+# Element actions that may follow a link, submit a form or make the page
+# re-render, so elements found before them can't be reused either.
+NAVIGATING_ACTIONS = ('click', 'click_and_wait')
+
+# Methods that change the browser session. Pages loaded before calling them
+# can't be reused by the 'fresh_dom' navigation policy.
+SESSION_METHODS = ('clear_session', 'restore_session_state')
+
+# Element actions that can't be safely made again once they started, such as
+# typing, which would enter the text twice. Only the element lookup is
+# retried for them.
+NON_IDEMPOTENT_ACTIONS = ('type', )
+
+# Numbers browser driver instances, telling them apart even after one is gone
+# and its `id` is reused.
+_instance_ids = count(1)
+
+#: Values for `config.navigation_policy`.
+NAVIGATION_POLICIES = ('always', 'same_url', 'fresh_dom')
+
+
+def invalidates_element_cache(func):
+    """
+        Decorator that clears the browser element cache after `func` runs.
+        `BrowserDriverMetaclass` applies it to the `NAVIGATION_METHODS` of
+        every browser driver.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.invalidate_element_cache()
+    return wrapper
+
+
+def forgets_loaded_page(func):
+    """
+        Decorator that makes `open_page` load the page again after `func`
+        runs, even if it's the loaded one. `BrowserDriverMetaclass` applies it
+        to the `SESSION_METHODS` of every browser driver.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._loaded_page = None
+    return wrapper
+
+
+def element_action(func):
+    """
+        Decorator that provides a shortcut for performing browser actions into
+        elements, such as click, mouse_over, etc.
+        When used, it should receive either an element or a string as the first
+        parameter (after self). If It's a string, it should be an alias to
+        a page element, and the action will be performed into this element.
+
+        It also executes `_handle_empty_element_action` before performing
+        the action, and clears the element cache after the
+        `NAVIGATING_ACTIONS`.
+
+        Actions on aliases are retried as set by `config`, looking up the
+        element again, while it's missing or raises one of the driver
+        `retryable_exceptions`. See `BaseBrowserDriver.retry_element_action`.
+    """
+    @wraps(func)
+    def wrapper(self, element, *args, **kwargs):
+        # Actions change state the DOM doesn't show, like typed values and
+        # checked boxes, so the 'fresh_dom' navigation policy has to reload
+        # the page.
+        if self._loaded_page is not None:
+            self._loaded_page = (self._loaded_page[0], None)
+
+        try:
+            if isinstance(element, str):
+                return self.retry_element_action(func, element, *args,
+                                                 **kwargs)
+            self._handle_empty_element_action(element)
+            return func(self, element, *args, **kwargs)
+        finally:
+            if func.__name__ in NAVIGATING_ACTIONS:
+                self.invalidate_element_cache()
+    return wrapper
+
 
 class BrowserDriverMetaclass(type):
     """
         Browser Driver Metaclass. It makes any browser that extends
         `BaseBrowserDriver` to be added to `REGISTERED_DRIVERS`, making it
         usable by any `FunctTestCase`.
+
+        It also makes the `NAVIGATION_METHODS` clear the element cache, the
+        `SESSION_METHODS` forget the loaded page and times the
+        `INSTRUMENTED_METHODS`.
     """
 
     def __init__(cls, name, bases, attributes):
@@ -32,6 +145,21 @@ class BrowserDriverMetaclass(type):
         if driver_name is not None:
             REGISTERED_DRIVERS[driver_name] = cls
 
+        for method_name in NAVIGATION_METHODS:
+            if method_name in attributes:
+                setattr(cls, method_name,
+                        invalidates_element_cache(attributes[method_name]))
+
+        for method_name in SESSION_METHODS:
+            if method_name in attributes:
+                setattr(cls, method_name,
+                        forgets_loaded_page(attributes[method_name]))
+
+        for method_name in INSTRUMENTED_METHODS:
+            if isfunction(attributes.get(method_name)):
+                setattr(cls, method_name,
+                        instrumented(vars(cls)[method_name]))
+
         return super(BrowserDriverMetaclass, cls).__init__(name, bases,
                                                            attributes)
 
@@ -50,18 +178,93 @@ class BaseBrowserDriver(object):
 
     _current_page = None
 
+    # The url and DOM generation of the page last loaded by `open_page`,
+    # with the 'fresh_dom' navigation policy.
+    _loaded_page = None
+
+    #: How many `WaitTiming` records are kept in `wait_timings`.
+    wait_timings_size = 100
+
+    #: Exceptions raised by element actions that are worth retrying, such as
+    #: the ones for stale elements. `ActionNotPerformableException`, raised
+    #: for missing elements, is always retried.
+    retryable_exceptions = ()
+
     def __init__(self):
         """
             Defines the methods used to select elements.
         """
+        self.instance_id = next(_instance_ids)
+        self.wait_timings = deque(maxlen=self.wait_timings_size)
+        self.retry_counts = Counter()
+        self._element_cache = {}
+        self._dom_generation = None
         self.selection_methods = {
             'xpath': self.get_element_by_xpath,
             'css': self.get_element_by_css,
             'id': self.get_element_by_id,
             'tag': self.get_element_by_tag,
             'text': self.get_element_by_text,
+            'name': self.get_element_by_name,
         }
 
+    def retry_element_action(self, func, alias, *args, **kwargs):
+        """
+            Performs an element action on the page element `alias`, making up
+            to `config.element_action_attempts` attempts. The element is
+            looked up again on every attempt, and the attempts are spaced
+            like `wait_for` checks, from `config.element_action_interval`
+            seconds, multiplied by `config.element_action_backoff` each time,
+            up to `config.element_action_max_interval`.
+
+            Attempts fail when the element is missing or when the action
+            raises one of `retryable_exceptions` or
+            `config.element_action_retry_exceptions`, except for the
+            `NON_IDEMPOTENT_ACTIONS`, which are made once the element is
+            found. The number of retries of each action and alias is counted
+            in `retry_counts`, and reported to `config.report_path`.
+        """
+        attempts = config.element_action_attempts
+        if attempts < 1:
+            raise InvalidConfigurationException(
+                "`element_action_attempts` must be at least 1, got %r." % (
+                    attempts, ))
+
+        retries_action = func.__name__ not in NON_IDEMPOTENT_ACTIONS
+        retryable = ((ActionNotPerformableException, ) +
+                     tuple(self.retryable_exceptions) +
+                     tuple(config.element_action_retry_exceptions))
+        intervals = backoff_intervals(config.element_action_interval,
+                                      config.element_action_backoff,
+                                      config.element_action_max_interval)
+
+        for attempt in range(1, attempts + 1):
+            try:
+                element = self.get_page_element(alias)
+                self._handle_empty_element_action(element)
+                if not retries_action:
+                    break
+                return func(self, element, *args, **kwargs)
+            except retryable:
+                if attempt >= attempts:
+                    raise
+            # A cached element may be the stale one.
+            self.invalidate_element_cache()
+            self.retry_counts[(func.__name__, alias)] += 1
+            reporter = get_reporter()
+            if reporter is not None:
+                reporter.report_retry(self.driver_name, func.__name__, alias)
+            self.wait(next(intervals))
+
+        return func(self, element, *args, **kwargs)
+
+    def _handle_empty_element_action(self, element):
+        if not element:
+            raise ActionNotPerformableException(
+                "The action couldn't be perfomed because the element couldn't "
+                "be found; Try checking if your element"
+                "selector is correct and if the page is loaded properly.")
+
     @property
     def page_url(self):
         """
@@ -101,7 +304,27 @@ class BaseBrowserDriver(object):
         """
             Calls `switch_page`, which will load the new page instance and then
             goes with the browser to the new page.
-        """
+
+            The loaded page may be reused, depending on
+            `config.navigation_policy`:
+
+            * 'always' loads the page every time.
+            * 'same_url' reuses it whenever the browser is on the page url.
+            * 'fresh_dom' reuses it only if the DOM didn't change since
+              `open_page` loaded it, checking it through `get_dom_generation`.
+              If it changed, the page is reloaded, which revalidates the
+              cached resources instead of downloading them again. Pages are
+              also reloaded after element actions, like typing or checking,
+              which change the state of form controls, and are always loaded
+              by browsers that can't tell the DOM generation and after the
+              `SESSION_METHODS` are called.
+        """
+        policy = config.navigation_policy
+        if policy not in NAVIGATION_POLICIES:
+            raise InvalidConfigurationException(
+                "Unknown navigation policy %r; Choose one of %s." % (
+                    policy, ', '.join(NAVIGATION_POLICIES)))
+
         self.switch_page(page_name)
 
         url = self._current_page.get_url(*args, **kwargs)
@@ -112,8 +335,40 @@ class BaseBrowserDriver(object):
 
         url = config.base_url + url if not provides_full_url else url
 
+        if policy == 'same_url' and self._is_current_url(url):
+            return None
+        if policy == 'fresh_dom':
+            return self._open_fresh_url(url)
         return self.open_url(url)
 
+    def _open_fresh_url(self, url):
+        loaded_page, self._loaded_page = self._loaded_page, None
+        reloaded = False
+
+        if loaded_page is not None and loaded_page[0] == url and \
+                self._is_current_url(url):
+            if self.get_dom_generation() == loaded_page[1]:
+                self._loaded_page = loaded_page
+                return None
+            try:
+                self.reload()
+                reloaded = True
+            except NotImplementedError:
+                pass
+
+        response = None if reloaded else self.open_url(url)
+
+        generation = self.get_dom_generation()
+        if generation is not None:
+            self._loaded_page = (url, generation)
+        return response
+
+    def _is_current_url(self, url):
+        try:
+            return self.page_url == url
+        except NotImplementedError:
+            return False
+
     def reload(self):
         """
             Reloads the page
@@ -240,16 +495,118 @@ class BaseBrowserDriver(object):
         """
             Gets an element from the currently active page, based on it's
             `alias`.
+
+            If `config.cache_page_elements` is set, found elements are cached
+            by page and alias, until the browser navigates or
+            `invalidate_element_cache` is called. If
+            `config.element_cache_tracks_dom` is set as well, the cache is
+            also cleared whenever `get_dom_generation` changes, at the cost
+            of checking it on every lookup.
         """
         try:
-            page_element = self._current_page.elements[alias]
+            compiled = self._current_page.selector_index[alias]
         except KeyError:
             raise UnregisteredElementException
 
-        selector = page_element['selector']
-        selection_type = page_element['selection_type']
+        try:
+            find = self.selection_methods[compiled.selection_type]
+        except KeyError:
+            raise SelectorTypeNotSupportedException(compiled.selection_type)
+
+        if not config.cache_page_elements:
+            return find(compiled.selector)
+
+        if config.element_cache_tracks_dom:
+            dom_generation = self.get_dom_generation()
+            if dom_generation != self._dom_generation:
+                self.invalidate_element_cache()
+                self._dom_generation = dom_generation
+
+        key = (self._current_page.page_name, alias)
+        try:
+            return self._element_cache[key]
+        except KeyError:
+            element = find(compiled.selector)
+
+        # Missing elements aren't cached, as they may show up later.
+        if element:
+            self._element_cache[key] = element
+        return element
+
+    def _get_selectors(self, aliases):
+        """
+            Returns the aliases, or all the current page aliases if none is
+            given, and their `[selector, selection_type]` pairs.
+        """
+        elements = self._current_page.elements
+        aliases = aliases or sorted(elements)
+
+        selectors = []
+        for alias in aliases:
+            try:
+                page_element = elements[alias]
+            except KeyError:
+                raise UnregisteredElementException(alias)
+            selectors.append([page_element['selector'],
+                              page_element['selection_type']])
+        return aliases, selectors
+
+    def get_page_elements_state(self, *aliases):
+        """
+            Gets the `ElementState` of many elements from the currently active
+            page at once, in a single `execute_javascript` call, instead of
+            looking up each one of them. If no alias is given, all the page
+            elements are checked. For example::
+
+                states = browser.get_page_elements_state('login box',
+                                                         'password box')
+                assert states['login box'].visible
+
+            Returns a dict having the aliases as keys.
+        """
+        aliases, selectors = self._get_selectors(aliases)
+
+        states = self.execute_javascript(
+            ELEMENTS_STATE_SCRIPT % json.dumps(selectors))
+
+        return dict((alias, ElementState(*state))
+                    for alias, state in zip(aliases, states))
+
+    def snapshot_page(self, *aliases):
+        """
+            Takes a `PageSnapshot` of the text, attributes and visibility of
+            many elements from the currently active page, in a single
+            `execute_javascript` call. If no alias is given, all the page
+            elements are taken. For example::
+
+                snapshot = browser.snapshot_page()
+                self.assertEqual(snapshot.text('title'), 'Welcome')
+                self.assertFalse(snapshot['error message'].visible)
+        """
+        aliases, selectors = self._get_selectors(aliases)
+
+        url, title, elements = self.execute_javascript(
+            PAGE_SNAPSHOT_SCRIPT % json.dumps(selectors))
+
+        return PageSnapshot(
+            self._current_page.page_name, url, title,
+            ((alias, ElementSnapshot(*(element[:5] +
+                                       [FrozenDict(element[5])])))
+             for alias, element in zip(aliases, elements)))
+
+    def invalidate_element_cache(self):
+        """
+            Clears the elements cached by `get_page_element`.
+        """
+        self._element_cache = {}
 
-        return self.get_element(selector, selection_type)
+    def get_dom_generation(self):
+        """
+            Should return a value that changes whenever the page DOM changes,
+            so cached elements are known to be outdated. Returns `None` if the
+            browser can't tell it.
+        """
+        return None
 
     def get_element_by_xpath(self, selector):
         """
@@ -286,6 +643,13 @@ class BaseBrowserDriver(object):
         raise NotImplementedError(
             "This browser doesn't support getting elements by text")
 
+    def get_element_by_name(self, selector):
+        """
+            Gets an element, selecting it by it's name attribute.
+        """
+        raise NotImplementedError(
+            "This browser doesn't support getting elements by name")
+
     def type(self, element, text, slowly=False):
         """
             Enters text into an input element. If slowly is `True`, it will
@@ -322,6 +686,21 @@ class BaseBrowserDriver(object):
         raise NotImplementedError(
             "This browser doesn't support executing javascript.")
 
+    def get_screenshot(self):
+        """
+            Returns a PNG screenshot of the current page, as bytes.
+        """
+        raise NotImplementedError(
+            "This browser doesn't support taking screenshots.")
+
+    def get_console_log(self):
+        """
+            Returns the messages logged to the browser console since the last
+            call, as a list of dicts.
+        """
+        raise NotImplementedError(
+            "This browser doesn't support getting the console log.")
+
     def get_iframe(self, iframe_id):
         raise NotImplementedError(
             "This browser doesn't support switching to frames.")
@@ -343,6 +722,37 @@ class BaseBrowserDriver(object):
         """
         sleep(seconds)
 
+    def wait_for(self, condition, timeout=30, interval=0.05, backoff=1.5,
+                 max_interval=1, deadline=None, ignored_exceptions=()):
+        """
+            Waits until `condition` is satisfied and returns its value, instead
+            of sleeping for a fixed time. Conditions are available at
+            `pyfunct.waits`, but any function that receives the browser works
+            as well. For example::
+
+                from pyfunct.waits import element_visible, url_matches
+
+                browser.wait_for(element_visible('results'), timeout=10)
+                browser.wait_for(url_matches('/checkout/done$'))
+
+            The condition is checked every `interval` seconds, multiplied by
+            `backoff` after each check, up to `max_interval`. It raises
+            `WaitTimeoutException` after `timeout` seconds or at `deadline`
+            (a `time.time()` timestamp), whatever comes first.
+
+            The `WaitTiming` of each wait is appended to `wait_timings`.
+        """
+        try:
+            value, timing = wait_until(
+                self, condition, timeout, interval, backoff, max_interval,
+                deadline, ignored_exceptions)
+        except WaitTimeoutException as e:
+            self.wait_timings.append(e.timing)
+            raise
+
+        self.wait_timings.append(timing)
+        return value
+
     def wait_pageload(self, timeout=30):
         """
             Checks if the current page is loaded, until timeout is reached.
@@ -363,3 +773,23 @@ class BaseBrowserDriver(object):
         """
         raise NotImplementedError(
             "This browser does not support clearing the session")
+
+    def get_session_state(self):
+        """
+            Returns the browser session state for the current page, so it can
+            be restored later through `restore_session_state`. It's a JSON
+            serializable dict having the page `url`, the `cookies` (as dicts)
+            and the `local_storage` and `session_storage` items.
+        """
+        raise NotImplementedError(
+            "This browser does not support getting the session state")
+
+    def restore_session_state(self, state):
+        """
+            Restores a session state got through `get_session_state`,
+            replacing the current cookies and storages. The browser is taken
+            to the state url first, if it's in another site, as cookies and
+            storages can only be set for the current site.
+        """
+        raise NotImplementedError(
+            "This browser does not support restoring the session state")
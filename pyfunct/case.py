@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import os
+import json
 import unittest
 
 from pyfunct.browsers import REGISTERED_DRIVERS
-from pyfunct.actions import Actions
+from pyfunct.instrumentation import (
+    CallStatistics,
+    add_call_listener,
+    remove_call_listener)
+from pyfunct.actions import Actions, action_cache
 from pyfunct.context import config
+from pyfunct.fanout import BrowserGroup
+from pyfunct.pool import get_default_pool
+from pyfunct.reporting import OutcomeRecorder, get_reporter
+from pyfunct.artifacts import capture_browser_artifacts, get_artifact_store
 
 
 class FunctTestCase(unittest.TestCase):
@@ -22,6 +32,21 @@ class FunctTestCase(unittest.TestCase):
     #: case, set it to False.
     reuse_browser = True
 
+    #: If set to a `BrowserPool`, browsers are checked out from it instead of
+    #: being launched, and are checked in instead of being closed or quitted.
+    #: `pyfunct.runner` sets it on each worker process, so browsers are
+    #: launched once per worker instead of once per test case class. If it's
+    #: not set, the pool of `config.use_browser_pool` is used, if enabled.
+    browser_pool = None
+
+    # The reused browser, if its session was cleared by the last `tearDown`
+    # and it wasn't used since.
+    _cleared_browser = None
+
+    #: The `CallStatistics` of the current test, if
+    #: `config.instrument_browser_calls` is set.
+    call_stats = None
+
     def __init__(self, *args, **kwargs):
         self.__class__.browsers = []
         self.__class__.browser = None
@@ -32,35 +57,150 @@ class FunctTestCase(unittest.TestCase):
         # `self.actions` attribute.
         self.actions = Actions()
 
+    def run(self, result=None):
+        """
+            Runs the test, reporting it to `config.report_path` and capturing
+            the browsers artifacts if it fails, when these are set.
+        """
+        reporter = get_reporter()
+        store = get_artifact_store()
+        if reporter is None and store is None:
+            return super(FunctTestCase, self).run(result)
+
+        recorder = OutcomeRecorder(
+            result if result is not None else self.defaultTestResult(),
+            self.capture_artifacts if store is not None else None)
+        if reporter is not None:
+            reporter.start_test(self.id())
+        try:
+            return super(FunctTestCase, self).run(recorder)
+        finally:
+            if reporter is not None:
+                reporter.stop_test(recorder.outcome)
+
     def setUp(self):
+        self.__class__._cleared_browser = None
+
+        if config.instrument_browser_calls:
+            self.call_stats = CallStatistics()
+            add_call_listener(self.call_stats)
+            # `tearDown` isn't called if `setUp` fails, as when the browser
+            # can't be created.
+            self.addCleanup(remove_call_listener, self.call_stats)
+
         if self.__class__.browser is None and self.reuse_browser:
             self.__class__.browser = self.create_browser()
 
     def tearDown(self):
+        action_cache.clear('test')
+
+        if self.call_stats is not None:
+            remove_call_listener(self.call_stats)
+            self.dump_call_stats()
+
         cls = self.__class__
-        for browser in cls.browsers:
+        for browser in list(cls.browsers):
             if self.reuse_browser and browser == cls.browser:
                 browser.clear_session()
+                cls._cleared_browser = browser
             else:
                 self.close_browser(browser)
 
+    def capture_artifacts(self):
+        """
+            Stores the screenshot, page source and console log of every test
+            browser in `config.artifacts_dir`. It's called when the test fails
+            or errors, before `tearDown`, so the browsers are still on the
+            failing page. Artifacts are named after the browser, as in
+            `0-splinter/screenshot.png`.
+        """
+        store = get_artifact_store()
+        if store is None:
+            return
+
+        artifacts = {}
+        for index, browser in enumerate(self.__class__.browsers):
+            prefix = '%d-%s' % (index, browser.driver_name)
+            for name, data in capture_browser_artifacts(browser).items():
+                artifacts['%s/%s' % (prefix, name)] = data
+        if artifacts:
+            store.put_test(self.id(), artifacts)
+
+    def dump_call_stats(self):
+        """
+            Writes `call_stats` to `config.call_stats_dir`, as a JSON file
+            named after the test id.
+        """
+        if not config.call_stats_dir:
+            return
+
+        if not os.path.isdir(config.call_stats_dir):
+            os.makedirs(config.call_stats_dir)
+        path = os.path.join(config.call_stats_dir, '%s.json' % self.id())
+        with open(path, 'w') as stats_file:
+            json.dump(dict(self.call_stats.as_dict(), test=self.id()),
+                      stats_file, indent=2, sort_keys=True)
+
     def create_browser(self, driver_name=None, *args, **kwargs):
         """
             This instantiates a browser and returns it. It also adds the
             browser to `self.browsers`, in order to quit them automatically in
             the tear down.
+
+            If there's a `browser_pool`, or `config.use_browser_pool` is set,
+            the browser is checked out from the pool, unless extra arguments
+            are given for launching the browser.
         """
         driver_name = driver_name or config.default_driver_name
-        browser = REGISTERED_DRIVERS[driver_name](*args, **kwargs)
+        pool = self._get_browser_pool()
+        if pool is not None and not (args or kwargs):
+            browser = pool.checkout(driver_name)
+        else:
+            browser = REGISTERED_DRIVERS[driver_name](*args, **kwargs)
         self.__class__.browsers.append(browser)
         return browser
 
+    def fan_out(self, browsers=None, **kwargs):
+        """
+            Returns a `BrowserGroup` for running actions in many browsers at
+            once. It takes `browsers`, or all the test browsers, and the
+            `BrowserGroup` options. For example::
+
+                browsers = [self.create_browser() for _ in range(10)]
+                with self.fan_out() as group:
+                    group.map('login', users)
+                    group.run('open_shared_document')
+        """
+        return BrowserGroup(browsers or self.__class__.browsers, **kwargs)
+
     def close_browser(self, browser):
-        browser.close()
+        if self._is_pooled(browser):
+            self._get_browser_pool().checkin(browser)
+        else:
+            browser.close()
         self.__class__.browsers.remove(browser)
 
+    @classmethod
+    def _get_browser_pool(cls):
+        if cls.browser_pool is not None:
+            return cls.browser_pool
+        return get_default_pool()
+
+    @classmethod
+    def _is_pooled(cls, browser):
+        pool = cls._get_browser_pool()
+        return pool is not None and pool.owns(browser)
+
     @classmethod
     def tearDownClass(cls):
+        action_cache.clear('class')
         for browser in cls.browsers:
-            browser.quit()
+            if cls._is_pooled(browser):
+                # The session of the reused browser was cleared by the last
+                # `tearDown`.
+                cls._get_browser_pool().checkin(
+                    browser, clear_session=browser is not cls._cleared_browser)
+            else:
+                browser.quit()
         cls.browsers = []
+        cls._cleared_browser = None
@@ -13,6 +13,104 @@ class DefaultConfig(object):
     default_driver_name = 'splinter'
     default_browser = 'firefox'
 
+    # Named settings for launching browsers through the `splinter` driver,
+    # and the profile used by default. For example::
+    #
+    #     launch_profiles = {
+    #         'ci': {'browser': 'chrome', 'headless': True, 'no_sandbox': True,
+    #                'disable_extensions': True, 'window_size': (1280, 800),
+    #                'disk_cache_dir': '/tmp/chrome-cache'},
+    #     }
+    #     launch_profile = 'ci'
+    #
+    # See `SplinterBrowserDriver._add_launch_profile` for the settings.
+    launch_profiles = {}
+    launch_profile = None
+
+    # Socket of the `pyfunct.daemon` browser daemon, used by the `attached`
+    # driver. Defaults to `pyfunct-<user id>/daemon.sock`, in the temporary
+    # directory.
+    daemon_socket = None
+
+    # Resources the `splinter` driver keeps browsers from loading, when the
+    # browser supports it: url patterns, having `*` as a wildcard, as in
+    # '*google-analytics.com*', and whether images and stylesheets are loaded.
+    blocked_urls = ()
+    block_images = False
+    block_stylesheets = False
+
+    # Element actions on aliases, as in `browser.click('submit')`, are made
+    # up to `element_action_attempts` times while the element is missing or
+    # stale, spaced by an interval growing by `element_action_backoff`. See
+    # `BaseBrowserDriver.retry_element_action`.
+    element_action_attempts = 1
+    element_action_interval = 0.05
+    element_action_backoff = 1.5
+    element_action_max_interval = 1
+    element_action_retry_exceptions = ()
+
+    # `BrowserPool` settings: whether `FunctTestCase` classes share a pool,
+    # how many browsers are kept warm per driver name and after how many uses
+    # or seconds a browser is recycled.
+    use_browser_pool = False
+    browser_pool_size = 1
+    browser_max_uses = None
+    browser_max_age = None
+
+    # Caches elements got through page aliases, until the browser navigates
+    # or an element is clicked.
+    # Tracking the DOM also detects elements changed by scripts, but costs a
+    # browser call on every lookup.
+    cache_page_elements = False
+    element_cache_tracks_dom = False
+
+    # WSGI app called by the `wsgi` driver, or its import path, as in
+    # 'myproject.wsgi:application'.
+    wsgi_app = None
+
+    # Pages are only created, and have their selectors compiled, the first
+    # time they're used. `page_manifest` maps page names to the modules that
+    # define them (as a dict or the path of a JSON file), so these modules are
+    # imported only when their pages are needed.
+    lazy_page_registration = False
+    page_manifest = None
+
+    # Times every browser driver call made by each test, making the
+    # `CallStatistics` available as `self.call_stats`. If `call_stats_dir` is
+    # set, they're also written there as a JSON file per test.
+    instrument_browser_calls = False
+    call_stats_dir = None
+
+    # Where `restores_session` keeps the browser session states, shared by
+    # all test processes, and for how many seconds they're reused. The
+    # directory defaults to `pyfunct-<user id>/sessions`, in the temporary
+    # directory.
+    session_store_dir = None
+    session_ttl = 3600
+
+    # Where the results of actions cached for the `session` scope are kept
+    # while tests run. Defaults to the temporary directory.
+    action_cache_dir = None
+
+    # JSON lines file where a record is appended for every test and browser
+    # driver call, as they happen.
+    report_path = None
+
+    # Where the screenshot, page source and console log of the browsers are
+    # stored when a test fails, and up to how many bytes they may take.
+    artifacts_dir = None
+    artifacts_quota = 500 * 1024 * 1024
+
+    # JSON lines report of a previous run, read by `PageLocalityTestLoader`
+    # for ordering tests by the pages they open. Defaults to `report_path`.
+    test_history_path = None
+
+    # What `open_page` does when the browser is already on the page url:
+    # 'always' loads it again, 'same_url' reuses the loaded page and
+    # 'fresh_dom' reuses it only if scripts didn't change it, reloading it
+    # otherwise. See `BaseBrowserDriver.open_page`.
+    navigation_policy = 'always'
+
 
 class ConfigMetaclass(type):
     """
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+from functools import partial, wraps
+
+from pyfunct.case import FunctTestCase
+from pyfunct.contrib.splinter_driver import SplinterBrowserDriver
+
+asyncio_available = True
+
+try:
+    import asyncio
+except ImportError:
+    try:
+        import trollius as asyncio
+    except ImportError:
+        asyncio_available = False
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    asyncio_available = False
+
+# Driver properties that talk to the browser, so they're awaitable as well.
+ASYNC_PROPERTIES = ('page_url', 'page_source', 'page_title')
+
+
+def _check_asyncio():
+    if not asyncio_available:
+        raise ImportError(
+            "In order to use the async driver you have to use Python 3.4+ "
+            "or install trollius and futures.")
+
+
+class AsyncBaseBrowserDriver(object):
+    """
+        Async counterpart of a browser driver. It wraps any driver, such as
+        `SplinterBrowserDriver`, running its methods in a thread owned by the
+        browser, so they return futures that can be awaited in an asyncio
+        event loop, instead of blocking it. For example::
+
+            alice = AsyncBaseBrowserDriver(alice_browser)
+            bob = AsyncBaseBrowserDriver(bob_browser)
+
+            yield from asyncio.gather(alice.open_page('chat'),
+                                      bob.open_page('chat'))
+            yield from alice.fill('message box', 'Hi Bob!')
+            title = yield from bob.page_title
+
+        Every driver method works this way, as well as `page_url`,
+        `page_source` and `page_title`. Calls to the same browser are still
+        run one at a time, in the order they were made, as WebDriver sessions
+        can't handle concurrent commands.
+    """
+
+    def __init__(self, driver, loop=None):
+        _check_asyncio()
+        self.driver = driver
+        self.loop = loop or asyncio.get_event_loop()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def run(self, func, *args, **kwargs):
+        """
+            Runs `func` in the browser thread, returning its future.
+        """
+        return self.loop.run_in_executor(self._executor,
+                                         partial(func, *args, **kwargs))
+
+    def __getattr__(self, name):
+        if name in ASYNC_PROPERTIES:
+            return self.run(getattr, self.driver, name)
+
+        attribute = getattr(self.driver, name)
+        if not callable(attribute):
+            return attribute
+        return partial(self.run, attribute)
+
+    def __getitem__(self, alias):
+        return self.run(self.driver.get_page_element, alias)
+
+    def shutdown(self):
+        """
+            Stops the browser thread, once its pending calls are done. It
+            doesn't quit the browser.
+        """
+        self._executor.shutdown(wait=True)
+
+
+class AsyncSplinterBrowserDriver(AsyncBaseBrowserDriver):
+    """
+        Async driver for splinter. It takes the same arguments as
+        `SplinterBrowserDriver`, launching the browser right away.
+    """
+
+    def __init__(self, *args, **kwargs):
+        loop = kwargs.pop('loop', None)
+        super(AsyncSplinterBrowserDriver, self).__init__(
+            SplinterBrowserDriver(*args, **kwargs), loop)
+
+
+class AsyncFunctTestCase(FunctTestCase):
+    """
+        A `FunctTestCase` whose test methods may be coroutines, which are
+        run until complete in an event loop created for each test, available
+        as `self.loop`. Browsers are created as usual and wrapped by
+        `create_async_browser`, so they're still closed by the test case::
+
+            class ChatTestCase(AsyncFunctTestCase):
+
+                @asyncio.coroutine
+                def test_chat(self):
+                    alice = self.create_async_browser()
+                    bob = self.create_async_browser()
+                    yield from asyncio.gather(alice.open_page('chat'),
+                                              bob.open_page('chat'))
+    """
+
+    #: Async tests fail if they take longer than this, in seconds.
+    async_timeout = 300
+
+    def __init__(self, methodName='runTest'):
+        super(AsyncFunctTestCase, self).__init__(methodName)
+        self.loop = None
+        self._async_browsers = []
+        test_method = getattr(self, methodName, None)
+        if test_method is not None:
+            setattr(self, methodName, self._run_in_loop(test_method))
+
+    def _run_in_loop(self, test_method):
+        # Keeps the attributes unittest reads from test methods, such as the
+        # ones set by `unittest.skip`.
+        @wraps(test_method)
+        def run_test():
+            result = test_method()
+            if asyncio.iscoroutine(result) or isinstance(result,
+                                                         asyncio.Future):
+                return self.loop.run_until_complete(
+                    asyncio.wait_for(result, self.async_timeout))
+            return result
+        return run_test
+
+    def setUp(self):
+        _check_asyncio()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        super(AsyncFunctTestCase, self).setUp()
+
+    def tearDown(self):
+        for async_browser in self._async_browsers:
+            async_browser.shutdown()
+        self._async_browsers = []
+        asyncio.set_event_loop(None)
+        self.loop.close()
+        super(AsyncFunctTestCase, self).tearDown()
+
+    def create_async_browser(self, driver_name=None, *args, **kwargs):
+        """
+            Creates a browser through `create_browser` and returns it
+            wrapped by an `AsyncBaseBrowserDriver`.
+        """
+        async_browser = AsyncBaseBrowserDriver(
+            self.create_browser(driver_name, *args, **kwargs), self.loop)
+        self._async_browsers.append(async_browser)
+        return async_browser
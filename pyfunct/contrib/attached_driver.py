@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.contrib.splinter_driver import SplinterBrowserDriver
+from pyfunct.daemon import DaemonClient
+
+splinter_available = True
+
+try:
+    from selenium.webdriver import Remote
+    from splinter.driver.webdriver import BaseWebDriver, WebDriverElement
+    from splinter.driver.webdriver.cookie_manager import CookieManager
+    from splinter.driver.webdriver.remote import WebDriver as RemoteWebDriver
+except ImportError:
+    splinter_available = False
+
+
+if splinter_available:
+
+    class AttachedRemote(Remote):
+        """
+            Selenium remote driver for an existing WebDriver session, instead
+            of starting a new one.
+        """
+
+        def __init__(self, executor_url, session_id, w3c):
+            self._attached_session = (session_id, w3c)
+            super(AttachedRemote, self).__init__(
+                command_executor=executor_url, desired_capabilities={})
+
+        def start_session(self, capabilities, browser_profile=None):
+            self.session_id, self.w3c = self._attached_session
+            self.capabilities = {}
+
+    class AttachedSplinterBrowser(RemoteWebDriver):
+        """
+            Splinter remote browser for an existing WebDriver session.
+        """
+
+        def __init__(self, session, wait_time=2):
+            self.driver = AttachedRemote(session['executor_url'],
+                                         session['session_id'],
+                                         session['w3c'])
+            self.element_class = WebDriverElement
+            self._cookie_manager = CookieManager(self.driver)
+            BaseWebDriver.__init__(self, wait_time)
+
+
+class AttachedBrowserDriver(SplinterBrowserDriver):
+    """
+        Splinter driver for a browser kept running by `pyfunct.daemon`,
+        which is attached to instead of being launched, so test runs start
+        right away. Set `config.default_driver_name` to 'attached' while
+        iterating locally, after starting the daemon::
+
+            python -m pyfunct.daemon --size 2
+
+        It takes the daemon `socket_path`, which defaults to
+        `config.daemon_socket`. The browser is handed back to the daemon,
+        instead of being quitted, when the driver is closed or quitted, or
+        when the test process exits.
+    """
+
+    driver_name = 'attached'
+
+    def __init__(self, socket_path=None):
+        BaseBrowserDriver.__init__(self)
+        if not splinter_available:
+            raise ImportError(
+                "In order to use the attached driver you have to install "
+                "splinter. Check the instructions at "
+                "http://splinter.cobrateam.info")
+
+        started_at = time.time()
+        self._client = DaemonClient(socket_path)
+        try:
+            session = self._client.request('checkout')
+            self._browser = AttachedSplinterBrowser(session)
+        except Exception:
+            self._client.close()
+            raise
+        self.launch_time = time.time() - started_at
+
+    def close(self):
+        self.quit()
+
+    def quit(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
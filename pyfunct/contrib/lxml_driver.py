@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+
+import os
+from io import BytesIO
+from collections import namedtuple
+from wsgiref.util import setup_testing_defaults
+
+try:
+    from urllib import urlencode, unquote, url2pathname
+    from urlparse import urljoin, urlsplit, urlunsplit
+except ImportError:
+    from urllib.parse import (urlencode, unquote, urljoin, urlsplit,
+                              urlunsplit)
+    from urllib.request import url2pathname
+
+from pyfunct.browsers import BaseBrowserDriver, element_action
+from pyfunct.exceptions import InvalidUrlException, PageNotLoadedException
+from pyfunct.pages import selector_to_xpath
+from pyfunct.snapshots import ElementSnapshot, FrozenDict, PageSnapshot
+
+lxml_available = True
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_available = False
+
+#: Response from a WSGI application: the status code, a list of
+#: `(name, value)` headers and the body.
+WSGIResponse = namedtuple('WSGIResponse', 'status headers body')
+
+# Elements whose content is never displayed.
+INVISIBLE_TAGS = ('head', 'title', 'meta', 'link', 'script', 'style',
+                  'template', 'noscript')
+
+
+def _encode(value):
+    """
+        Encodes text to be sent in requests as UTF-8.
+    """
+    return value if isinstance(value, bytes) else value.encode('utf-8')
+
+
+class LxmlBrowserDriver(BaseBrowserDriver):
+    """
+        This is an offline BrowserDriver, that parses HTML with lxml
+        (http://lxml.de) instead of running a real browser, being many times
+        faster than one.
+
+        To use it, you must have lxml and cssselect installed on your env.
+
+        It loads pages from files (through `file://` urls or paths), strings
+        (through `load_html`) or from a WSGI application, given as
+        `wsgi_app`. It supports finding elements, filling and checking form
+        fields, following links and submitting forms, but it doesn't run
+        JavaScript nor apply CSS, so `is_element_visible` only takes inline
+        styles and the `hidden` attribute into account.
+    """
+
+    driver_name = 'lxml'
+
+    def __init__(self, wsgi_app=None):
+        super(LxmlBrowserDriver, self).__init__()
+        if not lxml_available:
+            raise ImportError(
+                "In order to use the lxml driver you have to install lxml and "
+                "cssselect. Check the instructions at http://lxml.de")
+        self.wsgi_app = wsgi_app
+        self._reset()
+
+    def _reset(self):
+        self._document = None
+        self._url = None
+        self._history = []
+        self._history_index = -1
+
+    @property
+    def document(self):
+        """
+            The lxml root element of the current page.
+        """
+        if self._document is None:
+            raise PageNotLoadedException("No page was loaded yet.")
+        return self._document
+
+    @property
+    def page_url(self):
+        return self._url
+
+    @property
+    def page_source(self):
+        return lxml_html.tostring(self.document, encoding='unicode')
+
+    @property
+    def page_title(self):
+        return (self.document.findtext('.//title') or '').strip()
+
+    def load_html(self, html, url=None):
+        """
+            Loads a page from an HTML string. `url` is the page url, used for
+            resolving relative links and form actions.
+        """
+        self._push_history(url, None, html)
+
+    def open_url(self, url):
+        self._navigate(url)
+
+    def _navigate(self, url, method='GET', data=None):
+        url, source = self._request(method, url, data)
+        self._push_history(url, method == 'GET', source)
+
+    def _push_history(self, url, reloadable, source):
+        del self._history[self._history_index + 1:]
+        self._history.append((url, reloadable, source))
+        self._history_index = len(self._history) - 1
+        self._load(url, source)
+
+    def _load(self, url, source):
+        self.invalidate_element_cache()
+        self._url = url
+        if not source or not source.strip():
+            source = '<html></html>'
+        self._document = lxml_html.document_fromstring(source, base_url=url)
+
+    def _request(self, method, url, data=None):
+        """
+            Fetches `url`, returning the final url and the response body.
+        """
+        scheme = urlsplit(url).scheme
+
+        if scheme == 'file' or (not scheme and os.path.exists(url)):
+            path = url2pathname(urlsplit(url).path) if scheme else url
+            with open(path, 'rb') as page_file:
+                return url, page_file.read()
+
+        if scheme in ('http', 'https') and self.wsgi_app is not None:
+            return self._request_wsgi(method, url, data)
+
+        raise InvalidUrlException(
+            "The lxml driver can only open files or, if a WSGI app is "
+            "given, http urls; Couldn't open %s." % url)
+
+    def _request_wsgi(self, method, url, data=None):
+        return url, self._call_wsgi(method, url, data).body
+
+    def _call_wsgi(self, method, url, data=None, headers=None):
+        """
+            Calls the WSGI application for the given request, returning a
+            `WSGIResponse`.
+        """
+        parts = urlsplit(url)
+        body = data or b''
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': unquote(parts.path) or '/',
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': parts.hostname or 'localhost',
+            'SERVER_PORT': str(parts.port or
+                               (443 if parts.scheme == 'https' else 80)),
+            'HTTP_HOST': parts.netloc,
+            'wsgi.url_scheme': parts.scheme,
+            'wsgi.input': BytesIO(body),
+            'CONTENT_LENGTH': str(len(body)),
+        }
+        if data is not None:
+            environ['CONTENT_TYPE'] = 'application/x-www-form-urlencoded'
+        environ.update(headers or {})
+        setup_testing_defaults(environ)
+
+        response = {}
+        chunks = []
+
+        def start_response(status, response_headers, exc_info=None):
+            response['status'] = int(status.split()[0])
+            response['headers'] = list(response_headers)
+            return chunks.append
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                chunks.append(chunk)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        return WSGIResponse(response['status'], response['headers'],
+                            b''.join(chunks))
+
+    def reload(self):
+        url, reloadable, source = self._history[self._history_index]
+        if reloadable:
+            url, source = self._request('GET', url)
+            self._history[self._history_index] = (url, reloadable, source)
+        self._load(url, source)
+
+    def _load_history(self, index):
+        self._history_index = index
+        url, reloadable, source = self._history[index]
+        self._load(url, source)
+
+    def go_back(self):
+        if self._history_index > 0:
+            self._load_history(self._history_index - 1)
+
+    def go_forward(self):
+        if self._history_index < len(self._history) - 1:
+            self._load_history(self._history_index + 1)
+
+    def close(self):
+        self._reset()
+
+    def quit(self):
+        self._reset()
+
+    def clear_session(self):
+        """
+            There's no session to be cleared, as no cookies are kept.
+        """
+
+    def get_session_state(self):
+        """
+            There are no cookies nor storages, so only the url is kept.
+        """
+        return {'url': self._url, 'cookies': [], 'local_storage': {},
+                'session_storage': {}}
+
+    def restore_session_state(self, state):
+        pass
+
+    def is_element_visible(self, element):
+        element = element[0]
+        if element.get('type') == 'hidden':
+            return False
+
+        for node in [element] + list(element.iterancestors()):
+            style = node.get('style', '').replace(' ', '').lower()
+            if (node.tag in INVISIBLE_TAGS or node.get('hidden') is not None
+                    or 'display:none' in style
+                    or 'visibility:hidden' in style):
+                return False
+        return True
+
+    def get_element_text(self, element):
+        return ' '.join(element[0].text_content().split())
+
+    def snapshot_page(self, *aliases):
+        """
+            Takes the `PageSnapshot` from the parsed document, as there are no
+            scripts to run.
+        """
+        aliases, _ = self._get_selectors(aliases)
+
+        elements = []
+        for alias in aliases:
+            found = self.get_page_element(alias)
+            if not len(found):
+                elements.append(ElementSnapshot(False, False, None, 0, None,
+                                                FrozenDict()))
+                continue
+            element = found[0]
+            elements.append(ElementSnapshot(
+                True, self.is_element_visible(found),
+                self.get_element_text(found), len(found),
+                getattr(element, 'value', None), FrozenDict(element.attrib)))
+
+        return PageSnapshot(self._current_page.page_name, self.page_url,
+                            self.page_title, zip(aliases, elements))
+
+    def get_element_by_xpath(self, selector):
+        return self.document.xpath(selector)
+
+    def get_element_by_css(self, selector):
+        # Uses the translation cached when the page selectors were compiled.
+        xpath = selector_to_xpath(selector, 'css')
+        if xpath is None:
+            return self.document.cssselect(selector)
+        return self.document.xpath(xpath)
+
+    def get_element_by_id(self, selector):
+        return self.document.xpath('//*[@id=$id]', id=selector)
+
+    def get_element_by_tag(self, selector):
+        return list(self.document.iter(selector))
+
+    def get_element_by_text(self, selector):
+        return self.document.xpath('//*[text()=$text]', text=selector)
+
+    def get_element_by_name(self, selector):
+        return self.document.xpath('//*[@name=$name]', name=selector)
+
+    @element_action
+    def type(self, element, text, slowly=False):
+        element[0].value = (element[0].value or '') + text
+
+    @element_action
+    def fill(self, element, text):
+        element[0].value = text
+
+    @element_action
+    def clear(self, element):
+        self.fill(element, '')
+
+    @element_action
+    def click(self, element):
+        """
+            Follows links and submits forms, when clicking their submit
+            buttons. Checkboxes and radio buttons get checked as well.
+        """
+        element = element[0]
+        element_type = (element.get('type') or '').lower()
+
+        if element.tag == 'a' and element.get('href') is not None:
+            self.open_url(urljoin(self._url or '', element.get('href')))
+        elif element.tag == 'button' and element_type in ('', 'submit'):
+            self._submit(element)
+        elif element.tag == 'input' and element_type in ('submit', 'image'):
+            self._submit(element)
+        elif element.tag == 'input' and element_type == 'checkbox':
+            element.checked = not element.checked
+        elif element.tag == 'input' and element_type == 'radio':
+            self._check_radio(element)
+
+    def _submit(self, button):
+        """
+            Submits the form that contains `button`, as if it was clicked.
+        """
+        for form in button.iterancestors('form'):
+            break
+        else:
+            return
+
+        values = form.form_values()
+        if button.get('name'):
+            values.append((button.get('name'), button.get('value', '')))
+        query = urlencode([(_encode(name), _encode(value))
+                           for name, value in values])
+
+        action = urljoin(self._url or '', form.get('action') or '')
+        if (form.get('method') or 'GET').upper() == 'POST':
+            self._navigate(action, 'POST', _encode(query))
+        else:
+            parts = urlsplit(action)
+            self._navigate(urlunsplit(parts[:3] + (query, '')))
+
+    def _check_radio(self, radio):
+        for form in radio.iterancestors('form'):
+            group = form.inputs[radio.get('name')]
+            break
+        else:
+            group = [radio]
+
+        for other in group:
+            if other is not radio and other.get('type') == 'radio':
+                other.checked = False
+        radio.checked = True
+
+    @element_action
+    def choose(self, element, value):
+        for radio in element:
+            if radio.get('value') == value:
+                return self._check_radio(radio)
+
+    @element_action
+    def select(self, element, value):
+        element[0].value = value
+
+    @element_action
+    def select_by_text(self, element, text):
+        for option in element[0].iter('option'):
+            if ' '.join(option.text_content().split()) == text:
+                element[0].value = option.get('value', option.text_content())
+                return
+
+    @element_action
+    def check(self, element):
+        element[0].checked = True
+
+    @element_action
+    def uncheck(self, element):
+        element[0].checked = False
+
+    def wait_pageload(self, timeout=30):
+        """
+            Pages are fully loaded as soon as they're opened.
+        """
+
+    def click_and_wait(self, element, timeout=30):
+        self.click(element)
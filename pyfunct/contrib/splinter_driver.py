@@ -1,38 +1,92 @@
 # -*- coding: utf-8 -*-
 
-from functools import wraps
+import copy
+import json
+import time
+import warnings
+
+try:
+    from urlparse import urlsplit
+except ImportError:
+    from urllib.parse import urlsplit
+
 from pyfunct import config
-from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.browsers import BaseBrowserDriver, element_action
+from pyfunct.scripts import SESSION_STORAGE_SCRIPT, RESTORE_STORAGE_SCRIPT
+from pyfunct.reporting import get_reporter
 from pyfunct.exceptions import (
+    InvalidConfigurationException,
     PageNotLoadedException,
-    ActionNotPerformableException)
+    WaitTimeoutException)
+from pyfunct.waits import document_ready
 
 splinter_available = True
 
 try:
     from splinter import Browser
+    from selenium.common import exceptions as selenium_exceptions
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
 except ImportError:
     splinter_available = False
-
-
-def element_action(func):
-    """
-        Decorator that provides a shortcut for performing browser actions into
-        elements, such as click, mouse_over, etc.
-        When used, it should receive either an element or a string as the first
-        parameter (after self). If It's a string, it should be an alias to
-        a page element, and the action will be performed into this element.
-
-        It also executes `_handle_empty_element_action` before performing
-        the action.
-    """
-    @wraps(func)
-    def wrapper(self, element, *args, **kwargs):
-        if isinstance(element, str):
-            element = self.get_page_element(element)
-        self._handle_empty_element_action(element)
-        return func(self, element, *args, **kwargs)
-    return wrapper
+    RETRYABLE_EXCEPTIONS = ()
+else:
+    # Raised for elements replaced by scripts, covered by other elements or
+    # not interactable yet, which usually stop happening soon. Older selenium
+    # versions only have some of them.
+    RETRYABLE_EXCEPTIONS = tuple(
+        getattr(selenium_exceptions, name) for name in (
+            'StaleElementReferenceException',
+            'ElementClickInterceptedException',
+            'ElementNotInteractableException')
+        if hasattr(selenium_exceptions, name))
+
+# Async script that calls back as soon as the document is completely loaded,
+# listening to the `load` and `readystatechange` events instead of polling.
+PAGELOAD_SCRIPT = """
+var callback = arguments[arguments.length - 1];
+if (document.readyState === 'complete') {
+    callback(document.readyState);
+} else {
+    document.addEventListener('readystatechange', function () {
+        if (document.readyState === 'complete') {
+            callback(document.readyState);
+        }
+    });
+    window.addEventListener('load', function () {
+        callback('complete');
+    });
+}
+"""
+
+
+# Counts the DOM mutations through a `MutationObserver`, installed on the
+# first call for each document. A random document id is returned along with
+# the counter, so a new document is never taken as the same one.
+DOM_GENERATION_SCRIPT = """(function () {
+    if (window.__pyfunctDomGeneration === undefined) {
+        window.__pyfunctDocumentId = Math.random().toString(36).slice(2);
+        window.__pyfunctDomGeneration = 0;
+        new MutationObserver(function () {
+            window.__pyfunctDomGeneration += 1;
+        }).observe(document, {
+            childList: true, subtree: true, attributes: true,
+            characterData: true
+        });
+    }
+    return window.__pyfunctDocumentId + ':' + window.__pyfunctDomGeneration;
+})()"""
+
+# Firefox preferences that stop images and stylesheets from being loaded.
+FIREFOX_BLOCK_IMAGES = ('permissions.default.image', 2)
+FIREFOX_BLOCK_STYLESHEETS = ('permissions.default.stylesheet', 2)
+
+# Chrome preference that stops images from being loaded. Chrome has no such
+# preference for stylesheets, so they're blocked by url. Patterns match the
+# whole url, so the trailing `*` takes urls with a query string, such as
+# `style.css?v=123`, as well.
+CHROME_BLOCK_IMAGES = ('profile.managed_default_content_settings.images', 2)
+CHROME_STYLESHEET_URLS = ('*.css*', )
 
 
 class SplinterBrowserDriver(BaseBrowserDriver):
@@ -49,21 +103,183 @@ class SplinterBrowserDriver(BaseBrowserDriver):
 
     driver_name = 'splinter'
 
+    #: The `document.readyState` polling, used when the page load can't be
+    #: waited through events, starts with this interval (in seconds) and backs
+    #: off up to `pageload_max_poll_interval`.
+    pageload_poll_interval = 0.01
+    pageload_max_poll_interval = 0.25
+
+    #: The session script timeout (in seconds), which waiting for the page
+    #: load through events changes, and then restores, when the WebDriver
+    #: client can't tell the current one. It's the WebDriver default.
+    script_timeout = 30
+
+    retryable_exceptions = RETRYABLE_EXCEPTIONS
+
+    #: Seconds it took to launch the browser.
+    launch_time = None
+
     def __init__(self, *args, **kwargs):
-        _args = args or (config.default_browser, )
+        """
+            Launches the browser, taking the same arguments as
+            `splinter.Browser`, plus `launch_profile`, the name of one of
+            `config.launch_profiles`. It defaults to `config.launch_profile`.
+
+            The launch time is kept as `launch_time` and reported to
+            `config.report_path`, if set.
+        """
         super(SplinterBrowserDriver, self).__init__()
         if not splinter_available:
             raise ImportError(
                 "In order to use splinter Base Driver you have to install it. "
                 "Check the instructions at http://splinter.cobrateam.info")
-        self._browser = Browser(*_args, **kwargs)
 
-    def _handle_empty_element_action(self, element):
-        if not element:
-            raise ActionNotPerformableException(
-                "The action couldn't be perfomed because the element couldn't "
-                "be found; Try checking if your element"
-                "selector is correct and if the page is loaded properly.")
+        profile_name = kwargs.pop('launch_profile', None) or \
+            config.launch_profile
+        profile = self._get_launch_profile(profile_name)
+        _args = args or (profile.get('browser') or config.default_browser, )
+        # Options get arguments and preferences added, so a copy is changed,
+        # instead of the caller's options, which may be reused for other
+        # launches.
+        if kwargs.get('options') is not None:
+            kwargs['options'] = copy.deepcopy(kwargs['options'])
+
+        window_size = self._add_launch_profile(_args[0], profile, kwargs)
+        blocked_urls = self._add_resource_blocking(_args[0], kwargs)
+
+        started_at = time.time()
+        self._browser = Browser(*_args, **kwargs)
+        if window_size:
+            self._browser.driver.set_window_size(*window_size)
+        if blocked_urls:
+            self._block_urls(blocked_urls)
+        self.launch_time = time.time() - started_at
+
+        reporter = get_reporter()
+        if reporter is not None:
+            reporter.report_launch(self.driver_name, _args[0], profile_name,
+                                   self.launch_time)
+
+    def _get_launch_profile(self, profile_name):
+        if profile_name is None:
+            return {}
+        try:
+            return config.launch_profiles[profile_name]
+        except KeyError:
+            raise InvalidConfigurationException(
+                "Unknown launch profile %r; Add it to "
+                "`config.launch_profiles`." % profile_name)
+
+    def _add_launch_profile(self, browser_name, profile, kwargs):
+        """
+            Adds the `splinter.Browser` options for a launch profile. Returns
+            the window size that must be set once the browser is running, if
+            it can't be set through the options.
+
+            Profiles may have the `browser` name and these settings, that are
+            turned into the browser options, where supported:
+
+            * `headless`: runs the browser without a window.
+            * `no_sandbox`: runs Chrome without its sandbox, which often
+              doesn't work in containers.
+            * `disable_extensions`: runs Chrome without extensions. Firefox
+              profiles created by WebDriver have none already.
+            * `window_size`: a `(width, height)` tuple.
+            * `disk_cache_dir`: keeps the browser disk cache there, so it's
+              warm for the next launches.
+
+            Other settings are given to `splinter.Browser` as they are, unless
+            they're given explicitly.
+        """
+        profile = dict(profile)
+        profile.pop('browser', None)
+        headless = profile.pop('headless', False)
+        no_sandbox = profile.pop('no_sandbox', False)
+        disable_extensions = profile.pop('disable_extensions', False)
+        window_size = profile.pop('window_size', None)
+        disk_cache_dir = profile.pop('disk_cache_dir', None)
+
+        for name, value in profile.items():
+            kwargs.setdefault(name, value)
+        if headless:
+            kwargs.setdefault('headless', True)
+
+        if browser_name == 'chrome':
+            arguments = []
+            if no_sandbox:
+                arguments.append('--no-sandbox')
+            if disable_extensions:
+                arguments.append('--disable-extensions')
+            if window_size:
+                arguments.append('--window-size=%d,%d' % tuple(window_size))
+            if disk_cache_dir:
+                arguments.append('--disk-cache-dir=%s' % disk_cache_dir)
+            if arguments:
+                options = kwargs.get('options') or ChromeOptions()
+                for argument in arguments:
+                    options.add_argument(argument)
+                kwargs['options'] = options
+            return None
+
+        if browser_name == 'firefox' and disk_cache_dir:
+            preferences = dict(kwargs.get('profile_preferences') or {})
+            preferences['browser.cache.disk.parent_directory'] = \
+                disk_cache_dir
+            kwargs['profile_preferences'] = preferences
+
+        return window_size
+
+    def _add_resource_blocking(self, browser_name, kwargs):
+        """
+            Adds the `splinter.Browser` options that keep the browser from
+            loading the resources blocked by `config.blocked_urls`,
+            `config.block_images` and `config.block_stylesheets`. Returns the
+            url patterns that must be blocked once the browser is running.
+
+            Firefox can only block images and stylesheets and Chrome can
+            block all of them. Other browsers can't block resources, so a
+            warning is issued and they load everything.
+        """
+        blocked_urls = list(config.blocked_urls)
+
+        if browser_name == 'firefox':
+            preferences = dict(kwargs.get('profile_preferences') or {})
+            if config.block_images:
+                preferences.update([FIREFOX_BLOCK_IMAGES])
+            if config.block_stylesheets:
+                preferences.update([FIREFOX_BLOCK_STYLESHEETS])
+            if preferences:
+                kwargs['profile_preferences'] = preferences
+            if blocked_urls:
+                warnings.warn("Firefox can't block resources by url; "
+                              "`config.blocked_urls` is ignored.")
+            return []
+
+        if browser_name == 'chrome':
+            if config.block_images:
+                options = kwargs.get('options') or ChromeOptions()
+                preferences = dict(
+                    options.experimental_options.get('prefs') or {})
+                preferences.update([CHROME_BLOCK_IMAGES])
+                options.add_experimental_option('prefs', preferences)
+                kwargs['options'] = options
+            if config.block_stylesheets:
+                blocked_urls.extend(CHROME_STYLESHEET_URLS)
+            return blocked_urls
+
+        if blocked_urls or config.block_images or config.block_stylesheets:
+            warnings.warn("%s can't block resources; They're all loaded." %
+                          browser_name)
+        return []
+
+    def _block_urls(self, patterns):
+        """
+            Blocks requests to urls matching `patterns`, through the Chrome
+            DevTools protocol.
+        """
+        driver = self._browser.driver
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
 
     @property
     def page_url(self):
@@ -107,6 +323,9 @@ class SplinterBrowserDriver(BaseBrowserDriver):
     def get_element_by_text(self, selector):
         return self._browser.find_by_text(selector)
 
+    def get_element_by_name(self, selector):
+        return self._browser.find_by_name(selector)
+
     @element_action
     def type(self, element, text, slowly=False):
         return element.type(text, slowly)
@@ -161,6 +380,9 @@ class SplinterBrowserDriver(BaseBrowserDriver):
     def go_forward(self):
         return self._browser.forward()
 
+    def get_dom_generation(self):
+        return self.execute_javascript(DOM_GENERATION_SCRIPT)
+
     def execute_script(self, script):
         """This method is deprecated. Use `execute_javascript` instead.
         """
@@ -169,6 +391,27 @@ class SplinterBrowserDriver(BaseBrowserDriver):
     def execute_javascript(self, script):
         return self._browser.evaluate_script(script)
 
+    def get_webdriver_session(self):
+        """
+            Returns what is needed for attaching to the browser WebDriver
+            session from another process, as `AttachedBrowserDriver` does.
+        """
+        driver = self._browser.driver
+        return {
+            'session_id': driver.session_id,
+            'executor_url': driver.command_executor._url,
+            'w3c': driver.w3c,
+        }
+
+    def get_screenshot(self):
+        return self._browser.driver.get_screenshot_as_png()
+
+    def get_console_log(self):
+        """
+            Only some browsers, like Chrome, provide the console log.
+        """
+        return self._browser.driver.get_log('browser')
+
     def get_iframe(self, iframe_id):
         return self._browser.get_iframe(iframe_id)
 
@@ -179,15 +422,47 @@ class SplinterBrowserDriver(BaseBrowserDriver):
         return self._browser.attach_file(input_name, file_path)
 
     def wait_pageload(self, timeout=30):
-        wait_interval = 0.05
-        elapsed = 0
-
-        while self.execute_javascript('document.readyState') != 'complete':
-            self.wait(wait_interval)
-            elapsed += wait_interval
-
-            if elapsed > timeout:
-                raise PageNotLoadedException
+        """
+            Waits for the page load through the `load` and `readystatechange`
+            events, in a single async script. If it can't be done, because
+            the browser doesn't support async scripts or the document was
+            replaced while waiting, it falls back to polling
+            `document.readyState`.
+        """
+        deadline = time.time() + timeout
+
+        if self._wait_pageload_event(timeout) == 'complete':
+            return
+
+        try:
+            self.wait_for(document_ready(), timeout,
+                          interval=self.pageload_poll_interval, backoff=2,
+                          max_interval=self.pageload_max_poll_interval,
+                          deadline=deadline)
+        except WaitTimeoutException:
+            raise PageNotLoadedException
+
+    def _wait_pageload_event(self, timeout):
+        driver = self._browser.driver
+        # Only selenium 4 clients tell the current timeout.
+        try:
+            script_timeout = driver.timeouts.script
+        except (AttributeError, WebDriverException):
+            script_timeout = None
+        if not isinstance(script_timeout, (int, float)):
+            script_timeout = self.script_timeout
+
+        try:
+            driver.set_script_timeout(timeout)
+            return driver.execute_async_script(PAGELOAD_SCRIPT)
+        except (AttributeError, WebDriverException):
+            return None
+        finally:
+            # Later `execute_async_script` calls expect the usual timeout.
+            try:
+                driver.set_script_timeout(script_timeout)
+            except (AttributeError, WebDriverException):
+                pass
 
     def click_and_wait(self, element, timeout=30):
         self.click(element)
@@ -195,3 +470,30 @@ class SplinterBrowserDriver(BaseBrowserDriver):
 
     def clear_session(self):
         self._browser.driver.delete_all_cookies()
+
+    def get_session_state(self):
+        url, local_storage, session_storage = self.execute_javascript(
+            SESSION_STORAGE_SCRIPT)
+        return {
+            'url': url,
+            'cookies': self._browser.driver.get_cookies(),
+            'local_storage': local_storage,
+            'session_storage': session_storage,
+        }
+
+    def restore_session_state(self, state):
+        """
+            Storages are restored in a single script, but WebDriver adds
+            cookies one at a time, as `HttpOnly` cookies can't be set from
+            scripts.
+        """
+        if urlsplit(self.page_url or '')[:2] != urlsplit(state['url'])[:2]:
+            self.open_url(state['url'])
+
+        driver = self._browser.driver
+        driver.delete_all_cookies()
+        for cookie in state['cookies']:
+            driver.add_cookie(cookie)
+
+        self.execute_javascript(RESTORE_STORAGE_SCRIPT % json.dumps(
+            [state['local_storage'], state['session_storage']]))
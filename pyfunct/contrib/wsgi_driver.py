@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+from importlib import import_module
+
+try:
+    from cookielib import Cookie, CookieJar
+    from urllib2 import Request
+    from urlparse import urljoin
+except ImportError:
+    from http.cookiejar import Cookie, CookieJar
+    from urllib.request import Request
+    from urllib.parse import urljoin
+
+from pyfunct import config
+from pyfunct.contrib.lxml_driver import LxmlBrowserDriver
+from pyfunct.exceptions import (
+    InvalidConfigurationException,
+    PageNotLoadedException)
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# `Cookie` attributes kept by `get_session_state`.
+COOKIE_ATTRIBUTES = ('version', 'name', 'value', 'port', 'port_specified',
+                     'domain', 'domain_specified', 'domain_initial_dot',
+                     'path', 'path_specified', 'secure', 'expires', 'discard',
+                     'comment', 'comment_url', 'rfc2109')
+
+
+def load_wsgi_app(wsgi_app):
+    """
+        Returns the WSGI app for `wsgi_app`, which may be the app itself or
+        an import path, as in `'myproject.wsgi:application'`.
+    """
+    if not isinstance(wsgi_app, str):
+        return wsgi_app
+
+    module_name, _, app_name = wsgi_app.partition(':')
+    return getattr(import_module(module_name), app_name or 'application')
+
+
+class CookieResponse(object):
+    """
+        Exposes the headers of a `WSGIResponse` the way `CookieJar` expects
+        to get them from a response.
+    """
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def info(self):
+        return self
+
+    def getheaders(self, name):
+        return [value for header, value in self.headers
+                if header.lower() == name.lower()]
+
+    def get_all(self, name, default=None):
+        return self.getheaders(name) or default
+
+
+class WSGIBrowserDriver(LxmlBrowserDriver):
+    """
+        This is a BrowserDriver that calls a WSGI application straight from
+        the test process, with no browser, server or sockets involved. Pages
+        are parsed with lxml, as done by `LxmlBrowserDriver`, so it doesn't
+        run JavaScript either.
+
+        It keeps the cookies set by the application, until `clear_session` is
+        called, and follows redirects.
+
+        The application is taken from `config.wsgi_app`, unless `wsgi_app`
+        is given. It can be the application itself or its import path::
+
+            class MyConfig(BaseConfig):
+                default_driver_name = 'wsgi'
+                wsgi_app = 'myproject.wsgi:application'
+    """
+
+    driver_name = 'wsgi'
+
+    #: Requests fail after following this number of redirects.
+    max_redirects = 10
+
+    def __init__(self, wsgi_app=None):
+        # Read from the class dict, so plain functions set as the config
+        # attribute don't turn into unbound methods.
+        wsgi_app = load_wsgi_app(wsgi_app or vars(config).get('wsgi_app'))
+        if wsgi_app is None:
+            raise InvalidConfigurationException(
+                "The wsgi driver needs a WSGI app. Set it as "
+                "`config.wsgi_app`.")
+
+        super(WSGIBrowserDriver, self).__init__(wsgi_app)
+        self.cookies = CookieJar()
+
+    def _request_wsgi(self, method, url, data=None):
+        for _ in range(self.max_redirects + 1):
+            request = Request(url)
+            self.cookies.add_cookie_header(request)
+            headers = {}
+            if request.get_header('Cookie'):
+                headers['HTTP_COOKIE'] = request.get_header('Cookie')
+
+            response = self._call_wsgi(method, url, data, headers)
+            self.cookies.extract_cookies(CookieResponse(response.headers),
+                                         request)
+
+            location = dict((name.lower(), value)
+                            for name, value in response.headers
+                            ).get('location')
+            if response.status not in REDIRECT_STATUSES or not location:
+                return url, response.body
+
+            url = urljoin(url, location)
+            if response.status not in (307, 308):
+                method, data = 'GET', None
+
+        raise PageNotLoadedException(
+            "Too many redirects; Stopped at %s." % url)
+
+    def clear_session(self):
+        self.cookies.clear()
+
+    def get_session_state(self):
+        state = super(WSGIBrowserDriver, self).get_session_state()
+        state['cookies'] = [
+            dict((name, getattr(cookie, name)) for name in COOKIE_ATTRIBUTES)
+            for cookie in self.cookies]
+        return state
+
+    def restore_session_state(self, state):
+        self.cookies.clear()
+        for cookie in state['cookies']:
+            self.cookies.set_cookie(Cookie(rest={}, **cookie))
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import socket
+import argparse
+import threading
+from importlib import import_module
+
+try:
+    from SocketServer import StreamRequestHandler, ThreadingUnixStreamServer
+except ImportError:
+    from socketserver import StreamRequestHandler, ThreadingUnixStreamServer
+
+from pyfunct.pool import BrowserPool
+from pyfunct.context import config
+from pyfunct.exceptions import BrowserDaemonException
+from pyfunct.utils import owned_by_user, user_temp_path
+
+
+def default_socket_path():
+    """
+        Returns `config.daemon_socket` or, if it isn't set, `daemon.sock` in
+        a `pyfunct-<user id>` directory of the temporary directory, which
+        only the user can access.
+    """
+    return config.daemon_socket or user_temp_path('daemon.sock')
+
+
+class BrowserDaemon(object):
+    """
+        Keeps WebDriver browser sessions alive between test runs, handing
+        them out through a local socket to `AttachedBrowserDriver`, so tests
+        don't wait for browsers to be launched. For example::
+
+            python -m pyfunct.daemon --size 2 --config myproject.tests.config
+
+        Browsers are launched by a `BrowserPool`, for `driver_name`, and are
+        recycled after `config.browser_max_uses` uses or
+        `config.browser_max_age` seconds. When a browser is handed out, it's
+        checked to be still working, being replaced otherwise, and it's reset
+        to a blank page with a clear session. A browser is handed back as
+        soon as the connection it was handed out through is closed, even if
+        the test process is killed.
+
+        Browser sessions, with their cookies, are handed out to anyone who
+        can connect, so the socket is only accessible by the user running
+        the daemon.
+
+        The protocol is a JSON object per line, having the `command` and
+        getting a JSON object with `ok` back. Commands are `checkout`, which
+        returns the WebDriver session of a browser, `status` and `shutdown`.
+    """
+
+    def __init__(self, socket_path=None, size=1, driver_name='splinter'):
+        self.socket_path = socket_path or default_socket_path()
+        self.driver_name = driver_name
+        self.pool = BrowserPool(size=size)
+        self._server = None
+        self._lock = threading.Lock()
+        self.checked_out = 0
+
+    def checkout(self):
+        """
+            Returns a working browser from the pool, reset for a new test
+            run.
+        """
+        while True:
+            browser = self.pool.checkout(self.driver_name)
+            try:
+                # Crashed browsers and expired sessions fail on any command.
+                browser.page_url
+                browser.clear_session()
+                browser.open_url('about:blank')
+            except Exception:
+                self.pool.discard(browser)
+                continue
+
+            with self._lock:
+                self.checked_out += 1
+            return browser
+
+    def checkin(self, browser):
+        with self._lock:
+            self.checked_out -= 1
+        try:
+            self.pool.checkin(browser)
+        except Exception:
+            self.pool.discard(browser)
+
+    def status(self):
+        return {'idle': self.pool.idle_count(self.driver_name),
+                'checked_out': self.checked_out}
+
+    def serve_forever(self):
+        """
+            Launches the browsers and serves them until `shutdown` is
+            called, or the `shutdown` command is received.
+        """
+        self._prepare_socket_path()
+
+        self.pool.warm(self.driver_name)
+        # The umask makes the socket private from the start, without a window
+        # before the `chmod` where other users could connect.
+        umask = os.umask(0o077)
+        try:
+            self._server = ThreadingUnixStreamServer(self.socket_path,
+                                                     DaemonRequestHandler)
+        finally:
+            os.umask(umask)
+        os.chmod(self.socket_path, 0o600)
+        self._server.daemon_threads = True
+        self._server.browser_daemon = self
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.pool.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def _prepare_socket_path(self):
+        """
+            Creates the directory of the socket, only accessible by the user,
+            and removes a socket file left by a daemon that didn't exit
+            cleanly, which would make binding fail. Raises
+            `BrowserDaemonException` if another daemon is listening on it.
+        """
+        directory = os.path.dirname(self.socket_path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        if self.socket_path == default_socket_path() and \
+                not owned_by_user(directory):
+            raise BrowserDaemonException(
+                "%s belongs to another user; Set `config.daemon_socket` to "
+                "a path of yours." % directory)
+
+        if not os.path.exists(self.socket_path):
+            return
+        try:
+            DaemonClient(self.socket_path, timeout=5).close()
+        except BrowserDaemonException:
+            os.remove(self.socket_path)
+        else:
+            raise BrowserDaemonException(
+                "A browser daemon is already listening at %s; Stop it with "
+                "`python -m pyfunct.daemon --stop`." % self.socket_path)
+
+    def shutdown(self):
+        # `serve_forever` waits for this, so it can't be called from the
+        # thread serving a request.
+        threading.Thread(target=self._server.shutdown).start()
+
+
+class DaemonRequestHandler(StreamRequestHandler):
+    """
+        Serves the commands of a connection to the `BrowserDaemon`. The
+        browser checked out through a connection is checked in when it's
+        closed.
+    """
+
+    def handle(self):
+        browser_daemon = self.server.browser_daemon
+        browser = None
+
+        try:
+            for line in iter(self.rfile.readline, b''):
+                try:
+                    request = json.loads(line.decode('utf-8'))
+                    command = request.get('command')
+                    if command == 'checkout' and browser is None:
+                        browser = browser_daemon.checkout()
+                        response = dict(browser.get_webdriver_session(),
+                                        ok=True)
+                    elif command == 'status':
+                        response = dict(browser_daemon.status(), ok=True)
+                    elif command == 'shutdown':
+                        browser_daemon.shutdown()
+                        response = {'ok': True}
+                    else:
+                        response = {'ok': False,
+                                    'error': "Unknown command %r." % command}
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+
+                self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+                self.wfile.flush()
+        finally:
+            if browser is not None:
+                browser_daemon.checkin(browser)
+
+
+class DaemonClient(object):
+    """
+        Connection to a `BrowserDaemon`. A browser checked out through it is
+        handed back to the daemon when the connection is closed.
+    """
+
+    def __init__(self, socket_path=None, timeout=60):
+        self.socket_path = socket_path or default_socket_path()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(self.socket_path)
+        except socket.error:
+            self._socket.close()
+            raise BrowserDaemonException(
+                "No browser daemon is listening at %s; Start it with "
+                "`python -m pyfunct.daemon`." % self.socket_path)
+        self._file = self._socket.makefile('rwb')
+
+    def request(self, command, **arguments):
+        """
+            Sends a command and returns the response, raising
+            `BrowserDaemonException` if it failed.
+        """
+        arguments['command'] = command
+        self._file.write(json.dumps(arguments).encode('utf-8') + b'\n')
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise BrowserDaemonException("The browser daemon went away.")
+        response = json.loads(line.decode('utf-8'))
+        if not response.pop('ok'):
+            raise BrowserDaemonException(response['error'])
+        return response
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+
+def main(argv=None):
+    """
+        Command line entry point. For example::
+
+            python -m pyfunct.daemon --size 2 --config myproject.tests.config
+            python -m pyfunct.daemon --status
+            python -m pyfunct.daemon --stop
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m pyfunct.daemon',
+        description='Keeps browsers running between test runs, for the '
+                    '`attached` driver.')
+    parser.add_argument('-s', '--socket', default=None,
+                        help='Socket path. Defaults to '
+                             '`config.daemon_socket`.')
+    parser.add_argument('-n', '--size', type=int, default=1,
+                        help='Number of browsers launched upfront.')
+    parser.add_argument('-d', '--driver', default='splinter',
+                        help='Driver name of the browsers.')
+    parser.add_argument('-c', '--config', default=None,
+                        help='Module defining the project `BaseConfig`, as '
+                             'in `myproject.tests.config`. It is imported '
+                             'before the browsers are launched.')
+    parser.add_argument('-b', '--browser', default=None,
+                        help='Browser launched by the splinter driver. '
+                             'Defaults to `config.default_browser`.')
+    parser.add_argument('-p', '--launch-profile', default=None,
+                        help='One of `config.launch_profiles`. Defaults to '
+                             '`config.launch_profile`.')
+    parser.add_argument('--status', action='store_true',
+                        help='Prints the status of the running daemon.')
+    parser.add_argument('--stop', action='store_true',
+                        help='Stops the running daemon.')
+    args = parser.parse_args(argv)
+
+    # Config classes are applied as they're defined, so importing the
+    # module is enough.
+    if args.config:
+        import_module(args.config)
+    if args.browser:
+        config.default_browser = args.browser
+    if args.launch_profile:
+        config.launch_profile = args.launch_profile
+
+    if args.status or args.stop:
+        try:
+            client = DaemonClient(args.socket)
+            response = client.request('shutdown' if args.stop else 'status')
+            client.close()
+        except BrowserDaemonException as e:
+            sys.stderr.write('%s\n' % e)
+            return 1
+        if args.status:
+            sys.stdout.write('%(idle)d idle and %(checked_out)d checked out '
+                             'browsers\n' % response)
+        return 0
+
+    BrowserDaemon(args.socket, args.size, args.driver).serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
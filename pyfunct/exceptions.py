@@ -15,6 +15,12 @@ class SelectorTypeNotSupportedException(Exception):
     """
 
 
+class InvalidSelectorException(Exception):
+    """
+    Exception raised when an element selector can't be parsed.
+    """
+
+
 class InvalidUrlException(Exception):
     """
     Exception raised when the url doesn't follow the expected pattern.
@@ -44,3 +50,33 @@ class ExistentElementException(Exception):
     Exception raised when trying to register duplicated elements in the
     same page.
     """
+
+
+class WaitTimeoutException(Exception):
+    """
+    Exception raised when a waited condition isn't satisfied before the
+    timeout. The `WaitTiming` for the wait is available as `timing`.
+    """
+
+    def __init__(self, message=None, timing=None):
+        super(WaitTimeoutException, self).__init__(message)
+        self.timing = timing
+
+
+class FanOutException(Exception):
+    """
+    Exception raised when a callable run for many browsers at once fails for
+    some of them. The `FanOutResults` of every browser are available as
+    `results`.
+    """
+
+    def __init__(self, message=None, results=None):
+        super(FanOutException, self).__init__(message)
+        self.results = results
+
+
+class BrowserDaemonException(Exception):
+    """
+    Exception raised when the browser daemon can't be reached or can't hand
+    out a browser.
+    """
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import threading
+import traceback
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+from pyfunct.actions import Actions
+from pyfunct.exceptions import FanOutException
+
+#: Outcome of a callable run for a browser by `BrowserGroup`: the browser,
+#: the returned value and, if it raised, the exception and its formatted
+#: traceback.
+FanOutResult = namedtuple('FanOutResult',
+                          'browser value exception traceback')
+
+
+class BrokenBarrierError(RuntimeError):
+    """
+        Raised by `Barrier.wait` when another browser failed or the wait
+        timed out, so the step can't be completed by every browser.
+    """
+
+
+class Barrier(object):
+    """
+        Makes `parties` threads wait for each other, as
+        `threading.Barrier` does on Python 3. If one of them fails, the
+        barrier is broken and the threads waiting on it raise
+        `BrokenBarrierError`, instead of waiting forever.
+    """
+
+    def __init__(self, parties, timeout=None):
+        self.parties = parties
+        self.timeout = timeout
+        self.broken = False
+        self._waiting = 0
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    def wait(self, timeout=None):
+        timeout = timeout if timeout is not None else self.timeout
+        with self._condition:
+            if self.broken:
+                raise BrokenBarrierError
+            generation = self._generation
+            self._waiting += 1
+
+            if self._waiting == self.parties:
+                self._waiting = 0
+                self._generation += 1
+                self._condition.notify_all()
+                return
+
+            deadline = None if timeout is None else time.time() + timeout
+            while self._generation == generation and not self.broken:
+                remaining = None if deadline is None else \
+                    deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    self._break()
+                    break
+                self._condition.wait(remaining)
+
+            if self._generation == generation:
+                raise BrokenBarrierError
+
+    def abort(self):
+        """
+            Breaks the barrier, waking up the threads waiting on it.
+        """
+        with self._condition:
+            self._break()
+
+    def _break(self):
+        self.broken = True
+        self._condition.notify_all()
+
+
+class FanOutResults(list):
+    """
+        List of the `FanOutResult` of each browser, in the browsers order.
+    """
+
+    @property
+    def values(self):
+        return [result.value for result in self]
+
+    @property
+    def failures(self):
+        return [result for result in self if result.exception is not None]
+
+    def raise_for_failures(self):
+        """
+            Raises `FanOutException` if the callable failed for any browser.
+        """
+        failures = self.failures
+        if failures:
+            raise FanOutException(
+                "Failed for %d of %d browsers:\n%s" % (
+                    len(failures), len(self),
+                    '\n'.join(result.traceback for result in failures)),
+                self)
+        return self
+
+
+class BrowserGroup(object):
+    """
+        Runs callables or actions for many browsers at once, each browser in
+        its own thread. For example::
+
+            browsers = [self.create_browser() for _ in range(10)]
+            with BrowserGroup(browsers) as group:
+                group.map('login', users)
+                group.run(lambda browser: browser.open_page('document'))
+                results = group.run('type_paragraph')
+
+        `run` waits for every browser, so each call is a step that starts
+        once the previous one is done. Callables can also wait for the other
+        browsers within a step through `wait`.
+
+        Exceptions are collected per browser, in the `FanOutResults`. Unless
+        `raise_errors` is `False`, `FanOutException` is raised after the step
+        if any browser failed.
+
+        The threads are stopped by `close`, which is called when the `with`
+        block ends.
+    """
+
+    def __init__(self, browsers, raise_errors=True, barrier_timeout=60):
+        self.browsers = list(browsers)
+        self.raise_errors = raise_errors
+        self.barrier_timeout = barrier_timeout
+        self._barrier = None
+        self._pool = ThreadPool(len(self.browsers) or 1)
+
+    def _resolve(self, func):
+        """
+            Gets the registered action named `func`, if it's a string.
+        """
+        if isinstance(func, str):
+            return getattr(Actions(), func)
+        return func
+
+    def _call(self, func, browser, args, kwargs):
+        try:
+            return FanOutResult(browser, func(browser, *args, **kwargs),
+                                None, None)
+        except Exception:
+            self._barrier.abort()
+            return FanOutResult(browser, None, sys.exc_info()[1],
+                                traceback.format_exc())
+
+    def _run_calls(self, calls):
+        self._barrier = Barrier(len(calls), self.barrier_timeout)
+        try:
+            async_results = [
+                self._pool.apply_async(self._call,
+                                       (func, browser, args, kwargs))
+                for func, browser, args, kwargs in calls]
+            results = FanOutResults(result.get() for result in async_results)
+        finally:
+            self._barrier = None
+
+        if self.raise_errors:
+            results.raise_for_failures()
+        return results
+
+    def run(self, func, *args, **kwargs):
+        """
+            Calls `func(browser, *args, **kwargs)` for every browser at once,
+            returning their `FanOutResults`. `func` may be an action name.
+        """
+        func = self._resolve(func)
+        return self._run_calls([(func, browser, args, kwargs)
+                                for browser in self.browsers])
+
+    def map(self, func, values):
+        """
+            Calls `func(browser, value)` for every browser at once, each one
+            getting its own value, such as the user it should log in as.
+        """
+        func = self._resolve(func)
+        values = list(values)
+        if len(values) != len(self.browsers):
+            raise ValueError("Expected %d values, one for each browser; Got "
+                             "%d." % (len(self.browsers), len(values)))
+        return self._run_calls([(func, browser, (value, ), {})
+                                for browser, value in zip(self.browsers,
+                                                          values)])
+
+    def wait(self, timeout=None):
+        """
+            Blocks the calling browser thread until every browser in the
+            step calls it. Raises `BrokenBarrierError` if a browser failed or
+            `timeout` (by default, `barrier_timeout`) seconds go by.
+        """
+        barrier = self._barrier
+        if barrier is None:
+            raise RuntimeError(
+                "`wait` can only be called by the callables of a step, run "
+                "through `run` or `map`.")
+        barrier.wait(timeout)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
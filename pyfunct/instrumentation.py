@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from bisect import bisect_left
+from functools import wraps
+from collections import namedtuple
+
+#: Timing of a browser driver call: the driver name, the method called, the
+#: current page name and the element alias (if any), how long it took (in
+#: seconds) and its depth, as calls made by other driver calls, such as the
+#: finder called by `click('search button')`, have a depth greater than 0.
+CallRecord = namedtuple('CallRecord',
+                        'driver method page alias duration depth')
+
+# Driver methods that are timed. `BrowserDriverMetaclass` wraps them on every
+# browser driver.
+INSTRUMENTED_METHODS = (
+    'switch_page', 'open_page', 'open_url', 'reload', 'go_back', 'go_forward',
+    'get_page_element', 'get_page_elements_state', 'snapshot_page',
+    'get_element', 'get_element_by_xpath', 'get_element_by_css',
+    'get_element_by_id', 'get_element_by_tag', 'get_element_by_text',
+    'get_element_by_name',
+    'is_element_present', 'is_element_visible', 'get_element_text',
+    'click', 'choose', 'select', 'select_by_text', 'check', 'uncheck',
+    'mouse_over', 'mouse_out', 'type', 'fill', 'clear', 'attach_file',
+    'execute_javascript', 'wait', 'wait_for', 'wait_pageload',
+    'click_and_wait', 'clear_session',
+)
+
+# Methods whose first argument may be a page element alias.
+ALIAS_METHODS = (
+    'get_page_element', 'is_element_present', 'click', 'choose', 'select',
+    'select_by_text', 'check', 'uncheck', 'mouse_over', 'mouse_out', 'type',
+    'fill', 'clear', 'click_and_wait',
+)
+
+# Upper bounds (in seconds) of the `LatencyHistogram` buckets.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10, 30)
+
+# Callables that get the `CallRecord` of every instrumented call. Calls are
+# only timed while there are listeners.
+CALL_LISTENERS = []
+
+
+def add_call_listener(listener):
+    """
+        Makes `listener` get the `CallRecord` of every browser driver call.
+    """
+    CALL_LISTENERS.append(listener)
+
+
+def remove_call_listener(listener):
+    """
+        Stops `listener` from getting `CallRecord`s, if it was getting them.
+    """
+    if listener in CALL_LISTENERS:
+        CALL_LISTENERS.remove(listener)
+
+
+def instrumented(func):
+    """
+        Decorator that times browser driver methods, passing their
+        `CallRecord` to the `CALL_LISTENERS`.
+    """
+    method_name = func.__name__
+    takes_alias = method_name in ALIAS_METHODS
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not CALL_LISTENERS:
+            return func(self, *args, **kwargs)
+
+        # Aliases of the calls in progress, so nested calls know the element
+        # they're working on.
+        calls = self.__dict__.setdefault('_instrumented_calls', [])
+        if takes_alias and args and isinstance(args[0], str):
+            alias = args[0]
+        else:
+            alias = calls[-1] if calls else None
+
+        calls.append(alias)
+        start = time.time()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            duration = time.time() - start
+            calls.pop()
+            page = getattr(self._current_page, 'page_name', None)
+            record = CallRecord(self.driver_name, method_name, page, alias,
+                                duration, len(calls))
+            for listener in list(CALL_LISTENERS):
+                listener(record)
+    return wrapper
+
+
+class LatencyHistogram(object):
+    """
+        Counts durations in the `LATENCY_BUCKETS`, keeping their total and
+        maximum.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """
+            Returns the upper bound of the bucket holding the given
+            percentile, or the maximum duration for the last bucket.
+        """
+        target = self.count * percent / 100.0
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'buckets': self.buckets,
+        }
+
+
+class CallStatistics(object):
+    """
+        Call listener that aggregates `CallRecord`s into latency histograms
+        by driver method, by page and by page element. For example::
+
+            stats = CallStatistics()
+            add_call_listener(stats)
+            browser.open_page('wikipedia index')
+            browser.click('search button')
+            remove_call_listener(stats)
+
+            stats.slowest(5)
+
+        Pages and elements only take the outermost calls into account, so
+        the time of nested calls isn't counted twice.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = []
+        self.by_method = {}
+        self.by_page = {}
+        self.by_element = {}
+
+    def __call__(self, record):
+        with self._lock:
+            self.records.append(record)
+            self._add(self.by_method, record.method, record.duration)
+            if record.depth == 0:
+                self._add(self.by_page, record.page, record.duration)
+                if record.alias is not None:
+                    self._add(self.by_element, (record.page, record.alias),
+                              record.duration)
+
+    def _add(self, histograms, key, duration):
+        try:
+            histogram = histograms[key]
+        except KeyError:
+            histogram = histograms[key] = LatencyHistogram()
+        histogram.add(duration)
+
+    def slowest(self, count=10):
+        """
+            Returns the `count` slowest outermost calls.
+        """
+        calls = [record for record in self.records if record.depth == 0]
+        return sorted(calls, key=lambda record: record.duration,
+                      reverse=True)[:count]
+
+    def as_dict(self):
+        """
+            Returns the statistics as a dict that can be JSON encoded.
+        """
+        return {
+            'methods': dict((method, histogram.as_dict())
+                            for method, histogram in self.by_method.items()),
+            'pages': dict((str(page), histogram.as_dict())
+                          for page, histogram in self.by_page.items()),
+            'elements': [
+                dict(histogram.as_dict(), page=page, alias=alias)
+                for (page, alias), histogram in sorted(
+                    self.by_element.items(),
+                    key=lambda item: item[1].total, reverse=True)],
+            'slowest': [record._asdict() for record in self.slowest()],
+        }
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+import json
+import unittest
+from collections import namedtuple, OrderedDict
+
+from pyfunct.context import config
+
+#: What a previous run recorded about a test: the pages it opened, in order,
+#: and how long it took.
+RecordedTest = namedtuple('RecordedTest', 'pages duration')
+
+
+def iter_tests(suite):
+    """
+        Flattens a test suite, yielding every test case from it.
+    """
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            for nested_test in iter_tests(test):
+                yield nested_test
+        else:
+            yield test
+
+
+def load_test_history(path):
+    """
+        Reads the test records of a `config.report_path` file, returning a
+        dict of `RecordedTest` by test id. As reports are appended to, a test
+        may show up many times, in which case the latest record is kept.
+    """
+    history = {}
+    try:
+        report = open(path)
+    except (IOError, OSError):
+        return history
+
+    with report:
+        for line in report:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Lines may be cut short if a run was killed while writing.
+                continue
+            if record.get('type') == 'test':
+                history[record['test']] = RecordedTest(
+                    record.get('pages') or [], record.get('duration') or 0)
+    return history
+
+
+class _Unit(object):
+    """
+        A test, a test case class or a module, as ordered by `chain_units`.
+    """
+
+    def __init__(self, index, tests, first_page, last_page, duration):
+        self.index = index
+        self.tests = tests
+        self.first_page = first_page
+        self.last_page = last_page
+        self.duration = duration
+
+
+def chain_units(units):
+    """
+        Orders units so each one starts on the page the previous one ended
+        on, whenever possible. Otherwise, the next unit is taken from the
+        page most units start on. Among the candidates, units that also end
+        on their starting page come first, then the longest ones, so the
+        runner workers start with the slowest tests. Units without history
+        go last, in their original order.
+    """
+    remaining = [unit for unit in units if unit.first_page is not None]
+    unknown = [unit for unit in units if unit.first_page is None]
+    ordered = []
+    current_page = None
+
+    while remaining:
+        candidates = [unit for unit in remaining
+                      if unit.first_page == current_page]
+        if not candidates:
+            starts = {}
+            for unit in remaining:
+                starts[unit.first_page] = starts.get(unit.first_page, 0) + 1
+            most_started = max(starts.values())
+            candidates = [unit for unit in remaining
+                          if starts[unit.first_page] == most_started]
+
+        unit = min(candidates, key=lambda unit: (
+            unit.last_page != unit.first_page, -unit.duration, unit.index))
+        remaining.remove(unit)
+        ordered.append(unit)
+        current_page = unit.last_page
+
+    return ordered + unknown
+
+
+def _combine(index, units):
+    """
+        Builds the unit of a group of ordered units.
+    """
+    known = [unit for unit in units if unit.first_page is not None]
+    return _Unit(
+        index,
+        [test for unit in units for test in unit.tests],
+        known[0].first_page if known else None,
+        known[-1].last_page if known else None,
+        sum(unit.duration for unit in units))
+
+
+def order_by_page_locality(suite, history):
+    """
+        Returns a flat suite with the tests from `suite` ordered by the pages
+        they opened according to `history`, so tests that start on the same
+        page run next to each other, reusing the loaded page when
+        `config.navigation_policy` allows it.
+
+        Tests are ordered within their class, and classes within their
+        module, so class and module fixtures still run once. Modules are
+        ordered as well, by the pages their first and last tests open.
+    """
+    modules = OrderedDict()
+    for test in iter_tests(suite):
+        test_class = test.__class__
+        classes = modules.setdefault(test_class.__module__, OrderedDict())
+        classes.setdefault(test_class, []).append(test)
+
+    module_units = []
+    for module_index, classes in enumerate(modules.values()):
+        class_units = []
+        for class_index, tests in enumerate(classes.values()):
+            test_units = []
+            for test_index, test in enumerate(tests):
+                recorded = history.get(test.id())
+                if recorded is not None and recorded.pages:
+                    test_units.append(_Unit(
+                        test_index, [test], recorded.pages[0],
+                        recorded.pages[-1], recorded.duration))
+                else:
+                    duration = recorded.duration if recorded else 0
+                    test_units.append(_Unit(test_index, [test], None, None,
+                                            duration))
+            class_units.append(_combine(class_index,
+                                        chain_units(test_units)))
+        module_units.append(_combine(module_index, chain_units(class_units)))
+
+    return unittest.TestSuite(test for unit in chain_units(module_units)
+                              for test in unit.tests)
+
+
+class PageLocalityTestLoader(unittest.TestLoader):
+    """
+        Test loader that orders the loaded tests through
+        `order_by_page_locality`. The history is read from `history_path`,
+        which defaults to `config.test_history_path` or, if it isn't set, to
+        `config.report_path`. Tests are kept in the usual order when there's
+        no history. For example::
+
+            unittest.main(testLoader=PageLocalityTestLoader())
+    """
+
+    def __init__(self, history_path=None):
+        super(PageLocalityTestLoader, self).__init__()
+        self.history_path = history_path
+        self._history = None
+
+    @property
+    def history(self):
+        if self._history is None:
+            path = (self.history_path or config.test_history_path or
+                    config.report_path)
+            self._history = load_test_history(path) if path else {}
+        return self._history
+
+    def _order(self, suite):
+        if not self.history:
+            return suite
+        return order_by_page_locality(suite, self.history)
+
+    def loadTestsFromTestCase(self, *args, **kwargs):
+        return self._order(super(PageLocalityTestLoader,
+                                 self).loadTestsFromTestCase(*args, **kwargs))
+
+    def loadTestsFromModule(self, *args, **kwargs):
+        return self._order(super(PageLocalityTestLoader,
+                                 self).loadTestsFromModule(*args, **kwargs))
+
+    def loadTestsFromNames(self, *args, **kwargs):
+        return self._order(super(PageLocalityTestLoader,
+                                 self).loadTestsFromNames(*args, **kwargs))
+
+    def discover(self, *args, **kwargs):
+        return self._order(super(PageLocalityTestLoader,
+                                 self).discover(*args, **kwargs))
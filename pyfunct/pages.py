@@ -1,9 +1,254 @@
 # -*- coding: utf-8 -*-
 
+import json
+from collections import namedtuple
+from importlib import import_module
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from pyfunct.context import config
 from pyfunct.exceptions import SelectorTypeNotSupportedException, \
-     ExistentElementException
+     ExistentElementException, InvalidSelectorException
+
+# Selection types pages can use. Browser drivers find elements of each one
+# through their `selection_methods`.
+SELECTION_TYPES = ('xpath', 'css', 'id', 'tag', 'text', 'name')
+
+#: A page element selector, checked when the page is created. `xpath` is the
+#: equivalent XPath expression for xpath and css selectors, when lxml and
+#: cssselect are available for parsing them.
+CompiledSelector = namedtuple(
+    'CompiledSelector', 'alias selector selection_type xpath')
+
+# Selectors are parsed once per process. lxml and cssselect are optional and
+# only imported when the first selector is parsed.
+_xpaths = {}
+_parsers = {}
+
+
+def _get_parsers():
+    if not _parsers:
+        _parsers['xpath'] = _parsers['css'] = None
+        _parsers['errors'] = ()
+        try:
+            from lxml import etree
+            _parsers['xpath'] = etree.XPath
+            _parsers['errors'] += (etree.XPathSyntaxError, )
+        except ImportError:
+            pass
+        try:
+            from cssselect import GenericTranslator, SelectorError
+            _parsers['css'] = GenericTranslator().css_to_xpath
+            _parsers['errors'] += (SelectorError, )
+        except ImportError:
+            pass
+    return _parsers
+
+
+def selector_to_xpath(selector, selection_type):
+    """
+        Validates an xpath or css selector, returning its XPath expression.
+        Returns `None` for other selection types or if the parser isn't
+        installed.
+
+        Raises `InvalidSelectorException` if the selector can't be parsed.
+    """
+    key = (selector, selection_type)
+    try:
+        return _xpaths[key]
+    except KeyError:
+        pass
+
+    parsers = _get_parsers()
+    xpath = None
+    try:
+        if selection_type == 'xpath' and parsers['xpath'] is not None:
+            parsers['xpath'](selector)
+            xpath = selector
+        elif selection_type == 'css' and parsers['css'] is not None:
+            xpath = parsers['css'](selector)
+    except parsers['errors'] as error:
+        raise InvalidSelectorException(
+            "Invalid %s selector %r: %s" % (selection_type, selector, error))
+
+    _xpaths[key] = xpath
+    return xpath
+
+
+def compile_selector(alias, selector, selection_type):
+    """
+        Validates a page element selector, returning its `CompiledSelector`.
+        Unknown selection types are always rejected, but the syntax of xpath
+        and css selectors is only checked if lxml and cssselect, the `lxml`
+        extra, are installed. Otherwise, invalid ones fail when used.
+    """
+    if selection_type not in SELECTION_TYPES:
+        raise SelectorTypeNotSupportedException(selection_type)
+
+    return CompiledSelector(alias, selector, selection_type,
+                            selector_to_xpath(selector, selection_type))
+
+
+class SelectorIndex(Mapping):
+    """
+        Read-only mapping of element aliases to their `CompiledSelector`,
+        built once for each page from its `elements`, which saves parsing
+        selectors again on every lookup. Elements registered later, through
+        `Page.register_element`, are compiled on the next lookup.
+        `selection_types` holds the selection types used by the page.
+    """
+
+    def __init__(self, elements):
+        self._elements = elements
+        self._selectors = {}
+        self._sync()
+
+    def _sync(self):
+        # Elements are only ever added, so a size mismatch means there are new
+        # ones to compile.
+        if len(self._selectors) == len(self._elements):
+            return
+        for alias, element in list(self._elements.items()):
+            if alias not in self._selectors:
+                self._selectors[alias] = compile_selector(
+                    alias, element['selector'], element['selection_type'])
 
-REGISTERED_PAGES = {}
+    @property
+    def selection_types(self):
+        self._sync()
+        return frozenset(compiled.selection_type
+                         for compiled in self._selectors.values())
+
+    def __getitem__(self, alias):
+        try:
+            return self._selectors[alias]
+        except KeyError:
+            self._sync()
+            return self._selectors[alias]
+
+    def __iter__(self):
+        self._sync()
+        return iter(self._selectors)
+
+    def __len__(self):
+        self._sync()
+        return len(self._selectors)
+
+
+class PageRegistry(dict):
+    """
+        Dict of the registered pages, by page name.
+
+        Pages registered through `register_lazy` are only created when first
+        got, which happens on `switch_page`. Pages missing from the registry
+        are looked up in the page manifest, a dict mapping page names to the
+        modules that define them, which are then imported.
+    """
+
+    def __init__(self):
+        super(PageRegistry, self).__init__()
+        self.lazy_pages = {}
+        self.manifest = {}
+        self._loaded_manifest = None
+
+    def __setitem__(self, page_name, page):
+        self.lazy_pages.pop(page_name, None)
+        super(PageRegistry, self).__setitem__(page_name, page)
+
+    def __contains__(self, page_name):
+        return (super(PageRegistry, self).__contains__(page_name) or
+                page_name in self.lazy_pages or
+                page_name in self._get_manifest())
+
+    def __missing__(self, page_name):
+        if page_name not in self.lazy_pages:
+            try:
+                module_name = self._get_manifest()[page_name]
+            except KeyError:
+                raise KeyError(page_name)
+            import_module(module_name)
+            if super(PageRegistry, self).__contains__(page_name):
+                return super(PageRegistry, self).__getitem__(page_name)
+
+        try:
+            page_class = self.lazy_pages[page_name]
+        except KeyError:
+            raise KeyError(page_name)
+
+        page = _build_page(page_class)
+        self[page_name] = page
+        return page
+
+    def get(self, page_name, default=None):
+        try:
+            return self[page_name]
+        except KeyError:
+            return default
+
+    def register_lazy(self, page_name, page_class):
+        """
+            Registers `page_class`, to be created when it's first got.
+        """
+        super(PageRegistry, self).pop(page_name, None)
+        self.lazy_pages[page_name] = page_class
+
+    def load_manifest(self, manifest):
+        """
+            Adds the page names and modules of `manifest` to the page
+            manifest. It can be a dict or the path of a JSON file, as in::
+
+                {
+                    "wikipedia index": "tests.pages.wikipedia",
+                    "wikipedia article": "tests.pages.wikipedia"
+                }
+        """
+        if not isinstance(manifest, dict):
+            with open(manifest) as manifest_file:
+                manifest = json.load(manifest_file)
+        self.manifest.update(manifest)
+
+    def _get_manifest(self):
+        # `config.page_manifest` is only read when a page is missing, as it
+        # may be set after the pages are imported.
+        if config.page_manifest is not self._loaded_manifest:
+            self._loaded_manifest = config.page_manifest
+            if config.page_manifest is not None:
+                self.load_manifest(config.page_manifest)
+        return self.manifest
+
+    def page_names(self):
+        """
+            Returns the names of all pages, including lazy and manifest ones.
+        """
+        return (set(self.keys()) | set(self.lazy_pages) |
+                set(self._get_manifest()))
+
+
+REGISTERED_PAGES = PageRegistry()
+
+
+def _build_page(cls):
+    """
+        Creates the page for `cls`, registering the elements defined in its
+        `elements_selectors` and compiling them into its `selector_index`.
+        Lazy parent pages are created first, as their elements are inherited.
+    """
+    for base in cls.__bases__:
+        base_name = getattr(base, 'page_name', None)
+        if REGISTERED_PAGES.lazy_pages.get(base_name) is base:
+            REGISTERED_PAGES[base_name]
+
+    if not hasattr(cls, 'elements') or Page in cls.__bases__:
+        cls.elements = {}
+
+    page = cls()
+    for element in page.elements_selectors:
+        page.register_element(*element)
+    cls.selector_index = SelectorIndex(cls.elements)
+    return page
 
 
 class PageMetaclass(type):
@@ -14,7 +259,11 @@ class PageMetaclass(type):
     def __init__(cls, name, bases, attributes):
         """
             This registers the page elements defined in `elements_selectors`
-            property and adds the page to the `REGISTERED_PAGES`.
+            property, compiles them into the `selector_index` and adds the
+            page to the `REGISTERED_PAGES`.
+
+            If `config.lazy_page_registration` is set, the page is only
+            created and has its elements registered when it's first used.
         """
         try:
             page_name = attributes['page_name']
@@ -22,15 +271,12 @@ class PageMetaclass(type):
             raise NotImplementedError(
                 "You must specify a page name for %s." % cls.__name__)
 
-        if not hasattr(cls, 'elements') or Page in bases:
-            cls.elements = {}
-
-        page = cls()
-        for element in page.elements_selectors:
-            page.register_element(*element)
-
-        if page_name is not None:
-            REGISTERED_PAGES[page_name] = page
+        if page_name is None:
+            _build_page(cls)
+        elif config.lazy_page_registration:
+            REGISTERED_PAGES.register_lazy(page_name, cls)
+        else:
+            REGISTERED_PAGES[page_name] = _build_page(cls)
 
         return super(PageMetaclass, cls).__init__(name, bases, attributes)
 
@@ -62,16 +308,19 @@ class Page(object):
         """
             Register elements to the current page, using the elements list.
             Elements will be dicts with the following keys:
-                `selection_type`: Stores the selector kind (css|xpath|id|tag)
-                `elector`: Stores the actual selector
+                `selection_type`: Stores the selector kind
+                                  (css|xpath|id|tag|text|name)
+                `selector`: Stores the actual selector
         """
 
-        if selection_type not in ('xpath', 'id', 'css', 'name', 'text'):
+        if selection_type not in SELECTION_TYPES:
             raise SelectorTypeNotSupportedException
 
         if alias in cls.elements.keys():
             raise ExistentElementException(alias)
 
+        # Validates the selector upfront, instead of on its first use.
+        compile_selector(alias, selector, selection_type)
         cls.elements[alias] = {
             'selector': selector,
             'selection_type': selection_type
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import time
+import atexit
+import threading
+
+from pyfunct.browsers import REGISTERED_DRIVERS
+from pyfunct.context import config
+from pyfunct.utils import ProcessLocal
+
+
+class PooledBrowser(object):
+    """
+        Keeps track of a browser owned by a `BrowserPool`.
+    """
+
+    def __init__(self, browser, driver_name):
+        self.browser = browser
+        self.driver_name = driver_name
+        self.created_at = time.time()
+        self.uses = 0
+        self.checked_out = False
+
+    @property
+    def age(self):
+        return time.time() - self.created_at
+
+    def is_expired(self, max_uses, max_age):
+        """
+            Returns `True` if the browser was used or has lived for too long
+            and should be recycled.
+        """
+        if max_uses is not None and self.uses >= max_uses:
+            return True
+        return max_age is not None and self.age >= max_age
+
+
+class BrowserPool(object):
+    """
+        Keeps warm browsers that can be checked out and checked in again,
+        avoiding to launch a new browser every time one is needed.
+
+        Browsers are launched through `REGISTERED_DRIVERS`, grouped by their
+        driver name. When a browser is checked in, its session is cleared and
+        it becomes available again, unless it has been used `max_uses` times
+        or has lived for `max_age` seconds, in which case it's quitted and a
+        new one will be launched when needed.
+
+        When a value isn't given, it's taken from `config.browser_pool_size`,
+        `config.browser_max_uses` and `config.browser_max_age`.
+
+        Browsers are launched as they're checked out, and only launched
+        upfront, `size` of them, by `warm`.
+
+        For example::
+
+            pool = BrowserPool(size=2, max_uses=50)
+            pool.warm('splinter')
+
+            browser = pool.checkout('splinter')
+            browser.open_page('wikipedia index')
+            pool.checkin(browser)
+    """
+
+    def __init__(self, size=None, max_uses=None, max_age=None):
+        self.size = config.browser_pool_size if size is None else size
+        self.max_uses = (config.browser_max_uses if max_uses is None
+                         else max_uses)
+        self.max_age = config.browser_max_age if max_age is None else max_age
+
+        self._lock = threading.Lock()
+        self._pooled = {}
+        self._idle = {}
+
+        # Browsers left behind would keep running after the tests finish.
+        atexit.register(self.close)
+
+    def _launch(self, driver_name):
+        browser = REGISTERED_DRIVERS[driver_name]()
+        pooled = PooledBrowser(browser, driver_name)
+        with self._lock:
+            self._pooled[browser] = pooled
+        return pooled
+
+    def _discard(self, pooled):
+        with self._lock:
+            self._pooled.pop(pooled.browser, None)
+        pooled.browser.quit()
+
+    def warm(self, driver_name=None):
+        """
+            Launches browsers for `driver_name` until there are `size` idle
+            ones, so they're ready to be checked out.
+        """
+        driver_name = driver_name or config.default_driver_name
+
+        while True:
+            with self._lock:
+                if len(self._idle.get(driver_name, [])) >= self.size:
+                    return
+
+            pooled = self._launch(driver_name)
+            with self._lock:
+                self._idle.setdefault(driver_name, []).append(pooled)
+
+    def checkout(self, driver_name=None):
+        """
+            Hands out an idle browser for `driver_name`, launching a new one
+            if there's no idle browser available.
+        """
+        driver_name = driver_name or config.default_driver_name
+        pooled = None
+
+        while pooled is None:
+            with self._lock:
+                idle = self._idle.setdefault(driver_name, [])
+                candidate = idle.pop(0) if idle else None
+
+            if candidate is None:
+                pooled = self._launch(driver_name)
+            elif candidate.is_expired(self.max_uses, self.max_age):
+                self._discard(candidate)
+            else:
+                pooled = candidate
+
+        pooled.checked_out = True
+        return pooled.browser
+
+    def checkin(self, browser, clear_session=True):
+        """
+            Gives a browser back to the pool. Its session is cleared, unless
+            `clear_session` is `False` because it already was, so it can be
+            reused by someone else, or it's quitted if it's expired.
+
+            Raises `ValueError` if the browser isn't checked out, as checking
+            it in twice would hand it out to two users.
+        """
+        with self._lock:
+            pooled = self._pooled[browser]
+            if not pooled.checked_out:
+                raise ValueError("The browser isn't checked out.")
+            pooled.checked_out = False
+        pooled.uses += 1
+
+        if pooled.is_expired(self.max_uses, self.max_age):
+            self._discard(pooled)
+            return
+
+        if clear_session:
+            browser.clear_session()
+        with self._lock:
+            self._idle.setdefault(pooled.driver_name, []).append(pooled)
+
+    def discard(self, browser):
+        """
+            Quits a checked out browser that can't be used anymore, such as a
+            crashed one, instead of checking it in.
+        """
+        pooled = self._pooled[browser]
+        try:
+            self._discard(pooled)
+        except Exception:
+            # Crashed browsers may fail to quit, but they're gone anyway.
+            pass
+
+    def idle_count(self, driver_name=None):
+        """
+            Returns how many browsers for `driver_name` are idle.
+        """
+        driver_name = driver_name or config.default_driver_name
+        with self._lock:
+            return len(self._idle.get(driver_name, []))
+
+    def owns(self, browser):
+        """
+            Returns `True` if `browser` was launched by this pool.
+        """
+        return browser in self._pooled
+
+    def close(self):
+        """
+            Quits all the browsers from the pool, even the checked out ones.
+        """
+        with self._lock:
+            pooled_browsers = list(self._pooled.values())
+            self._pooled = {}
+            self._idle = {}
+
+        for pooled in pooled_browsers:
+            pooled.browser.quit()
+
+
+_default_pools = ProcessLocal(lambda _: BrowserPool(), BrowserPool.close)
+
+
+def get_default_pool():
+    """
+        Returns the `BrowserPool` shared by the `FunctTestCase` classes of
+        this process if `config.use_browser_pool` is set, creating it with
+        the config settings on first use, or `None` otherwise.
+    """
+    return _default_pools.get(config.use_browser_pool)
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import threading
+
+try:
+    from Queue import Queue, Full, Empty
+except ImportError:
+    from queue import Queue, Full, Empty
+
+from pyfunct.context import config
+from pyfunct.instrumentation import add_call_listener, remove_call_listener
+from pyfunct.utils import ProcessLocal
+
+# Driver methods whose time is reported as wait time, instead of action time.
+WAIT_METHODS = ('wait', 'wait_for', 'wait_pageload')
+
+
+class TestReport(object):
+    """
+        What is reported about a test while it runs.
+    """
+
+    def __init__(self, test_id):
+        self.test_id = test_id
+        self.started_at = time.time()
+        self.pages = []
+        self.drivers = set()
+        self.calls = 0
+        self.wait_time = 0.0
+        self.action_time = 0.0
+        self.launch_time = 0.0
+        self.retries = {}
+        # Wait time of nested calls not yet added to `wait_time`, by thread
+        # and depth, until the call they're nested in finishes.
+        self.nested_waits = {}
+
+    def add_call(self, record, kind):
+        """
+            Adds the time of a call to `wait_time` or `action_time`. Waits
+            nested in actions, like the page load wait of `click_and_wait`,
+            are taken out of the action time and count as wait time.
+        """
+        thread = threading.current_thread().ident
+        nested_wait = self.nested_waits.pop((thread, record.depth + 1), 0.0)
+        if kind == 'wait':
+            wait_time, action_time = record.duration, 0.0
+        else:
+            wait_time = nested_wait
+            action_time = max(record.duration - nested_wait, 0.0)
+
+        if record.depth == 0:
+            self.wait_time += wait_time
+            self.action_time += action_time
+        elif wait_time:
+            key = (thread, record.depth)
+            self.nested_waits[key] = self.nested_waits.get(key, 0.0) + \
+                wait_time
+
+
+class JSONLReporter(object):
+    """
+        Streams a JSON record per line for every test and for every browser
+        driver call, as they happen, so long suites can be followed live.
+        For example::
+
+            {"type": "call", "test": "tests.test_search.SearchTest.test_x",
+             "driver": "splinter", "method": "click", "page": "index",
+             "alias": "search button", "duration": 0.084, "kind": "action",
+             "depth": 0, "time": 1357000000.0}
+            {"type": "test", "test": "tests.test_search.SearchTest.test_x",
+             "outcome": "success", "duration": 2.31, "wait_time": 1.2,
+             "action_time": 0.9, "launch_time": 0.0,
+             "pages": ["index", "results"], "drivers": ["splinter"],
+             "calls": 12, "retries": [{"driver": "splinter",
+             "action": "click", "alias": "search button", "count": 2}],
+             "time": 1357000002.3}
+
+        Browser launches are reported as well, through `report_launch`::
+
+            {"type": "launch", "test": "tests.test_search.SearchTest.test_a",
+             "driver": "splinter", "browser": "chrome", "profile": "ci",
+             "duration": 1.82, "time": 1356999998.1}
+
+        Calls nested in other calls (`depth` > 0) are reported, but their
+        time is only counted once, in the outermost call. Waits nested in
+        actions, like the page load wait of `click_and_wait`, count for
+        `wait_time` instead of `action_time`.
+
+        Records are put in a queue of up to `buffer_size` records and written
+        by a background thread, in batches, so tests never wait for the disk.
+        Records that don't fit in the queue are dropped and counted in
+        `dropped`. Each batch is written in a single append, so many
+        processes can report to the same file.
+    """
+
+    def __init__(self, path, buffer_size=10000, flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.current = None
+        self._queue = Queue(buffer_size)
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_records,
+                                        name='pyfunct-jsonl-reporter')
+        self._writer.daemon = True
+        self._writer.start()
+        add_call_listener(self)
+
+    def emit(self, record):
+        """
+            Queues a record to be written, without blocking.
+        """
+        record['time'] = time.time()
+        try:
+            self._queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+    def start_test(self, test_id):
+        self.current = TestReport(test_id)
+
+    def stop_test(self, outcome):
+        report, self.current = self.current, None
+        if report is None:
+            return
+
+        self.emit({
+            'type': 'test',
+            'test': report.test_id,
+            'outcome': outcome,
+            'duration': time.time() - report.started_at,
+            'wait_time': report.wait_time,
+            'action_time': report.action_time,
+            'launch_time': report.launch_time,
+            'pages': report.pages,
+            'drivers': sorted(report.drivers),
+            'calls': report.calls,
+            'retries': [
+                {'driver': driver, 'action': action, 'alias': alias,
+                 'count': count}
+                for (driver, action, alias), count in sorted(
+                    report.retries.items())],
+        })
+
+    def report_launch(self, driver, browser, profile, duration):
+        """
+            Reports that a browser took `duration` seconds to be launched,
+            with the given launch `profile` name.
+        """
+        report = self.current
+        if report is not None:
+            with self._lock:
+                report.launch_time += duration
+
+        self.emit({
+            'type': 'launch',
+            'test': report.test_id if report is not None else None,
+            'driver': driver,
+            'browser': browser,
+            'profile': profile,
+            'duration': duration,
+        })
+
+    def report_retry(self, driver, action, alias):
+        """
+            Reports that an element action on `alias` was retried. Retries
+            are counted in the record of the test.
+        """
+        report = self.current
+        if report is not None:
+            key = (driver, action, alias)
+            with self._lock:
+                report.retries[key] = report.retries.get(key, 0) + 1
+
+    def __call__(self, record):
+        """
+            Reports a browser driver `CallRecord`.
+        """
+        report = self.current
+        kind = 'wait' if record.method in WAIT_METHODS else 'action'
+
+        if report is not None:
+            with self._lock:
+                report.calls += 1
+                report.drivers.add(record.driver)
+                if record.method == 'open_page':
+                    report.pages.append(record.page)
+                report.add_call(record, kind)
+
+        self.emit({
+            'type': 'call',
+            'test': report.test_id if report is not None else None,
+            'driver': record.driver,
+            'method': record.method,
+            'page': record.page,
+            'alias': record.alias,
+            'duration': record.duration,
+            'kind': kind,
+            'depth': record.depth,
+        })
+
+    def _write_records(self):
+        descriptor = os.open(self.path,
+                             os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            while not (self._closed.is_set() and self._queue.empty()):
+                try:
+                    records = [self._queue.get(timeout=self.flush_interval)]
+                except Empty:
+                    continue
+                while True:
+                    try:
+                        records.append(self._queue.get_nowait())
+                    except Empty:
+                        break
+                lines = ''.join(json.dumps(record, sort_keys=True) + '\n'
+                                for record in records)
+                os.write(descriptor, lines.encode('utf-8'))
+        finally:
+            os.close(descriptor)
+
+    def close(self):
+        """
+            Stops reporting calls and waits for the queued records to be
+            written.
+        """
+        if self._closed.is_set():
+            return
+        remove_call_listener(self)
+        self._closed.set()
+        self._writer.join()
+
+
+_reporters = ProcessLocal(JSONLReporter, JSONLReporter.close,
+                          discard=remove_call_listener)
+
+
+def get_reporter():
+    """
+        Returns the `JSONLReporter` of this process for
+        `config.report_path`, creating it on first use, or `None` if no path
+        is set.
+    """
+    return _reporters.get(config.report_path)
+
+
+def close_reporter():
+    """
+        Waits for the records of the reporter of this process to be written.
+    """
+    _reporters.close()
+
+
+class OutcomeRecorder(object):
+    """
+        Proxy for a `unittest.TestResult` that keeps the outcome of the test
+        being run as `outcome`. If given, `on_failure` is called when the
+        test fails or errors, before the result is told about it.
+    """
+
+    OUTCOMES = {
+        'addSuccess': 'success',
+        'addFailure': 'failure',
+        'addError': 'error',
+        'addSkip': 'skip',
+        'addExpectedFailure': 'expected_failure',
+        'addUnexpectedSuccess': 'unexpected_success',
+    }
+
+    def __init__(self, result, on_failure=None):
+        self._result = result
+        self.on_failure = on_failure
+        self.outcome = None
+
+    def __getattr__(self, name):
+        attribute = getattr(self._result, name)
+        if name not in self.OUTCOMES:
+            return attribute
+
+        def add_outcome(*args, **kwargs):
+            # Keeps the first outcome that isn't a success.
+            if self.outcome in (None, 'success'):
+                self.outcome = self.OUTCOMES[name]
+            if self.on_failure is not None and name in ('addFailure',
+                                                        'addError'):
+                self.on_failure()
+            return attribute(*args, **kwargs)
+        return add_outcome
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import argparse
+import unittest
+import multiprocessing
+
+try:
+    from Queue import Empty
+except ImportError:
+    from queue import Empty
+
+from pyfunct.actions import action_cache, session_id
+from pyfunct.artifacts import close_artifact_store
+from pyfunct.case import FunctTestCase
+from pyfunct.ordering import PageLocalityTestLoader, iter_tests
+from pyfunct.pool import BrowserPool
+from pyfunct.reporting import close_reporter
+from pyfunct.context import config
+
+
+def shard_suite(suite):
+    """
+        Splits a test suite into shards, one per test case class, keeping the
+        tests order. A class is never split across shards, so `setUpClass`,
+        `tearDownClass` and the reused browser keep working as usual.
+
+        Shards are returned from the biggest to the smallest, which helps
+        balancing the load between the workers.
+    """
+    shards = []
+    shards_by_class = {}
+
+    for test in iter_tests(suite):
+        test_class = test.__class__
+        if test_class not in shards_by_class:
+            shards_by_class[test_class] = unittest.TestSuite()
+            shards.append(shards_by_class[test_class])
+        shards_by_class[test_class].addTest(test)
+
+    shards.sort(key=lambda shard: shard.countTestCases(), reverse=True)
+    return shards
+
+
+class RemoteTest(object):
+    """
+        Stands for a test that ran in a worker process. It holds just what is
+        needed for reporting it, as test cases can't be sent between
+        processes.
+    """
+
+    def __init__(self, test_id, description):
+        self._id = test_id
+        self.description = description
+
+    def id(self):
+        return self._id
+
+    def shortDescription(self):
+        return None
+
+    def __str__(self):
+        return self.description
+
+
+class ShardResult(unittest.TestResult):
+    """
+        Test result used by the workers. It records the outcome of every test,
+        in order, in a form that can be sent back to the main process.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ShardResult, self).__init__(*args, **kwargs)
+        self.outcomes = []
+
+    def _record(self, test, outcome, detail=None):
+        self.outcomes.append((test.id(), str(test), outcome, detail))
+
+    def addSuccess(self, test):
+        super(ShardResult, self).addSuccess(test)
+        self._record(test, 'success')
+
+    def addFailure(self, test, err):
+        super(ShardResult, self).addFailure(test, err)
+        self._record(test, 'failure', self.failures[-1][1])
+
+    def addError(self, test, err):
+        super(ShardResult, self).addError(test, err)
+        self._record(test, 'error', self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super(ShardResult, self).addSkip(test, reason)
+        self._record(test, 'skip', reason)
+
+    def addExpectedFailure(self, test, err):
+        super(ShardResult, self).addExpectedFailure(test, err)
+        self._record(test, 'expected_failure',
+                     self.expectedFailures[-1][1])
+
+    def addUnexpectedSuccess(self, test):
+        super(ShardResult, self).addUnexpectedSuccess(test)
+        self._record(test, 'unexpected_success')
+
+    def summary(self):
+        return {
+            'tests_run': self.testsRun,
+            'outcomes': self.outcomes,
+        }
+
+
+def run_worker(shards, tasks, results, driver_name):
+    """
+        Worker process loop. It sets up a `BrowserPool` with a warm browser
+        that is shared by every `FunctTestCase` it runs, and runs the shards
+        it receives from `tasks` until it gets `None`.
+    """
+    pool = BrowserPool(size=1)
+    pool.warm(driver_name)
+    FunctTestCase.browser_pool = pool
+
+    try:
+        for shard_index in iter(tasks.get, None):
+            result = ShardResult()
+            shards[shard_index].run(result)
+            results.put((shard_index, result.summary()))
+    finally:
+        FunctTestCase.browser_pool = None
+        pool.close()
+        # Workers exit through `os._exit`, skipping the `atexit` functions
+        # that would write what is still queued.
+        close_reporter()
+        close_artifact_store()
+
+
+class ParallelTestRunner(object):
+    """
+        A test runner that shards the test case classes across worker
+        processes. Each worker owns a `BrowserPool` with a warm browser, that
+        is reused by every test case class it runs. Results
+        from the workers are merged into one `unittest` result, printed just
+        like `unittest.TextTestRunner` does.
+
+        Workers are forked from the current process, so it only works on
+        platforms that support forking.
+    """
+
+    resultclass = unittest.TextTestResult
+
+    def __init__(self, stream=sys.stderr, descriptions=True, verbosity=1,
+                 processes=None, driver_name=None):
+        self.stream = unittest.runner._WritelnDecorator(stream)
+        self.descriptions = descriptions
+        self.verbosity = verbosity
+        self.processes = processes or multiprocessing.cpu_count()
+        self.driver_name = driver_name or config.default_driver_name
+
+    def _make_result(self):
+        return self.resultclass(self.stream, self.descriptions,
+                                self.verbosity)
+
+    def _merge(self, result, summary):
+        """
+            Adds the outcomes reported by a worker to `result`, printing the
+            progress in the same format `unittest.TextTestResult` does.
+        """
+        result.testsRun += summary['tests_run']
+
+        for test_id, description, outcome, detail in summary['outcomes']:
+            test = RemoteTest(test_id, description)
+
+            if outcome == 'failure':
+                result.failures.append((test, detail))
+            elif outcome == 'error':
+                result.errors.append((test, detail))
+            elif outcome == 'skip':
+                result.skipped.append((test, detail))
+            elif outcome == 'expected_failure':
+                result.expectedFailures.append((test, detail))
+            elif outcome == 'unexpected_success':
+                result.unexpectedSuccesses.append(test)
+
+            self._report_progress(test, outcome, detail)
+
+    def _report_progress(self, test, outcome, detail):
+        if self.verbosity > 1:
+            status = {
+                'success': 'ok',
+                'failure': 'FAIL',
+                'error': 'ERROR',
+                'skip': 'skipped %r' % (detail, ),
+                'expected_failure': 'expected failure',
+                'unexpected_success': 'unexpected success',
+            }[outcome]
+            self.stream.writeln('%s ... %s' % (test, status))
+        elif self.verbosity == 1:
+            self.stream.write({
+                'success': '.',
+                'failure': 'F',
+                'error': 'E',
+                'skip': 's',
+                'expected_failure': 'x',
+                'unexpected_success': 'u',
+            }[outcome])
+            self.stream.flush()
+
+    def _next_summary(self, results, workers):
+        """
+            Waits for the next shard summary, failing if every worker is gone,
+            which happens when, for instance, browsers can't be launched.
+        """
+        while True:
+            try:
+                return results.get(timeout=1)
+            except Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    raise RuntimeError(
+                        "The worker processes exited before running all the "
+                        "tests.")
+
+    def run(self, test):
+        """
+            Runs the given test or test suite in parallel and returns the
+            merged result.
+        """
+        result = self._make_result()
+        shards = shard_suite(test)
+
+        # Makes the workers share the results cached for the `session` scope.
+        session_id()
+        processes = min(self.processes, len(shards))
+
+        tasks = multiprocessing.Queue()
+        results = multiprocessing.Queue()
+
+        for shard_index in range(len(shards)):
+            tasks.put(shard_index)
+        for _ in range(processes):
+            tasks.put(None)
+
+        workers = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(shards, tasks, results, self.driver_name))
+            for _ in range(processes)
+        ]
+
+        start_time = time.time()
+        for worker in workers:
+            worker.start()
+
+        try:
+            for _ in range(len(shards)):
+                shard_index, summary = self._next_summary(results, workers)
+                self._merge(result, summary)
+        finally:
+            for worker in workers:
+                worker.join()
+            action_cache.clear('session')
+
+        time_taken = time.time() - start_time
+
+        result.printErrors()
+        self.stream.writeln(result.separator2)
+        self.stream.writeln("Ran %d test%s in %.3fs using %d process%s" % (
+            result.testsRun, result.testsRun != 1 and "s" or "",
+            time_taken, processes, processes != 1 and "es" or ""))
+        self.stream.writeln()
+
+        if result.wasSuccessful():
+            self.stream.writeln("OK")
+        else:
+            failed, errored = len(result.failures), len(result.errors)
+            infos = []
+            if failed:
+                infos.append("failures=%d" % failed)
+            if errored:
+                infos.append("errors=%d" % errored)
+            self.stream.writeln("FAILED (%s)" % ", ".join(infos))
+
+        return result
+
+
+def main(argv=None):
+    """
+        Command line entry point. For example::
+
+            python -m pyfunct.runner --processes 4 tests.test_search
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m pyfunct.runner',
+        description='Runs pyfunct tests in parallel worker processes.')
+    parser.add_argument('names', nargs='*',
+                        help='Test modules, classes or methods to run. '
+                             'Tests are discovered from the current '
+                             'directory if none is given.')
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help='Number of worker processes. Defaults to the '
+                             'number of CPUs.')
+    parser.add_argument('-d', '--driver', default=None,
+                        help='Driver name of the browser each worker owns. '
+                             'Defaults to `config.default_driver_name`.')
+    parser.add_argument('-v', '--verbose', action='store_const', const=2,
+                        default=1, dest='verbosity')
+    args = parser.parse_args(argv)
+
+    loader = PageLocalityTestLoader()
+    if args.names:
+        suite = loader.loadTestsFromNames(args.names)
+    else:
+        suite = loader.discover('.')
+
+    runner = ParallelTestRunner(verbosity=args.verbosity,
+                                processes=args.processes,
+                                driver_name=args.driver)
+    result = runner.run(suite)
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
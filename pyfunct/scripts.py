@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+    JavaScript snippets used by the browser drivers. They're expressions, as
+    `execute_javascript` returns their values.
+"""
+
+# Functions finding elements in the same way the drivers do, and checking
+# their visibility, shared by the element scripts below.
+ELEMENT_FUNCTIONS = """
+    function xpathLiteral(value) {
+        if (value.indexOf('"') === -1) {
+            return '"' + value + '"';
+        }
+        if (value.indexOf("'") === -1) {
+            return "'" + value + "'";
+        }
+        return 'concat("' + value.split('"').join('", \\'"\\', "') + '")';
+    }
+
+    function toArray(elements) {
+        return Array.prototype.slice.call(elements);
+    }
+
+    function findByXpath(selector) {
+        var snapshot = document.evaluate(
+            selector, document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var elements = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            elements.push(snapshot.snapshotItem(i));
+        }
+        return elements;
+    }
+
+    function find(selector, selectionType) {
+        switch (selectionType) {
+            case 'xpath':
+                return findByXpath(selector);
+            case 'css':
+                return toArray(document.querySelectorAll(selector));
+            case 'id':
+                var element = document.getElementById(selector);
+                return element ? [element] : [];
+            case 'tag':
+                return toArray(document.getElementsByTagName(selector));
+            case 'name':
+                return toArray(document.getElementsByName(selector));
+            case 'text':
+                return findByXpath(
+                    '//*[text()=' + xpathLiteral(selector) + ']');
+        }
+        throw new Error('Unsupported selection type: ' + selectionType);
+    }
+
+    function isVisible(element) {
+        if (!(element.offsetWidth || element.offsetHeight ||
+              element.getClientRects().length)) {
+            return false;
+        }
+        var style = window.getComputedStyle(element);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    }
+"""
+
+# Finds the elements for a list of `[selector, selection_type]` pairs and
+# returns `[present, visible, text, count]` for each of them, taken from the
+# first element found. It must be formatted with the JSON encoded list.
+ELEMENTS_STATE_SCRIPT = """(function (selectors) {""" + ELEMENT_FUNCTIONS + """
+    return selectors.map(function (entry) {
+        var elements = find(entry[0], entry[1]);
+        if (!elements.length) {
+            return [false, false, null, 0];
+        }
+        var element = elements[0];
+        var text = element.innerText;
+        if (text === undefined) {
+            text = element.textContent;
+        }
+        return [true, isVisible(element), text, elements.length];
+    });
+})(%s)"""
+
+# Finds the elements for a list of `[selector, selection_type]` pairs, as
+# `ELEMENTS_STATE_SCRIPT` does, and returns `[url, title, elements]`, having
+# `[present, visible, text, count, value, attributes]` for each element,
+# taken from the first element found. `value` is the value of form fields and
+# `attributes` is an object. It must be formatted with the JSON encoded list.
+PAGE_SNAPSHOT_SCRIPT = """(function (selectors) {""" + ELEMENT_FUNCTIONS + """
+    function getAttributes(element) {
+        var attributes = {};
+        for (var i = 0; i < element.attributes.length; i++) {
+            attributes[element.attributes[i].name] =
+                element.attributes[i].value;
+        }
+        return attributes;
+    }
+
+    var elements = selectors.map(function (entry) {
+        var elements = find(entry[0], entry[1]);
+        if (!elements.length) {
+            return [false, false, null, 0, null, {}];
+        }
+        var element = elements[0];
+        var text = element.innerText;
+        if (text === undefined) {
+            text = element.textContent;
+        }
+        var value = element.value === undefined ? null : element.value;
+        return [true, isVisible(element), text, elements.length, value,
+                getAttributes(element)];
+    });
+    return [window.location.href, document.title, elements];
+})(%s)"""
+
+# Returns `[url, localStorage, sessionStorage]` for the current page, with
+# the storages as objects.
+SESSION_STORAGE_SCRIPT = """(function () {
+    function dump(storage) {
+        var items = {};
+        for (var i = 0; i < storage.length; i++) {
+            var key = storage.key(i);
+            items[key] = storage.getItem(key);
+        }
+        return items;
+    }
+
+    return [window.location.href, dump(window.localStorage),
+            dump(window.sessionStorage)];
+})()"""
+
+# Replaces the local and session storage items of the current page. It must
+# be formatted with the JSON encoded `[localStorage, sessionStorage]` items.
+RESTORE_STORAGE_SCRIPT = """(function (localItems, sessionItems) {
+    function load(storage, items) {
+        storage.clear();
+        for (var key in items) {
+            if (items.hasOwnProperty(key)) {
+                storage.setItem(key, items[key]);
+            }
+        }
+    }
+
+    load(window.localStorage, localItems);
+    load(window.sessionStorage, sessionItems);
+    return true;
+}).apply(null, %s)"""
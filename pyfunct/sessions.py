@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+from functools import wraps
+
+from pyfunct.context import config
+from pyfunct.exceptions import InvalidConfigurationException
+from pyfunct.utils import makedirs, owned_by_user, user_temp_path
+
+
+class SessionStore(object):
+    """
+        Stores browser session states on disk, as JSON files, so they're
+        shared by every process running tests, such as the
+        `pyfunct.runner` workers. Files are written to a temporary file and
+        renamed, so a state is never read while it's half written.
+
+        States expire `ttl` seconds after being stored. If not given,
+        `directory` and `ttl` are taken from `config.session_store_dir` and
+        `config.session_ttl`. The default directory is `sessions`, in a
+        `pyfunct-<user id>` directory of the temporary directory, only
+        accessible by the user.
+    """
+
+    def __init__(self, directory=None, ttl=None):
+        self.directory = directory or config.session_store_dir
+        # Anyone can create files in the temporary directory, so the default
+        # one is checked to belong to the user.
+        self.private = not self.directory
+        if self.private:
+            self.directory = user_temp_path('sessions')
+        self.ttl = ttl if ttl is not None else config.session_ttl
+
+    def _check_directory(self):
+        """
+            Raises `InvalidConfigurationException` if the default directory,
+            or the one holding it, belongs to another user, who could plant
+            the session states restored into the browsers.
+        """
+        if not self.private:
+            return
+        for directory in (os.path.dirname(self.directory), self.directory):
+            if os.path.isdir(directory) and not owned_by_user(directory):
+                raise InvalidConfigurationException(
+                    "%s belongs to another user; Set "
+                    "`config.session_store_dir` to a directory of yours." %
+                    directory)
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, '%s.json' % digest)
+
+    def get(self, key):
+        """
+            Returns the entry stored for `key`, or `None` if there's none or
+            it has expired. Entries are dicts having the session `state` and
+            the `result` of the action that created it.
+        """
+        self._check_directory()
+        path = self._path(key)
+        try:
+            with open(path) as entry_file:
+                entry = json.load(entry_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if self.ttl is not None and time.time() - entry['stored_at'] > \
+                self.ttl:
+            self.invalidate(key)
+            return None
+        return entry
+
+    def set(self, key, state, result=None):
+        """
+            Stores a session `state` for `key`, along with the `result` of
+            the action that created it. Both must be JSON serializable.
+        """
+        if self.private:
+            makedirs(os.path.dirname(self.directory), 0o700)
+            makedirs(self.directory, 0o700)
+        else:
+            makedirs(self.directory)
+        self._check_directory()
+
+        entry = {'key': key, 'stored_at': time.time(), 'state': state,
+                 'result': result}
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory,
+                                                      suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w') as entry_file:
+                json.dump(entry, entry_file)
+            os.rename(temporary_path, self._path(key))
+        except Exception:
+            os.remove(temporary_path)
+            raise
+
+    def invalidate(self, key):
+        """
+            Removes the state stored for `key`, if any.
+        """
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+            Removes every stored state.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
+
+
+def restores_session(key, ttl=None, store=None):
+    """
+        Decorator for actions that set up a browser session, such as logging
+        in. The first time the action runs, the browser session state
+        (cookies, local storage and session storage) is captured and stored
+        under `key`. Until it expires, calling the action again just restores
+        the stored state into the browser, instead of running it. For
+        example::
+
+            @action
+            @restores_session('admin login', ttl=600)
+            def login_as_admin(browser):
+                browser.open_page('login')
+                browser.fill('username', 'admin')
+                ...
+
+        `key` may also be a function, called with the action arguments but
+        the browser, that returns the key. The browser driver name is always
+        added to the key. The action's return value is stored as well, so it
+        must be JSON serializable.
+
+        States are kept in `store`, a `SessionStore` that defaults to one
+        with the config settings.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(browser, *args, **kwargs):
+            session_store = store or SessionStore(ttl=ttl)
+            action_key = key(*args, **kwargs) if callable(key) else key
+            full_key = '%s:%s' % (browser.driver_name, action_key)
+
+            entry = session_store.get(full_key)
+            if entry is not None:
+                browser.restore_session_state(entry['state'])
+                return entry['result']
+
+            result = func(browser, *args, **kwargs)
+            session_store.set(full_key, browser.get_session_state(), result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import time
+from collections import namedtuple
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+#: State of a page element in a `PageSnapshot`. `text`, `visible`, `value`
+#: (for form fields) and `attributes` are taken from the first element found
+#: by the selector and `count` is the number of elements found by it.
+ElementSnapshot = namedtuple('ElementSnapshot',
+                             'present visible text count value attributes')
+
+
+class FrozenDict(Mapping):
+    """
+        Read-only dict, so snapshots can't be changed by the tests checking
+        them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._items = dict(*args, **kwargs)
+
+    def __getitem__(self, key):
+        return self._items[key]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __hash__(self):
+        return hash(frozenset(self._items.items()))
+
+    def __repr__(self):
+        return 'FrozenDict(%r)' % (self._items, )
+
+
+class PageSnapshot(Mapping):
+    """
+        Immutable snapshot of the elements of a page, taken through
+        `BaseBrowserDriver.snapshot_page`. It maps the element aliases to
+        their `ElementSnapshot`, so many assertions can be made against the
+        page as it was, without going back to the browser. For example::
+
+            snapshot = browser.snapshot_page()
+            self.assertEqual(snapshot.text('title'), 'Search results')
+            self.assertTrue(snapshot['next page'].visible)
+            self.assertEqual(snapshot.attribute('search box', 'value'), 'q')
+
+        It also has the `page_name`, the page `url` and `title`, and when it
+        was taken, as a `time.time()` timestamp, in `taken_at`.
+    """
+
+    __slots__ = ('page_name', 'url', 'title', 'taken_at', '_elements')
+
+    def __init__(self, page_name, url, title, elements):
+        for name, value in (('page_name', page_name), ('url', url),
+                            ('title', title), ('taken_at', time.time()),
+                            ('_elements', FrozenDict(elements))):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Page snapshots can't be changed.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Page snapshots can't be changed.")
+
+    def __getitem__(self, alias):
+        return self._elements[alias]
+
+    def __iter__(self):
+        return iter(self._elements)
+
+    def __len__(self):
+        return len(self._elements)
+
+    def text(self, alias):
+        """
+            Returns the element text, or `None` if it isn't present.
+        """
+        return self[alias].text
+
+    def attribute(self, alias, name, default=None):
+        """
+            Returns an attribute of the element, or `default` if it isn't
+            present or doesn't have the attribute.
+        """
+        return self[alias].attributes.get(name, default)
+
+    def __repr__(self):
+        return '<PageSnapshot of %r: %s>' % (self.page_name,
+                                             ', '.join(sorted(self)))
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import os
+import atexit
+import tempfile
+
+
+def user_temp_path(*names):
+    """
+        Returns a path in the `pyfunct-<user id>` directory of the temporary
+        directory. It should be created only accessible by the user, and
+        checked with `owned_by_user` before being trusted.
+    """
+    return os.path.join(tempfile.gettempdir(), 'pyfunct-%d' % os.getuid(),
+                        *names)
+
+
+def owned_by_user(path):
+    """
+        Tells if `path` belongs to the user running the process, so other
+        users can't have planted it in a shared directory, like the
+        temporary one.
+    """
+    return os.stat(path).st_uid == os.getuid()
+
+
+def makedirs(directory, mode=0o777):
+    """
+        Creates `directory` and its missing parents, doing nothing if it
+        already exists, even if another process has just created it.
+    """
+    if os.path.isdir(directory):
+        return
+    try:
+        os.makedirs(directory, mode)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+
+
+class ProcessLocal(object):
+    """
+        Holds an object, such as a reporter with a writer thread, that is
+        created from a setting on first use and that belongs to the process
+        creating it. `create` is called with the setting and `close` with
+        the object, when it's replaced or when the process exits.
+
+        Forked processes, like the runner workers, don't inherit the threads
+        of the parent, so they get their own object. The one inherited from
+        the parent is given to `discard`, if set, instead of being closed.
+        They also exit without running the `atexit` functions, so they have
+        to call `close` themselves.
+    """
+
+    def __init__(self, create, close, discard=None):
+        self._create = create
+        self._close = close
+        self._discard = discard
+        self._value = None
+        self._setting = None
+        self._pid = None
+        # Registered once, so replaced objects don't pile up closures.
+        atexit.register(self.close)
+
+    def get(self, setting):
+        """
+            Returns the object for `setting`, creating it if there's none for
+            it in this process, or `None` if the setting is empty.
+        """
+        if not setting:
+            return None
+        if self._value is None or self._setting != setting or \
+                self._pid != os.getpid():
+            if self._pid == os.getpid():
+                self.close()
+            elif self._value is not None and self._discard is not None:
+                self._discard(self._value)
+            self._value = self._create(setting)
+            self._setting = setting
+            self._pid = os.getpid()
+        return self._value
+
+    def close(self):
+        """
+            Closes the object created by this process, if any, so the next
+            `get` creates a new one.
+        """
+        if self._value is not None and self._pid == os.getpid():
+            value, self._value = self._value, None
+            self._close(value)
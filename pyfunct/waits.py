@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+import re
+import time
+from collections import namedtuple
+
+from pyfunct.exceptions import WaitTimeoutException
+
+
+#: Timing data for a wait: what was waited for, how long it took (in
+#: seconds), how many times the condition was checked and whether it was
+#: satisfied before the timeout.
+WaitTiming = namedtuple('WaitTiming',
+                        'description elapsed attempts satisfied')
+
+
+class Condition(object):
+    """
+        A condition to be waited for. It wraps a function that receives the
+        browser and returns a truthy value when the condition is satisfied.
+
+        Conditions can be combined with `&` (all of them), `|` (any of them)
+        and `~` (negation). For example::
+
+            browser.wait_for(element_visible('results') &
+                             ~element_present('loading spinner'))
+    """
+
+    def __init__(self, check, description=None):
+        self.check = check
+        self.description = description or getattr(check, '__name__',
+                                                  repr(check))
+
+    def __call__(self, browser):
+        return self.check(browser)
+
+    def __and__(self, other):
+        return all_of(self, other)
+
+    def __or__(self, other):
+        return any_of(self, other)
+
+    def __invert__(self):
+        return Condition(lambda browser: not self(browser),
+                         'not %s' % self)
+
+    def __str__(self):
+        return self.description
+
+    __repr__ = __str__
+
+
+def _resolve(browser, element):
+    """
+        Gets the page element if `element` is an alias, so it's looked up
+        again on every check.
+    """
+    return browser[element] if isinstance(element, str) else element
+
+
+def element_present(element):
+    """
+        Satisfied when the element is present in the page, even if hidden.
+    """
+    return Condition(
+        lambda browser: browser.is_element_present(element),
+        'element %r present' % (element, ))
+
+
+def element_visible(element):
+    """
+        Satisfied when the element is present and visible.
+    """
+    def check(browser):
+        found = _resolve(browser, element)
+        return bool(found) and browser.is_element_visible(found)
+    return Condition(check, 'element %r visible' % (element, ))
+
+
+def text_equals(element, text):
+    """
+        Satisfied when the element is present and its text equals `text`.
+    """
+    def check(browser):
+        found = _resolve(browser, element)
+        return bool(found) and browser.get_element_text(found) == text
+    return Condition(check, 'element %r text equals %r' % (element, text))
+
+
+def url_matches(pattern):
+    """
+        Satisfied when the current page url matches the `pattern` regular
+        expression.
+    """
+    regex = re.compile(pattern)
+    return Condition(
+        lambda browser: regex.search(browser.page_url) is not None,
+        'url matches %r' % (pattern, ))
+
+
+def element_count(element, count):
+    """
+        Satisfied when exactly `count` elements are found by the selector of
+        `element`.
+    """
+    return Condition(
+        lambda browser: len(_resolve(browser, element)) == count,
+        'element %r count equals %d' % (element, count))
+
+
+def document_ready():
+    """
+        Satisfied when the `document.readyState` of the page is `complete`.
+    """
+    return Condition(
+        lambda browser: (browser.execute_javascript('document.readyState') ==
+                         'complete'),
+        'document ready')
+
+
+def all_of(*conditions):
+    """
+        Satisfied when all the given conditions are satisfied.
+    """
+    return Condition(
+        lambda browser: all(condition(browser) for condition in conditions),
+        '(%s)' % ' and '.join(str(condition) for condition in conditions))
+
+
+def any_of(*conditions):
+    """
+        Satisfied when any of the given conditions is satisfied.
+    """
+    return Condition(
+        lambda browser: any(condition(browser) for condition in conditions),
+        '(%s)' % ' or '.join(str(condition) for condition in conditions))
+
+
+def backoff_intervals(interval, backoff, max_interval):
+    """
+        Yields polling intervals, starting at `interval` and multiplying it by
+        `backoff` each time, up to `max_interval`.
+    """
+    while True:
+        yield interval
+        interval = min(interval * backoff, max_interval)
+
+
+def wait_until(browser, condition, timeout=30, interval=0.05, backoff=1.5,
+               max_interval=1, deadline=None, ignored_exceptions=()):
+    """
+        Checks `condition` against the browser until it's satisfied, sleeping
+        between the checks with an exponential backoff. It stops after
+        `timeout` seconds or at `deadline` (a `time.time()` timestamp),
+        whatever comes first, but the condition is always checked at least
+        once.
+
+        Exceptions in `ignored_exceptions` raised while checking are taken as
+        the condition not being satisfied yet.
+
+        Returns the value returned by the condition and the `WaitTiming`, or
+        raises `WaitTimeoutException` with the `WaitTiming` as `timing`.
+    """
+    started_at = time.time()
+    end = started_at + timeout
+    if deadline is not None:
+        end = min(end, deadline)
+
+    description = str(getattr(condition, 'description', None) or condition)
+    intervals = backoff_intervals(interval, backoff, max_interval)
+    attempts = 0
+
+    while True:
+        attempts += 1
+        try:
+            value = condition(browser)
+        except ignored_exceptions:
+            value = None
+
+        elapsed = time.time() - started_at
+        if value:
+            return value, WaitTiming(description, elapsed, attempts, True)
+
+        remaining = end - time.time()
+        if remaining <= 0:
+            timing = WaitTiming(description, elapsed, attempts, False)
+            raise WaitTimeoutException(
+                "Timed out after %.3fs waiting for %s." % (elapsed,
+                                                          description),
+                timing)
+
+        browser.wait(min(next(intervals), remaining))
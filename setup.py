@@ -9,9 +9,14 @@ setup(
     version=__version__,
     url='https://github.com/gabrielpjordao/pyfunct',
     author=u'Gabriel Jordão',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     include_package_data=True,
-    install_requires=['splinter>=0.7.3'],
-    tests_require=['mock==1.0.1'],
+    install_requires=['splinter>=0.9.0'],
+    extras_require={
+        'lxml': ['lxml', 'cssselect'],
+        'async': ['trollius; python_version < "3.4"',
+                  'futures; python_version < "3"'],
+    },
+    tests_require=['mock==1.0.1', 'lxml', 'cssselect'],
     test_suite="tests"
 )
@@ -0,0 +1,128 @@
+import threading
+import time
+import unittest
+
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.contrib.async_driver import (
+    asyncio_available,
+    AsyncBaseBrowserDriver,
+    AsyncFunctTestCase)
+
+if asyncio_available:
+    from pyfunct.contrib.async_driver import asyncio
+
+
+class ThreadRecordingDriver(BaseBrowserDriver):
+    """
+        Driver that records the threads its methods run in and how many of
+        them run at once.
+    """
+
+    driver_name = 'thread_recording_driver'
+
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def __init__(self):
+        super(ThreadRecordingDriver, self).__init__()
+        self.threads = []
+        self.urls = []
+
+    @property
+    def page_title(self):
+        return 'Title of %s' % self.urls[-1]
+
+    def open_url(self, url):
+        cls = self.__class__
+        with cls.lock:
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+        time.sleep(0.05)
+        self.threads.append(threading.current_thread())
+        self.urls.append(url)
+        with cls.lock:
+            cls.running -= 1
+        return url
+
+    def close(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def clear_session(self):
+        pass
+
+
+@unittest.skipUnless(asyncio_available, 'asyncio is not available')
+class AsyncBaseBrowserDriverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        ThreadRecordingDriver.max_running = 0
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def test_browsers_run_concurrently(self):
+        alice = AsyncBaseBrowserDriver(ThreadRecordingDriver(), self.loop)
+        bob = AsyncBaseBrowserDriver(ThreadRecordingDriver(), self.loop)
+
+        results = self.loop.run_until_complete(asyncio.gather(
+            alice.open_url('/alice'), bob.open_url('/bob'), loop=self.loop))
+
+        self.assertEqual(results, ['/alice', '/bob'])
+        self.assertEqual(ThreadRecordingDriver.max_running, 2)
+        self.assertNotIn(threading.current_thread(), alice.driver.threads)
+
+        title = self.loop.run_until_complete(bob.page_title)
+        self.assertEqual(title, 'Title of /bob')
+
+    def test_calls_to_the_same_browser_are_serialized(self):
+        browser = AsyncBaseBrowserDriver(ThreadRecordingDriver(), self.loop)
+
+        self.loop.run_until_complete(asyncio.gather(
+            browser.open_url('/first'), browser.open_url('/second'),
+            loop=self.loop))
+
+        self.assertEqual(ThreadRecordingDriver.max_running, 1)
+        self.assertEqual(browser.driver.urls, ['/first', '/second'])
+        self.assertEqual(browser.driver_name, 'thread_recording_driver')
+
+
+class AsyncTestCaseTester(AsyncFunctTestCase):
+
+    def gather_browsers(self):
+        self.alice = self.create_async_browser('thread_recording_driver')
+        self.bob = self.create_async_browser('thread_recording_driver')
+        return asyncio.gather(self.alice.open_url('/alice'),
+                              self.bob.open_url('/bob'))
+
+    @unittest.skip('Skipped on purpose')
+    def skipped(self):
+        pass
+
+
+@unittest.skipUnless(asyncio_available, 'asyncio is not available')
+class AsyncFunctTestCaseTestCase(unittest.TestCase):
+
+    def test_awaitable_tests_run_in_the_loop(self):
+        test = AsyncTestCaseTester('gather_browsers')
+        result = unittest.TestResult()
+
+        test.run(result)
+        AsyncTestCaseTester.tearDownClass()
+
+        self.assertTrue(result.wasSuccessful(), result.errors)
+        self.assertEqual(test.alice.driver.urls, ['/alice'])
+        self.assertEqual(test.bob.driver.urls, ['/bob'])
+        self.assertTrue(test.loop.is_closed())
+
+    def test_skipped_tests_dont_set_up(self):
+        test = AsyncTestCaseTester('skipped')
+        result = unittest.TestResult()
+
+        test.run(result)
+
+        self.assertEqual(len(result.skipped), 1)
+        self.assertIsNone(test.loop)
+        self.assertEqual(AsyncTestCaseTester.browsers, [])
@@ -0,0 +1,40 @@
+import unittest
+
+from mock import patch
+
+from pyfunct import AttachedBrowserDriver
+from pyfunct.contrib.attached_driver import AttachedRemote
+
+
+class AttachedBrowserDriverTestCase(unittest.TestCase):
+
+    def test_remote_attaches_to_existing_session(self):
+        remote = AttachedRemote('http://127.0.0.1:4444', 'abc123', True)
+
+        self.assertEqual(remote.session_id, 'abc123')
+        self.assertTrue(remote.w3c)
+
+    @patch('pyfunct.contrib.attached_driver.DaemonClient')
+    def test_browser_is_checked_out_from_daemon(self, DaemonClient):
+        DaemonClient.return_value.request.return_value = {
+            'session_id': 'abc123', 'executor_url': 'http://127.0.0.1:4444',
+            'w3c': False}
+
+        driver = AttachedBrowserDriver('/tmp/daemon.sock')
+
+        DaemonClient.assert_called_once_with('/tmp/daemon.sock')
+        DaemonClient.return_value.request.assert_called_once_with('checkout')
+        self.assertEqual(driver._browser.driver.session_id, 'abc123')
+        self.assertIsNotNone(driver.launch_time)
+
+    @patch('pyfunct.contrib.attached_driver.DaemonClient')
+    def test_quitting_hands_browser_back(self, DaemonClient):
+        DaemonClient.return_value.request.return_value = {
+            'session_id': 'abc123', 'executor_url': 'http://127.0.0.1:4444',
+            'w3c': True}
+        driver = AttachedBrowserDriver()
+
+        driver.close()
+        driver.quit()
+
+        DaemonClient.return_value.close.assert_called_once_with()
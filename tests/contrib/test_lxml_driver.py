@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    from urlparse import parse_qsl
+except ImportError:
+    from urllib.parse import parse_qsl
+
+from pyfunct import LxmlBrowserDriver, Page
+from pyfunct.exceptions import (
+    InvalidUrlException,
+    PageNotLoadedException,
+    ActionNotPerformableException)
+
+
+PAGE_HTML = """
+<html>
+  <head><title> Lxml Testing Title </title></head>
+  <body>
+    <h1 id="title">Welcome</h1>
+    <p class="intro">Some   text
+      here</p>
+    <p id="hidden-by-style" style="display: none">Hidden</p>
+    <div hidden><span id="hidden-by-parent">Hidden</span></div>
+    <a id="link" href="/next?page=2">Next</a>
+    <form id="search" action="/search" method="post">
+      <input type="hidden" name="token" value="abc">
+      <input type="text" name="query" value="old">
+      <textarea name="comment"></textarea>
+      <input type="checkbox" name="exact" value="yes">
+      <input type="radio" name="sort" value="date" checked>
+      <input type="radio" name="sort" value="relevance">
+      <select name="lang">
+        <option value="en">English</option>
+        <option value="pt">Portuguese</option>
+      </select>
+      <button type="submit" name="action" value="go">Search</button>
+    </form>
+    <form id="filter" action="/filter">
+      <input type="text" name="q">
+      <input type="submit" value="Filter">
+    </form>
+  </body>
+</html>
+"""
+
+
+def echo_app(environ, start_response):
+    """
+        WSGI app that renders the request it gets.
+    """
+    body = environ['wsgi.input'].read(int(environ['CONTENT_LENGTH'] or 0))
+    start_response('200 OK', [('Content-Type', 'text/html')])
+    return [
+        b'<html><head><title>', environ['REQUEST_METHOD'].encode('ascii'),
+        b' ', environ['PATH_INFO'].encode('ascii'), b'</title></head>',
+        b'<body><p id="query">', environ['QUERY_STRING'].encode('ascii'),
+        b'</p><p id="body">', body, b'</p>',
+        b'<a id="home" href="/">Home</a></body></html>',
+    ]
+
+
+class LxmlBrowserDriverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = LxmlBrowserDriver(wsgi_app=echo_app)
+        self.driver.load_html(PAGE_HTML, 'http://localhost/page')
+
+    def test_page_not_loaded(self):
+        with self.assertRaises(PageNotLoadedException):
+            LxmlBrowserDriver().page_title
+
+    def test_page_properties(self):
+        self.assertEqual(self.driver.page_url, 'http://localhost/page')
+        self.assertEqual(self.driver.page_title, 'Lxml Testing Title')
+        self.assertIn('<h1 id="title">Welcome</h1>', self.driver.page_source)
+
+    def test_get_elements(self):
+        driver = self.driver
+
+        self.assertEqual(len(driver.get_element_by_xpath('//p')), 2)
+        self.assertEqual(driver.get_element_by_css('p.intro')[0].tag, 'p')
+        self.assertEqual(driver.get_element_by_id('title')[0].tag, 'h1')
+        self.assertEqual(len(driver.get_element_by_tag('form')), 2)
+        self.assertEqual(driver.get_element_by_text('Next')[0].get('id'),
+                         'link')
+        self.assertEqual(driver.get_element_by_id('missing'), [])
+
+    def test_get_element_text(self):
+        text = self.driver.get_element_text(
+            self.driver.get_element_by_css('p.intro'))
+        self.assertEqual(text, 'Some text here')
+
+    def test_is_element_visible(self):
+        driver = self.driver
+
+        self.assertTrue(driver.is_element_visible(
+            driver.get_element_by_id('title')))
+        self.assertFalse(driver.is_element_visible(
+            driver.get_element_by_id('hidden-by-style')))
+        self.assertFalse(driver.is_element_visible(
+            driver.get_element_by_id('hidden-by-parent')))
+        self.assertFalse(driver.is_element_visible(
+            driver.get_element_by_xpath('//input[@name="token"]')))
+
+    def test_click_link(self):
+        self.driver.click(self.driver.get_element_by_id('link'))
+
+        self.assertEqual(self.driver.page_url, 'http://localhost/next?page=2')
+        self.assertEqual(self.driver.page_title, 'GET /next')
+
+    def test_fill_and_submit_post_form(self):
+        driver = self.driver
+
+        driver.fill(driver.get_element_by_xpath('//input[@name="query"]'),
+                    u'caf\xe9')
+        driver.type(driver.get_element_by_xpath('//textarea'), 'Nice')
+        driver.type(driver.get_element_by_xpath('//textarea'), ' one')
+        driver.check(driver.get_element_by_xpath('//input[@name="exact"]'))
+        driver.choose(driver.get_element_by_xpath('//input[@name="sort"]'),
+                      'relevance')
+        driver.select(driver.get_element_by_xpath('//select'), 'pt')
+
+        driver.click(driver.get_element_by_css('button'))
+
+        self.assertEqual(driver.page_url, 'http://localhost/search')
+        self.assertEqual(driver.page_title, 'POST /search')
+
+        body = driver.get_element_text(driver.get_element_by_id('body'))
+        self.assertEqual(sorted(parse_qsl(body)), sorted([
+            ('token', 'abc'),
+            ('query', 'caf\xc3\xa9'),
+            ('comment', 'Nice one'),
+            ('exact', 'yes'),
+            ('sort', 'relevance'),
+            ('lang', 'pt'),
+            ('action', 'go'),
+        ]))
+
+    def test_submit_get_form(self):
+        driver = self.driver
+
+        driver.fill(driver.get_element_by_xpath('//input[@name="q"]'), 'x y')
+        driver.click(driver.get_element_by_xpath('//input[@type="submit"]'))
+
+        self.assertEqual(driver.page_url, 'http://localhost/filter?q=x+y')
+        self.assertEqual(driver.page_title, 'GET /filter')
+
+    def test_select_by_text_and_uncheck(self):
+        driver = self.driver
+        select = driver.get_element_by_xpath('//select')
+        checkbox = driver.get_element_by_xpath('//input[@name="exact"]')
+
+        driver.select_by_text(select, 'Portuguese')
+        driver.check(checkbox)
+        driver.uncheck(checkbox)
+
+        self.assertEqual(select[0].value, 'pt')
+        self.assertFalse(checkbox[0].checked)
+
+    def test_clear(self):
+        query = self.driver.get_element_by_xpath('//input[@name="query"]')
+        self.driver.clear(query)
+        self.assertEqual(query[0].value, '')
+
+    def test_action_with_missing_element_raises(self):
+        with self.assertRaises(ActionNotPerformableException):
+            self.driver.click(self.driver.get_element_by_id('missing'))
+
+    def test_history(self):
+        driver = self.driver
+
+        driver.open_url('http://localhost/first')
+        driver.open_url('http://localhost/second')
+
+        driver.go_back()
+        self.assertEqual(driver.page_title, 'GET /first')
+        driver.go_back()
+        self.assertEqual(driver.page_title, 'Lxml Testing Title')
+        driver.go_forward()
+        self.assertEqual(driver.page_title, 'GET /first')
+
+        driver.reload()
+        self.assertEqual(driver.page_url, 'http://localhost/first')
+
+    def test_element_action_gets_elements_by_alias(self):
+
+        class LxmlTestPage(Page):
+            page_name = 'lxml test page'
+
+            def get_url(self):
+                return '/'
+
+            @property
+            def elements_selectors(self):
+                return (('next link', '#link', 'css'),)
+
+        self.driver.switch_page('lxml test page')
+        self.driver.click('next link')
+
+        self.assertEqual(self.driver.page_title, 'GET /next')
+
+    def test_snapshot_page(self):
+
+        class LxmlSnapshotPage(Page):
+            page_name = 'lxml snapshot page'
+
+            def get_url(self):
+                return '/'
+
+            @property
+            def elements_selectors(self):
+                return (('title', 'title', 'id'),
+                        ('query box', 'query', 'name'),
+                        ('hidden', 'hidden-by-style', 'id'),
+                        ('missing', 'missing', 'id'))
+
+        self.driver.switch_page('lxml snapshot page')
+        snapshot = self.driver.snapshot_page()
+
+        self.assertEqual(snapshot.title, 'Lxml Testing Title')
+        self.assertEqual(snapshot.text('title'), 'Welcome')
+        self.assertEqual(snapshot['query box'].value, 'old')
+        self.assertEqual(snapshot.attribute('query box', 'type'), 'text')
+        self.assertFalse(snapshot['hidden'].visible)
+        self.assertFalse(snapshot['missing'].present)
+
+    def test_open_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'page.html')
+        with open(path, 'w') as page_file:
+            page_file.write(PAGE_HTML)
+
+        driver = LxmlBrowserDriver()
+        driver.open_url(path)
+        self.assertEqual(driver.page_title, 'Lxml Testing Title')
+
+        driver.open_url('file://' + path)
+        self.assertEqual(driver.page_url, 'file://' + path)
+
+    def test_http_url_without_wsgi_app(self):
+        with self.assertRaises(InvalidUrlException):
+            LxmlBrowserDriver().open_url('http://localhost/')
@@ -1,8 +1,19 @@
-from mock import patch, Mock
+import warnings
 
+from mock import call, patch, Mock
+
+from selenium.common.exceptions import (
+    WebDriverException,
+    StaleElementReferenceException)
+from selenium.webdriver.chrome.options import Options as ChromeOptions
 from splinter.element_list import ElementList
-from pyfunct import SplinterBrowserDriver, Page
+from pyfunct import SplinterBrowserDriver, Page, config
+from pyfunct.contrib.splinter_driver import (
+    PAGELOAD_SCRIPT,
+    DOM_GENERATION_SCRIPT)
+from pyfunct.scripts import SESSION_STORAGE_SCRIPT
 from pyfunct.exceptions import (
+    InvalidConfigurationException,
     PageNotLoadedException,
     ActionNotPerformableException)
 import unittest
@@ -27,6 +38,9 @@ class SplinterBrowserDriverTestCase(unittest.TestCase):
 
         default_browser = Mock()
         config.default_browser = default_browser
+        config.blocked_urls = ()
+        config.block_images = config.block_stylesheets = False
+        config.launch_profile = None
 
         driver = SplinterBrowserDriver()
 
@@ -49,6 +63,159 @@ class SplinterBrowserDriverTestCase(unittest.TestCase):
         Browser.assert_called_once_with(*args, **kwargs)
         self.assertEqual(driver._browser, expected_result)
 
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_firefox_blocks_images_and_stylesheets(self, Browser):
+        with patch.object(config, 'block_images', True), \
+                patch.object(config, 'block_stylesheets', True):
+            SplinterBrowserDriver('firefox',
+                                  profile_preferences={'some.pref': 1})
+
+        Browser.assert_called_once_with('firefox', profile_preferences={
+            'some.pref': 1,
+            'permissions.default.image': 2,
+            'permissions.default.stylesheet': 2,
+        })
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_firefox_cant_block_urls(self, Browser):
+        with patch.object(config, 'blocked_urls', ['*analytics*']), \
+                warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            SplinterBrowserDriver('firefox')
+
+        Browser.assert_called_once_with('firefox')
+        self.assertEqual(len(caught), 1)
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_chrome_blocks_resources(self, Browser):
+        with patch.object(config, 'blocked_urls', ['*analytics*']), \
+                patch.object(config, 'block_images', True), \
+                patch.object(config, 'block_stylesheets', True):
+            SplinterBrowserDriver('chrome')
+
+        options = Browser.call_args[1]['options']
+        self.assertEqual(
+            options.experimental_options['prefs'],
+            {'profile.managed_default_content_settings.images': 2})
+        Browser.return_value.driver.execute_cdp_cmd.assert_called_with(
+            'Network.setBlockedURLs', {'urls': ['*analytics*', '*.css*']})
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_chrome_launch_profile(self, Browser):
+        profiles = {'ci': {
+            'browser': 'chrome', 'headless': True, 'no_sandbox': True,
+            'disable_extensions': True, 'window_size': (1280, 800),
+            'disk_cache_dir': '/tmp/cache', 'wait_time': 5}}
+
+        with patch.object(config, 'launch_profiles', profiles), \
+                patch.object(config, 'launch_profile', 'ci'):
+            driver = SplinterBrowserDriver()
+
+        args, kwargs = Browser.call_args
+        self.assertEqual(args, ('chrome', ))
+        self.assertTrue(kwargs['headless'])
+        self.assertEqual(kwargs['wait_time'], 5)
+        self.assertEqual(kwargs['options'].arguments, [
+            '--no-sandbox', '--disable-extensions', '--window-size=1280,800',
+            '--disk-cache-dir=/tmp/cache'])
+        self.assertIsNotNone(driver.launch_time)
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_launch_profile_doesnt_change_given_options(self, Browser):
+        profiles = {'ci': {'browser': 'chrome', 'no_sandbox': True}}
+        options = ChromeOptions()
+        options.add_argument('--lang=en')
+
+        with patch.object(config, 'launch_profiles', profiles):
+            SplinterBrowserDriver(launch_profile='ci', options=options)
+            SplinterBrowserDriver(launch_profile='ci', options=options)
+
+        self.assertEqual(options.arguments, ['--lang=en'])
+        self.assertEqual(Browser.call_args[1]['options'].arguments,
+                         ['--lang=en', '--no-sandbox'])
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_firefox_launch_profile(self, Browser):
+        profiles = {'small': {'headless': True, 'window_size': (800, 600),
+                              'disk_cache_dir': '/tmp/cache'}}
+
+        with patch.object(config, 'launch_profiles', profiles):
+            SplinterBrowserDriver('firefox', launch_profile='small')
+
+        Browser.assert_called_once_with(
+            'firefox', headless=True, profile_preferences={
+                'browser.cache.disk.parent_directory': '/tmp/cache'})
+        Browser.return_value.driver.set_window_size.assert_called_once_with(
+            800, 600)
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_unknown_launch_profile(self, Browser):
+        with self.assertRaises(InvalidConfigurationException):
+            SplinterBrowserDriver(launch_profile='missing')
+
+    @patch('pyfunct.contrib.splinter_driver.get_reporter')
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_launch_time_is_reported(self, Browser, get_reporter):
+        driver = SplinterBrowserDriver('firefox')
+
+        get_reporter.return_value.report_launch.assert_called_once_with(
+            'splinter', 'firefox', None, driver.launch_time)
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_get_webdriver_session(self, mocked_browser):
+        webdriver = mocked_browser.driver
+        webdriver.session_id = 'abc123'
+        webdriver.command_executor._url = 'http://127.0.0.1:4444'
+        webdriver.w3c = True
+
+        driver = self._get_driver(mocked_browser)
+
+        self.assertEqual(driver.get_webdriver_session(), {
+            'session_id': 'abc123', 'executor_url': 'http://127.0.0.1:4444',
+            'w3c': True})
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_stale_element_actions_are_retried(self, mocked_browser):
+        class PageWithStaleButton(Page):
+            page_name = 'page with stale button'
+
+            def get_url(self):
+                return '/'
+
+            @property
+            def elements_selectors(self):
+                return [('button', '//button')]
+
+        driver = self._get_driver(mocked_browser)
+        driver.switch_page('page with stale button')
+        driver.wait = Mock()
+        element = mocked_browser.find_by_xpath.return_value
+        element.click.side_effect = [StaleElementReferenceException, None]
+
+        with patch.object(config, 'element_action_attempts', 2):
+            driver.click('button')
+
+        self.assertEqual(element.click.call_count, 2)
+        self.assertEqual(driver.retry_counts[('click', 'button')], 1)
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_get_screenshot(self, mocked_browser):
+        mocked_browser.driver.get_screenshot_as_png.return_value = b'PNG'
+
+        driver = self._get_driver(mocked_browser)
+
+        self.assertEqual(driver.get_screenshot(), b'PNG')
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_get_console_log(self, mocked_browser):
+        entries = [{'level': 'SEVERE', 'message': 'Uncaught TypeError'}]
+        mocked_browser.driver.get_log.return_value = entries
+
+        driver = self._get_driver(mocked_browser)
+
+        self.assertEqual(driver.get_console_log(), entries)
+        mocked_browser.driver.get_log.assert_called_once_with('browser')
+
     @patch('pyfunct.contrib.splinter_driver.Browser')
     def test_page_url(self, mocked_browser):
 
@@ -370,6 +537,16 @@ class SplinterBrowserDriverTestCase(unittest.TestCase):
         mocked_browser.evaluate_script.assert_called_once_with(script)
         self.assertEqual(expected_result, result)
 
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_get_dom_generation(self, mocked_browser):
+
+        driver = self._get_driver(mocked_browser)
+        mocked_browser.evaluate_script.return_value = 'k2l1x:3'
+
+        self.assertEqual(driver.get_dom_generation(), 'k2l1x:3')
+        mocked_browser.evaluate_script.assert_called_once_with(
+            DOM_GENERATION_SCRIPT)
+
     @patch('pyfunct.contrib.splinter_driver.Browser')
     def test_get_iframe(self, mocked_browser):
 
@@ -409,6 +586,49 @@ class SplinterBrowserDriverTestCase(unittest.TestCase):
         with self.assertRaises(PageNotLoadedException):
             driver.wait_pageload(timeout=0.01)
 
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_wait_pageload_through_events(self, mocked_browser):
+
+        driver = self._get_driver(mocked_browser)
+        mocked_browser.driver.execute_async_script.return_value = 'complete'
+
+        driver.wait_pageload(timeout=5)
+
+        self.assertEqual(
+            mocked_browser.driver.set_script_timeout.call_args_list,
+            [call(5), call(SplinterBrowserDriver.script_timeout)])
+        mocked_browser.driver.execute_async_script.assert_called_once_with(
+            PAGELOAD_SCRIPT)
+        self.assertFalse(mocked_browser.evaluate_script.called)
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_wait_pageload_restores_script_timeout(self, mocked_browser):
+
+        driver = self._get_driver(mocked_browser)
+        mocked_browser.driver.timeouts.script = 12
+        mocked_browser.driver.execute_async_script.return_value = 'complete'
+
+        driver.wait_pageload(timeout=5)
+
+        self.assertEqual(
+            mocked_browser.driver.set_script_timeout.call_args_list,
+            [call(5), call(12)])
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_wait_pageload_falls_back_to_polling(self, mocked_browser):
+
+        driver = self._get_driver(mocked_browser)
+        mocked_browser.driver.execute_async_script.side_effect = \
+            WebDriverException('document unloaded while waiting for result')
+        mocked_browser.evaluate_script.side_effect = [
+            'loading', 'interactive', 'complete']
+
+        driver.wait_pageload(timeout=5)
+
+        self.assertEqual(mocked_browser.evaluate_script.call_count, 3)
+        mocked_browser.evaluate_script.assert_called_with(
+            'document.readyState')
+
     @patch('pyfunct.contrib.splinter_driver.Browser')
     def test_click_and_wait(self, mocked_browser):
 
@@ -513,3 +733,54 @@ class SplinterBrowserDriverTestCase(unittest.TestCase):
         driver.click(alias)
         driver._browser.find_by_xpath.assert_called_once_with(selector)
         element_mock.click.assert_called_once_with()
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_get_session_state(self, mocked_browser):
+        driver = self._get_driver(mocked_browser)
+        cookies = [{'name': 'sessionid', 'value': '123', 'httpOnly': True}]
+        mocked_browser.driver.get_cookies.return_value = cookies
+        mocked_browser.evaluate_script.return_value = [
+            'http://localhost/home', {'theme': 'dark'}, {'tab': '2'}]
+
+        state = driver.get_session_state()
+
+        mocked_browser.evaluate_script.assert_called_once_with(
+            SESSION_STORAGE_SCRIPT)
+        self.assertEqual(state, {
+            'url': 'http://localhost/home',
+            'cookies': cookies,
+            'local_storage': {'theme': 'dark'},
+            'session_storage': {'tab': '2'},
+        })
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_restore_session_state(self, mocked_browser):
+        driver = self._get_driver(mocked_browser)
+        mocked_browser.url = 'about:blank'
+        cookie = {'name': 'sessionid', 'value': '123'}
+
+        driver.restore_session_state({
+            'url': 'http://localhost/home',
+            'cookies': [cookie],
+            'local_storage': {'theme': 'dark'},
+            'session_storage': {},
+        })
+
+        mocked_browser.driver.get.assert_called_once_with(
+            'http://localhost/home')
+        mocked_browser.driver.delete_all_cookies.assert_called_once_with()
+        mocked_browser.driver.add_cookie.assert_called_once_with(cookie)
+        self.assertEqual(mocked_browser.evaluate_script.call_count, 1)
+        self.assertIn('[{"theme": "dark"}, {}]',
+                      mocked_browser.evaluate_script.call_args[0][0])
+
+    @patch('pyfunct.contrib.splinter_driver.Browser')
+    def test_restore_session_state_on_the_same_site(self, mocked_browser):
+        driver = self._get_driver(mocked_browser)
+        mocked_browser.url = 'http://localhost/other'
+
+        driver.restore_session_state({
+            'url': 'http://localhost/home', 'cookies': [],
+            'local_storage': {}, 'session_storage': {}})
+
+        self.assertFalse(mocked_browser.driver.get.called)
@@ -0,0 +1,115 @@
+import json
+import unittest
+
+from mock import patch
+
+from pyfunct import WSGIBrowserDriver, Page, config
+from pyfunct.contrib.wsgi_driver import load_wsgi_app
+from pyfunct.exceptions import (
+    InvalidConfigurationException,
+    PageNotLoadedException)
+
+
+def session_app(environ, start_response):
+    """
+        WSGI app that logs in through a redirect and greets the logged user.
+    """
+    path = environ['PATH_INFO']
+
+    if path == '/login':
+        start_response('302 Found', [
+            ('Location', '/home'),
+            ('Set-Cookie', 'user=gabriel; Path=/'),
+        ])
+        return [b'']
+
+    if path == '/loop':
+        start_response('302 Found', [('Location', '/loop')])
+        return [b'']
+
+    user = 'anonymous'
+    for cookie in environ.get('HTTP_COOKIE', '').split(';'):
+        name, _, value = cookie.strip().partition('=')
+        if name == 'user':
+            user = value
+
+    start_response('200 OK', [('Content-Type', 'text/html')])
+    return [
+        b'<html><head><title>', path.encode('ascii'), b'</title></head>',
+        b'<body><p id="user">', user.encode('ascii'), b'</p></body></html>',
+    ]
+
+
+class HomePage(Page):
+
+    page_name = 'wsgi home'
+
+    def get_url(self):
+        return '/home'
+
+    @property
+    def elements_selectors(self):
+        return (('user', 'user', 'id'),)
+
+
+class WSGIBrowserDriverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = WSGIBrowserDriver(session_app)
+
+    def test_open_page_calls_the_app(self):
+        self.driver.open_page('wsgi home')
+
+        self.assertEqual(self.driver.page_url, config.base_url + '/home')
+        self.assertEqual(self.driver.page_title, '/home')
+        self.assertEqual(
+            self.driver.get_element_text(self.driver['user']), 'anonymous')
+
+    def test_follows_redirects_keeping_cookies(self):
+        self.driver.open_url('http://localhost/login')
+
+        self.assertEqual(self.driver.page_url, 'http://localhost/home')
+        self.assertEqual(self.driver.page_title, '/home')
+
+        self.driver.open_page('wsgi home')
+        self.assertEqual(
+            self.driver.get_element_text(self.driver['user']), 'gabriel')
+
+    def test_clear_session(self):
+        self.driver.open_url('http://localhost/login')
+
+        self.driver.clear_session()
+        self.driver.open_page('wsgi home')
+
+        self.assertEqual(
+            self.driver.get_element_text(self.driver['user']), 'anonymous')
+
+    def test_session_state(self):
+        self.driver.open_url('http://localhost/login')
+        state = json.loads(json.dumps(self.driver.get_session_state()))
+        self.driver.clear_session()
+
+        self.driver.restore_session_state(state)
+        self.driver.open_page('wsgi home')
+
+        self.assertEqual(state['url'], 'http://localhost/home')
+        self.assertEqual(self.driver.get_element_text(self.driver['user']),
+                         'gabriel')
+
+    def test_too_many_redirects(self):
+        with self.assertRaises(PageNotLoadedException):
+            self.driver.open_url('http://localhost/loop')
+
+    def test_app_from_config(self):
+        with patch.object(config, 'wsgi_app', session_app):
+            driver = WSGIBrowserDriver()
+
+        self.assertIs(driver.wsgi_app, session_app)
+
+    def test_missing_app(self):
+        with self.assertRaises(InvalidConfigurationException):
+            WSGIBrowserDriver()
+
+    def test_load_wsgi_app_by_import_path(self):
+        app = load_wsgi_app('tests.contrib.test_wsgi_driver:session_app')
+        self.assertIs(app, session_app)
@@ -1,6 +1,27 @@
+import gc
+import os
+import shutil
+import tempfile
+import threading
 import unittest
 
-from pyfunct.actions import Actions, action
+from mock import patch
+
+from pyfunct import config
+from pyfunct.actions import (
+    Actions,
+    action,
+    action_cache,
+    CACHE_SCOPES,
+    SESSION_ID_VARIABLE,
+    session_id)
+from pyfunct.browsers import BaseBrowserDriver
+
+
+class MemoizingDriver(BaseBrowserDriver):
+
+    driver_name = 'memoizing_driver'
+
 
 class ActionsTestCase(unittest.TestCase):
 
@@ -16,4 +37,189 @@ class ActionsTestCase(unittest.TestCase):
     def test_undefined_action_raises_AttributeError(self):
         with self.assertRaises(AttributeError):
             actions = Actions()
-            actions.undefined_action()
\ No newline at end of file
+            actions.undefined_action()
+
+
+class MemoizedActionsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        for scope in CACHE_SCOPES:
+            self.addCleanup(action_cache.clear, scope)
+
+    def _cached_action(self, scope, maxsize=128):
+        @action(cache=scope, maxsize=maxsize)
+        def seed_article(title):
+            self.calls.append(title)
+            return 'article %s' % title
+        return seed_article
+
+    def test_results_are_cached_by_arguments(self):
+        seed_article = self._cached_action('process')
+
+        self.assertEqual(seed_article('a'), 'article a')
+        self.assertEqual(seed_article('a'), 'article a')
+        self.assertEqual(seed_article(title='b'), 'article b')
+        self.assertEqual(Actions().seed_article('b'), 'article b')
+
+        self.assertEqual(self.calls, ['a', 'b', 'b'])
+
+    def test_scopes_are_cleared(self):
+        seed_article = self._cached_action('test')
+        seed_article('a')
+
+        action_cache.clear('class')
+        seed_article('a')
+        action_cache.clear('test')
+        seed_article('a')
+
+        self.assertEqual(self.calls, ['a', 'a'])
+
+    def test_invalidate(self):
+        seed_article = self._cached_action('class')
+        seed_article('a')
+        seed_article('b')
+
+        seed_article.invalidate('a')
+        seed_article('a')
+        seed_article('b')
+        self.assertEqual(self.calls, ['a', 'b', 'a'])
+
+        seed_article.cache_clear()
+        seed_article('b')
+        self.assertEqual(self.calls, ['a', 'b', 'a', 'b'])
+
+    def test_least_recently_used_results_are_evicted(self):
+        seed_article = self._cached_action('process', maxsize=2)
+
+        for title in ['a', 'b', 'a', 'c', 'a', 'b']:
+            seed_article(title)
+
+        self.assertEqual(self.calls, ['a', 'b', 'c', 'b'])
+
+    def test_browsers_are_part_of_the_key(self):
+
+        @action(cache='class')
+        def open_wizard(browser):
+            self.calls.append(browser)
+
+        first, second = MemoizingDriver(), MemoizingDriver()
+        open_wizard(first)
+        open_wizard(second)
+        open_wizard(first)
+
+        self.assertEqual(self.calls, [first, second])
+
+    def test_results_of_browsers_gone_arent_reused(self):
+
+        @action(cache='process')
+        def log_in(browser):
+            self.calls.append(browser.instance_id)
+
+        browser = MemoizingDriver()
+        log_in(browser)
+        gone_id = id(browser)
+        del browser
+        # Drivers reference themselves through their `selection_methods`.
+        gc.collect()
+
+        # Keeps the browsers alive until one gets the id of the one gone.
+        browsers = []
+        for _ in range(100):
+            browsers.append(MemoizingDriver())
+            if id(browsers[-1]) == gone_id:
+                break
+        log_in(browsers[-1])
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_unhashable_arguments_arent_cached(self):
+        seed_article = self._cached_action('process')
+
+        seed_article(['a'])
+        seed_article(['a'])
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_session_scope_is_shared_through_disk(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with patch.object(config, 'action_cache_dir', directory), \
+                patch.dict(os.environ, {SESSION_ID_VARIABLE: 'run-1'}):
+            seed_article = self._cached_action('session')
+            seed_article('a')
+            self.assertTrue(os.path.isdir(
+                os.path.join(directory, 'pyfunct-actions-run-1')))
+
+            self.assertEqual(seed_article('a'), 'article a')
+            self.assertEqual(self.calls, ['a'])
+
+            action_cache.clear('session')
+            seed_article('a')
+            self.assertEqual(self.calls, ['a', 'a'])
+
+    def test_session_scope_keeps_maxsize_results(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with patch.object(config, 'action_cache_dir', directory), \
+                patch.dict(os.environ, {SESSION_ID_VARIABLE: 'run-1'}):
+            seed_article = self._cached_action('session', maxsize=2)
+            seed_article('a')
+            seed_article('b')
+            seed_article('c')
+            seed_article('c')
+            seed_article('a')
+
+            self.assertEqual(self.calls, ['a', 'b', 'c', 'a'])
+
+    def test_session_scope_skips_arguments_without_stable_keys(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with patch.object(config, 'action_cache_dir', directory), \
+                patch.dict(os.environ, {SESSION_ID_VARIABLE: 'run-1'}):
+            seed_article = self._cached_action('session')
+            title = object()
+            seed_article(title)
+            seed_article(title)
+            seed_article(1.5)
+            seed_article(1.5)
+
+            self.assertEqual(self.calls, [title, title, 1.5])
+
+    def test_session_scope_skips_unpicklable_results(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        @action(cache='session')
+        def create_lock(name):
+            self.calls.append(name)
+            return threading.Lock()
+
+        with patch.object(config, 'action_cache_dir', directory), \
+                patch.dict(os.environ, {SESSION_ID_VARIABLE: 'run-1'}):
+            create_lock('a')
+            create_lock('a')
+
+            self.assertEqual(self.calls, ['a', 'a'])
+            results_directory = os.path.join(directory,
+                                             'pyfunct-actions-run-1')
+            for _, _, names in os.walk(results_directory):
+                self.assertEqual(names, [])
+
+    def test_session_id_is_unique_for_each_run(self):
+        with patch.dict(os.environ, {SESSION_ID_VARIABLE: ''}), \
+                patch('pyfunct.actions.atexit') as atexit:
+            first_id = session_id()
+            self.assertEqual(session_id(), first_id)
+            self.assertEqual(atexit.register.call_count, 1)
+
+            os.environ[SESSION_ID_VARIABLE] = ''
+            self.assertNotEqual(session_id(), first_id)
+            self.assertNotIn(str(os.getpid()), first_id)
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            self._cached_action('forever')
@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from pyfunct import FunctTestCase, config
+from pyfunct import artifacts
+from pyfunct.artifacts import ArtifactStore, capture_browser_artifacts
+from pyfunct.browsers import BaseBrowserDriver
+
+
+class ArtifactsDriver(BaseBrowserDriver):
+
+    driver_name = 'artifacts_driver'
+
+    page_source = u'<html>Failed</html>'
+
+    def get_screenshot(self):
+        return b'PNG'
+
+    def clear_session(self):
+        pass
+
+    def close(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+class CapturedTestCase(FunctTestCase):
+
+    def fails(self):
+        self.fail('Failed on purpose')
+
+    def succeeds(self):
+        pass
+
+
+class ArtifactStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def read_manifest(self, store, test_id):
+        with open(store.manifest_path(test_id)) as manifest:
+            return json.load(manifest)
+
+    def test_identical_artifacts_are_stored_once(self):
+        store = ArtifactStore(self.directory)
+        store.put_test('first', {'page.html': b'<html></html>'})
+        store.put_test('second', {'page.html': b'<html></html>',
+                                  'screenshot.png': b'PNG'})
+        store.close()
+
+        first = self.read_manifest(store, 'first')
+        second = self.read_manifest(store, 'second')
+        self.assertEqual(first['page.html'], second['page.html'])
+        self.assertEqual(store.load(second['screenshot.png']), b'PNG')
+
+        objects = [name for _, _, names in
+                   os.walk(os.path.join(self.directory, 'objects'))
+                   for name in names]
+        self.assertEqual(len(objects), 2)
+
+    def test_artifacts_over_quota_are_dropped(self):
+        store = ArtifactStore(self.directory, quota=50)
+        store.put_test('test', {'big': os.urandom(100), 'small': b'small'})
+        store.close()
+
+        self.assertEqual(store.dropped, 1)
+        self.assertEqual(list(self.read_manifest(store, 'test')), ['small'])
+
+    def test_quota_is_shared_by_stores_of_the_same_directory(self):
+        first = ArtifactStore(self.directory, quota=150)
+        second = ArtifactStore(self.directory, quota=150)
+
+        first.put_test('first', {'big': os.urandom(100)})
+        first.close()
+        second.put_test('second', {'big': os.urandom(100)})
+        second.close()
+
+        self.assertEqual(first.dropped, 0)
+        self.assertEqual(second.dropped, 1)
+        self.assertEqual(self.read_manifest(second, 'second'), {})
+
+    def test_capture_leaves_out_failed_artifacts(self):
+        captured = capture_browser_artifacts(ArtifactsDriver())
+
+        self.assertEqual(captured, {'screenshot.png': b'PNG',
+                                    'page.html': b'<html>Failed</html>'})
+
+
+class FailureCaptureTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_test(self, method_name):
+        with patch.object(config, 'artifacts_dir', self.directory), \
+                patch.object(config, 'default_driver_name',
+                             'artifacts_driver'):
+            test = CapturedTestCase(method_name)
+            test.run(unittest.TestResult())
+            CapturedTestCase.tearDownClass()
+            store = artifacts.get_artifact_store()
+            store.close()
+        return store, test.id()
+
+    def test_failed_tests_are_captured(self):
+        store, test_id = self.run_test('fails')
+
+        with open(store.manifest_path(test_id)) as manifest:
+            digests = json.load(manifest)
+        self.assertEqual(sorted(digests),
+                         ['0-artifacts_driver/page.html',
+                          '0-artifacts_driver/screenshot.png'])
+        self.assertEqual(
+            store.load(digests['0-artifacts_driver/page.html']),
+            b'<html>Failed</html>')
+
+    def test_successful_tests_arent_captured(self):
+        store, test_id = self.run_test('succeeds')
+
+        self.assertFalse(os.path.exists(store.manifest_path(test_id)))
+
+    @patch('atexit.register')
+    def test_recreated_stores_arent_registered_at_exit(self, register):
+        other_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_directory)
+
+        for directory in (self.directory, other_directory):
+            with patch.object(config, 'artifacts_dir', directory):
+                store = artifacts.get_artifact_store()
+        store.close()
+
+        self.assertFalse(register.called)
@@ -0,0 +1,36 @@
+import unittest
+
+from benchmarks.run import compare, run_benchmarks
+from benchmarks.scenarios import SCENARIOS
+from pyfunct import config
+from pyfunct.browsers import REGISTERED_DRIVERS
+
+
+class BenchmarksTestCase(unittest.TestCase):
+
+    def test_stub_driver_is_registered(self):
+        self.assertIn('benchmark_stub', REGISTERED_DRIVERS)
+
+    def test_all_scenarios_run(self):
+        default_driver_name = config.default_driver_name
+
+        results = run_benchmarks(number=2, repeat=1)
+
+        self.assertEqual(sorted(results['scenarios']), sorted(SCENARIOS))
+        for result in results['scenarios'].values():
+            self.assertGreater(result['best'], 0)
+            self.assertEqual(result['best'], result['median'])
+
+        # scenarios undo their config changes
+        self.assertEqual(config.default_driver_name, default_driver_name)
+        self.assertFalse(config.cache_page_elements)
+
+    def test_compare(self):
+        baseline = {'scenarios': {'fast': {'best': 1.0},
+                                  'slow': {'best': 1.0}}}
+        results = {'scenarios': {'fast': {'best': 1.05},
+                                 'slow': {'best': 1.5},
+                                 'new': {'best': 1.0}}}
+
+        self.assertEqual(compare(results, baseline, threshold=0.1),
+                         [('fast', 1.05, False), ('slow', 1.5, True)])
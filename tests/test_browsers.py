@@ -1,9 +1,19 @@
 import unittest
 
-from mock import Mock
-from pyfunct.browsers import REGISTERED_DRIVERS, BaseBrowserDriver
+from mock import Mock, patch
+from pyfunct.browsers import (
+    REGISTERED_DRIVERS,
+    BaseBrowserDriver,
+    ElementState,
+    element_action)
 from pyfunct import Page, config
-from pyfunct.exceptions import InvalidUrlException
+from pyfunct.scripts import PAGE_SNAPSHOT_SCRIPT
+from pyfunct.exceptions import (
+    ActionNotPerformableException,
+    InvalidConfigurationException,
+    InvalidUrlException,
+    SelectorTypeNotSupportedException,
+    UnregisteredElementException)
 
 class BrowserDriverMetaclassTestCase(unittest.TestCase):
 
@@ -43,6 +53,43 @@ class BaseBrowserDriverTestCase(unittest.TestCase):
 
         self.assertIsInstance(driver._current_page, SwitchedPage)
 
+    def test_page_elements_are_found_by_selection_methods(self):
+        class PageSelectedByName(Page):
+            page_name = 'page_selected_by_name'
+
+            @property
+            def elements_selectors(self):
+                return [('query', 'q', 'name')]
+
+        class SelectionMethodsDriver(BaseBrowserDriver):
+            driver_name = 'selection_methods_driver'
+
+        driver = SelectionMethodsDriver()
+        driver.switch_page('page_selected_by_name')
+        driver.selection_methods['name'] = Mock(return_value='query input')
+
+        self.assertEqual(driver.get_page_element('query'), 'query input')
+        driver.selection_methods['name'].assert_called_once_with('q')
+
+        del driver.selection_methods['name']
+        with self.assertRaises(SelectorTypeNotSupportedException):
+            driver.get_page_element('query')
+
+    def test_elements_registered_later_are_found(self):
+        class PageGrowingElements(Page):
+            page_name = 'page_growing_elements'
+
+        class GrowingPageDriver(BaseBrowserDriver):
+            driver_name = 'growing_page_driver'
+
+        driver = GrowingPageDriver()
+        driver.switch_page('page_growing_elements')
+        driver.selection_methods['css'] = Mock(return_value='banner')
+
+        PageGrowingElements.register_element('banner', '.banner', 'css')
+
+        self.assertEqual(driver.get_page_element('banner'), 'banner')
+
     def test_open_page_successfully(self):
 
         class PageToOpen(Page):
@@ -215,3 +262,414 @@ class BaseBrowserDriverTestCase(unittest.TestCase):
     def test_is_element_present_element_false(self):
         browser = BaseBrowserDriver()
         self.assertFalse(browser.is_element_present([]))
+
+
+class ElementCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class PageWithCachedElement(Page):
+            page_name = 'page_with_cached_element'
+
+            def get_url(self):
+                return '/cached'
+
+            @property
+            def elements_selectors(self):
+                return [
+                    ('cached', '//cached', 'xpath'),
+                    ('missing', '//missing', 'xpath'),
+                ]
+
+        class CachingDriver(BaseBrowserDriver):
+            driver_name = 'element_caching_driver'
+
+            dom_generation = 1
+
+            def open_url(self, url):
+                pass
+
+            def reload(self):
+                pass
+
+            def get_element_by_xpath(self, selector):
+                return [] if selector == '//missing' else [Mock()]
+
+            def get_dom_generation(self):
+                return self.dom_generation
+
+            @element_action
+            def click(self, element):
+                pass
+
+            @element_action
+            def mouse_over(self, element):
+                pass
+
+        self.driver = CachingDriver()
+        self.driver.open_page('page_with_cached_element')
+
+        patcher = patch.object(config, 'cache_page_elements', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_disabled_cache(self):
+        with patch.object(config, 'cache_page_elements', False):
+            self.assertIsNot(self.driver['cached'], self.driver['cached'])
+
+    def test_cached_element_is_reused(self):
+        get_element_by_xpath = Mock(return_value=[Mock()])
+        self.driver.selection_methods['xpath'] = get_element_by_xpath
+
+        self.assertIs(self.driver['cached'], self.driver['cached'])
+        get_element_by_xpath.assert_called_once_with('//cached')
+
+    def test_missing_elements_arent_cached(self):
+        get_element_by_xpath = Mock(return_value=[])
+        self.driver.selection_methods['xpath'] = get_element_by_xpath
+
+        self.driver['missing']
+        self.driver['missing']
+
+        self.assertEqual(get_element_by_xpath.call_count, 2)
+
+    def test_navigation_invalidates_cache(self):
+        for navigate in (lambda: self.driver.open_url('/other'),
+                         lambda: self.driver.open_page(
+                             'page_with_cached_element'),
+                         self.driver.reload,
+                         self.driver.invalidate_element_cache):
+            element = self.driver['cached']
+            navigate()
+            self.assertIsNot(self.driver['cached'], element)
+
+    def test_click_invalidates_cache(self):
+        element = self.driver['cached']
+        self.driver.click('cached')
+        self.assertIsNot(self.driver['cached'], element)
+
+        element = self.driver['cached']
+        self.driver.click(element)
+        self.assertIsNot(self.driver['cached'], element)
+
+    def test_other_actions_keep_cache(self):
+        element = self.driver['cached']
+        self.driver.mouse_over('cached')
+        self.assertIs(self.driver['cached'], element)
+
+    def test_dom_generation_invalidates_cache(self):
+        with patch.object(config, 'element_cache_tracks_dom', True):
+            element = self.driver['cached']
+            self.assertIs(self.driver['cached'], element)
+
+            self.driver.dom_generation += 1
+            self.assertIsNot(self.driver['cached'], element)
+
+
+class PageElementsStateTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class PageWithManyElements(Page):
+            page_name = 'page_with_many_elements'
+
+            @property
+            def elements_selectors(self):
+                return [
+                    ('title', '//h1', 'xpath'),
+                    ('search', '#search', 'css'),
+                    ('footer', 'footer', 'id'),
+                ]
+
+        class ElementsStateDriver(BaseBrowserDriver):
+            driver_name = 'elements_state_driver'
+
+        self.driver = ElementsStateDriver()
+        self.driver.switch_page('page_with_many_elements')
+        self.driver.execute_javascript = Mock()
+
+    def test_get_page_elements_state_in_one_call(self):
+        self.driver.execute_javascript.return_value = [
+            [True, True, 'Welcome', 1],
+            [False, False, None, 0],
+        ]
+
+        states = self.driver.get_page_elements_state('title', 'search')
+
+        self.assertEqual(self.driver.execute_javascript.call_count, 1)
+        script = self.driver.execute_javascript.call_args[0][0]
+        self.assertIn('[["//h1", "xpath"], ["#search", "css"]]', script)
+
+        self.assertEqual(states['title'], ElementState(True, True,
+                                                       'Welcome', 1))
+        self.assertTrue(states['title'].visible)
+        self.assertFalse(states['search'].present)
+
+    def test_get_all_page_elements_state(self):
+        self.driver.execute_javascript.return_value = [
+            [True, False, '', 1]] * 3
+
+        states = self.driver.get_page_elements_state()
+
+        self.assertEqual(sorted(states), ['footer', 'search', 'title'])
+        self.assertEqual(self.driver.execute_javascript.call_count, 1)
+
+    def test_snapshot_page_in_one_call(self):
+        self.driver.execute_javascript.return_value = [
+            'http://localhost/', 'Home', [
+                [True, True, 'Welcome', 1, None, {'class': 'big'}],
+                [True, True, '', 1, 'pyfunct', {'id': 'search'}],
+                [False, False, None, 0, None, {}],
+            ]]
+
+        snapshot = self.driver.snapshot_page()
+
+        self.assertEqual(self.driver.execute_javascript.call_count, 1)
+        script = self.driver.execute_javascript.call_args[0][0]
+        self.assertIn(PAGE_SNAPSHOT_SCRIPT.split('%s')[0], script)
+        self.assertIn('[["footer", "id"], ["#search", "css"], '
+                      '["//h1", "xpath"]]', script)
+
+        self.assertEqual(snapshot.page_name, 'page_with_many_elements')
+        self.assertEqual(snapshot.url, 'http://localhost/')
+        self.assertEqual(snapshot.text('footer'), 'Welcome')
+        self.assertEqual(snapshot['search'].value, 'pyfunct')
+        self.assertEqual(snapshot.attribute('footer', 'class'), 'big')
+        self.assertFalse(snapshot['title'].present)
+
+    def test_snapshot_unregistered_element(self):
+        with self.assertRaises(UnregisteredElementException):
+            self.driver.snapshot_page('unregistered')
+
+    def test_get_unregistered_element_state(self):
+        with self.assertRaises(UnregisteredElementException):
+            self.driver.get_page_elements_state('title', 'unregistered')
+
+        self.assertFalse(self.driver.execute_javascript.called)
+
+
+class NavigationPolicyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class NavigatedPage(Page):
+            page_name = 'navigated page'
+
+            def get_url(self):
+                return '/navigated'
+
+        class NavigationDriver(BaseBrowserDriver):
+            driver_name = 'navigation_tester'
+
+            page_url = None
+
+            @element_action
+            def fill(self, element, text):
+                pass
+
+        self.driver = NavigationDriver()
+        self.driver.open_url = Mock()
+        self.url = config.base_url + '/navigated'
+
+    def test_always_opens_url_by_default(self):
+        self.driver.page_url = self.url
+
+        self.driver.open_page('navigated page')
+
+        self.driver.open_url.assert_called_once_with(self.url)
+
+    def test_same_url_policy_reuses_loaded_page(self):
+        with patch.object(config, 'navigation_policy', 'same_url'):
+            self.driver.open_page('navigated page')
+            self.driver.page_url = self.url
+            self.driver.open_page('navigated page')
+
+        self.driver.open_url.assert_called_once_with(self.url)
+        self.assertEqual(self.driver._current_page.page_name,
+                         'navigated page')
+
+    def test_unknown_policy(self):
+        with patch.object(config, 'navigation_policy', 'sometimes'):
+            with self.assertRaises(InvalidConfigurationException):
+                self.driver.open_page('navigated page')
+
+    def test_fresh_dom_policy_reuses_unchanged_page(self):
+        self.driver.get_dom_generation = Mock(return_value='doc:0')
+
+        with patch.object(config, 'navigation_policy', 'fresh_dom'):
+            self.driver.open_page('navigated page')
+            self.driver.page_url = self.url
+            self.driver.open_page('navigated page')
+
+        self.driver.open_url.assert_called_once_with(self.url)
+
+    def test_fresh_dom_policy_reloads_changed_page(self):
+        self.driver.get_dom_generation = Mock(return_value='doc:0')
+        self.driver.reload = Mock()
+
+        with patch.object(config, 'navigation_policy', 'fresh_dom'):
+            self.driver.open_page('navigated page')
+            self.driver.page_url = self.url
+            self.driver.get_dom_generation.return_value = 'doc:3'
+            self.driver.open_page('navigated page')
+
+        self.driver.open_url.assert_called_once_with(self.url)
+        self.driver.reload.assert_called_once_with()
+
+    def test_fresh_dom_policy_reloads_page_after_element_actions(self):
+        self.driver.get_dom_generation = Mock(return_value='doc:0')
+        self.driver.reload = Mock()
+        self.driver.get_page_element = Mock(return_value=Mock())
+
+        with patch.object(config, 'navigation_policy', 'fresh_dom'):
+            self.driver.open_page('navigated page')
+            self.driver.page_url = self.url
+            # Typed values aren't DOM mutations, so the generation is kept.
+            self.driver.fill('query', 'pyfunct')
+            self.driver.open_page('navigated page')
+
+        self.driver.open_url.assert_called_once_with(self.url)
+        self.driver.reload.assert_called_once_with()
+
+    def test_fresh_dom_policy_loads_page_after_session_changes(self):
+        class SessionDriver(BaseBrowserDriver):
+            driver_name = 'session_navigation_tester'
+
+            page_url = None
+
+            def clear_session(self):
+                pass
+
+        driver = SessionDriver()
+        driver.open_url = Mock()
+        driver.get_dom_generation = Mock(return_value='doc:0')
+
+        with patch.object(config, 'navigation_policy', 'fresh_dom'):
+            driver.open_page('navigated page')
+            driver.page_url = self.url
+            driver.clear_session()
+            driver.open_page('navigated page')
+
+        self.assertEqual(driver.open_url.call_count, 2)
+
+    def test_fresh_dom_policy_needs_dom_generation(self):
+        with patch.object(config, 'navigation_policy', 'fresh_dom'):
+            self.driver.open_page('navigated page')
+            self.driver.page_url = self.url
+            self.driver.open_page('navigated page')
+
+        self.assertEqual(self.driver.open_url.call_count, 2)
+
+
+class RetryElementActionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class RetriedPage(Page):
+            page_name = 'retried page'
+
+            def get_url(self):
+                return '/retried'
+
+            @property
+            def elements_selectors(self):
+                return [('submit', '//button')]
+
+        class StaleElementError(Exception):
+            pass
+
+        class RetryingDriver(BaseBrowserDriver):
+            driver_name = 'retrying_driver'
+
+            retryable_exceptions = (StaleElementError, )
+
+            @element_action
+            def click(self, element):
+                return element.click()
+
+            @element_action
+            def type(self, element, text):
+                return element.type(text)
+
+        self.stale_error = StaleElementError
+        self.driver = RetryingDriver()
+        self.driver.switch_page('retried page')
+        self.driver.wait = Mock()
+        self.find_by_xpath = self.driver.selection_methods['xpath'] = Mock()
+        self.element = Mock()
+
+    def test_missing_elements_arent_retried_by_default(self):
+        self.find_by_xpath.side_effect = [[], self.element]
+
+        with self.assertRaises(ActionNotPerformableException):
+            self.driver.click('submit')
+
+        self.assertFalse(self.driver.wait.called)
+
+    def test_action_is_retried_until_element_shows_up(self):
+        self.find_by_xpath.side_effect = [[], [], self.element]
+
+        with patch.object(config, 'element_action_attempts', 3), \
+                patch.object(config, 'element_action_interval', 0.1), \
+                patch.object(config, 'element_action_backoff', 2):
+            self.driver.click('submit')
+
+        self.element.click.assert_called_once_with()
+        self.assertEqual([call[0][0] for call in
+                          self.driver.wait.call_args_list], [0.1, 0.2])
+        self.assertEqual(self.driver.retry_counts[('click', 'submit')], 2)
+
+    def test_stale_elements_are_retried(self):
+        self.find_by_xpath.return_value = self.element
+        self.element.click.side_effect = [self.stale_error, 'clicked']
+
+        with patch.object(config, 'element_action_attempts', 2):
+            self.assertEqual(self.driver.click('submit'), 'clicked')
+
+    def test_last_attempt_raises(self):
+        self.find_by_xpath.return_value = self.element
+        self.element.click.side_effect = self.stale_error
+
+        with patch.object(config, 'element_action_attempts', 3):
+            with self.assertRaises(self.stale_error):
+                self.driver.click('submit')
+
+        self.assertEqual(self.element.click.call_count, 3)
+
+    def test_other_exceptions_arent_retried(self):
+        self.find_by_xpath.return_value = self.element
+        self.element.click.side_effect = ValueError
+
+        with patch.object(config, 'element_action_attempts', 3):
+            with self.assertRaises(ValueError):
+                self.driver.click('submit')
+
+        self.assertEqual(self.element.click.call_count, 1)
+
+    def test_non_idempotent_actions_only_retry_lookups(self):
+        self.find_by_xpath.side_effect = [[], self.element]
+        self.element.type.side_effect = self.stale_error
+
+        with patch.object(config, 'element_action_attempts', 3):
+            with self.assertRaises(self.stale_error):
+                self.driver.type('submit', 'pyfunct')
+
+        self.element.type.assert_called_once_with('pyfunct')
+        self.assertEqual(self.driver.retry_counts[('type', 'submit')], 1)
+
+    def test_attempts_must_be_positive(self):
+        self.find_by_xpath.return_value = self.element
+
+        with patch.object(config, 'element_action_attempts', 0):
+            with self.assertRaises(InvalidConfigurationException):
+                self.driver.click('submit')
+
+        self.assertFalse(self.element.click.called)
+
+    def test_retries_are_reported(self):
+        self.find_by_xpath.side_effect = [[], self.element]
+        reporter = Mock()
+
+        with patch.object(config, 'element_action_attempts', 2), \
+                patch('pyfunct.browsers.get_reporter',
+                      return_value=reporter):
+            self.driver.click('submit')
+
+        reporter.report_retry.assert_called_once_with(
+            'retrying_driver', 'click', 'submit')
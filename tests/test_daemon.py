@@ -0,0 +1,211 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from mock import patch
+
+from pyfunct import config
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.daemon import (
+    BrowserDaemon,
+    DaemonClient,
+    default_socket_path,
+    main)
+from pyfunct.exceptions import BrowserDaemonException
+
+
+class DaemonTestBrowserDriver(BaseBrowserDriver):
+    """
+        Browser Driver used for testing the daemon, without opening browsers.
+    """
+
+    driver_name = 'daemon_testing_browser'
+
+    launched = 0
+
+    def __init__(self):
+        super(DaemonTestBrowserDriver, self).__init__()
+        DaemonTestBrowserDriver.launched += 1
+        self.session_id = 'session-%d' % DaemonTestBrowserDriver.launched
+        self.launch_settings = (config.default_browser,
+                                config.launch_profile)
+        self.crashed = False
+        self.quitted = False
+        self.cleared = 0
+
+    @property
+    def page_url(self):
+        if self.crashed:
+            raise IOError('Connection refused')
+        return 'about:blank'
+
+    def open_url(self, url):
+        pass
+
+    def clear_session(self):
+        self.cleared += 1
+
+    def get_webdriver_session(self):
+        return {'session_id': self.session_id,
+                'executor_url': 'http://127.0.0.1:4444', 'w3c': True}
+
+    def quit(self):
+        self.quitted = True
+
+
+class BrowserDaemonTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.socket_path = os.path.join(self.directory, 'daemon.sock')
+
+        self.daemon = BrowserDaemon(self.socket_path, size=1,
+                                    driver_name='daemon_testing_browser')
+        thread = threading.Thread(target=self.daemon.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.stop_daemon)
+
+        while not os.path.exists(self.socket_path):
+            time.sleep(0.01)
+
+    def stop_daemon(self):
+        client = DaemonClient(self.socket_path)
+        client.request('shutdown')
+        client.close()
+
+    def connect(self):
+        client = DaemonClient(self.socket_path)
+        self.addCleanup(client.close)
+        return client
+
+    def wait_for_idle(self, client, idle):
+        for _ in range(100):
+            if client.request('status')['idle'] == idle:
+                return
+            time.sleep(0.01)
+        self.fail('The browser was not checked in')
+
+    def test_checked_out_browser_is_returned_on_disconnect(self):
+        client = DaemonClient(self.socket_path)
+        session = client.request('checkout')
+
+        status_client = self.connect()
+        self.assertEqual(status_client.request('status'),
+                         {'idle': 0, 'checked_out': 1})
+
+        client.close()
+        self.wait_for_idle(status_client, 1)
+
+        session_again = self.connect().request('checkout')
+        self.assertEqual(session_again['session_id'], session['session_id'])
+
+    def test_crashed_browsers_are_replaced(self):
+        client = self.connect()
+        session = client.request('checkout')
+        browser = self.daemon.pool._pooled.keys()[0]
+        client.close()
+        self.wait_for_idle(self.connect(), 1)
+
+        browser.crashed = True
+        new_session = self.connect().request('checkout')
+
+        self.assertTrue(browser.quitted)
+        self.assertNotEqual(new_session['session_id'], session['session_id'])
+
+    def test_socket_is_private(self):
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+    def test_second_daemon_refuses_to_start(self):
+        daemon = BrowserDaemon(self.socket_path, size=1,
+                               driver_name='daemon_testing_browser')
+
+        with self.assertRaises(BrowserDaemonException):
+            daemon.serve_forever()
+
+        self.assertEqual(self.connect().request('status')['idle'], 1)
+        self.assertEqual(daemon.pool.idle_count('daemon_testing_browser'), 0)
+
+    def test_unknown_command(self):
+        with self.assertRaises(BrowserDaemonException):
+            self.connect().request('launch_missiles')
+
+
+class DaemonClientTestCase(unittest.TestCase):
+
+    def test_default_socket_is_in_a_user_directory(self):
+        with patch('pyfunct.daemon.config') as config:
+            config.daemon_socket = None
+            path = default_socket_path()
+
+        self.assertEqual(os.path.basename(os.path.dirname(path)),
+                         'pyfunct-%d' % os.getuid())
+
+    def test_daemon_not_running(self):
+        with self.assertRaises(BrowserDaemonException):
+            DaemonClient('/nonexistent/pyfunct-daemon.sock')
+
+    @patch('sys.stderr')
+    def test_status_without_daemon(self, stderr):
+        self.assertEqual(
+            main(['--status', '--socket', '/nonexistent/daemon.sock']), 1)
+
+
+class DaemonMainTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        for name in ('default_browser', 'launch_profile'):
+            patcher = patch.object(config, name, getattr(config, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def launch_settings(self, *argv):
+        """
+            Runs the daemon command, launching its browsers without serving
+            them, and returns the settings the browser was launched with.
+        """
+        daemons = []
+
+        def warm(daemon):
+            daemons.append(daemon)
+            daemon.pool.warm(daemon.driver_name)
+
+        argv = argv + ('--driver', 'daemon_testing_browser',
+                       '--socket', os.path.join(self.directory, 'sock'))
+        with patch.object(BrowserDaemon, 'serve_forever', autospec=True,
+                          side_effect=warm):
+            self.assertEqual(main(list(argv)), 0)
+
+        pool = daemons[0].pool
+        self.addCleanup(pool.close)
+        browser = pool.checkout('daemon_testing_browser')
+        return browser.launch_settings
+
+    def test_browser_and_launch_profile(self):
+        self.assertEqual(
+            self.launch_settings('--browser', 'chrome',
+                                 '--launch-profile', 'ci'),
+            ('chrome', 'ci'))
+
+    def test_config_module(self):
+        with open(os.path.join(self.directory,
+                               'daemon_project_config.py'), 'w') as module:
+            module.write('from pyfunct import BaseConfig\n\n\n'
+                         'class DaemonProjectConfig(BaseConfig):\n'
+                         '    default_browser = "chrome"\n'
+                         '    launch_profile = "headless"\n')
+        sys.path.insert(0, self.directory)
+        self.addCleanup(sys.path.remove, self.directory)
+        self.addCleanup(sys.modules.pop, 'daemon_project_config', None)
+
+        self.assertEqual(
+            self.launch_settings('--config', 'daemon_project_config'),
+            ('chrome', 'headless'))
@@ -0,0 +1,129 @@
+import threading
+import unittest
+
+from pyfunct import action
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.exceptions import FanOutException
+from pyfunct.fanout import Barrier, BrokenBarrierError, BrowserGroup
+
+
+class FanOutDriver(BaseBrowserDriver):
+
+    driver_name = 'fan_out_driver'
+
+    def __init__(self, name):
+        super(FanOutDriver, self).__init__()
+        self.name = name
+
+
+@action
+def fan_out_greeting(browser, greeting):
+    return '%s, %s' % (greeting, browser.name)
+
+
+class BrowserGroupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.browsers = [FanOutDriver(name) for name in ('ann', 'bob', 'cy')]
+        self.group = BrowserGroup(self.browsers, barrier_timeout=5)
+        self.addCleanup(self.group.close)
+
+    def test_run_action_by_name(self):
+        results = self.group.run('fan_out_greeting', 'Hi')
+
+        self.assertEqual(results.values, ['Hi, ann', 'Hi, bob', 'Hi, cy'])
+        self.assertEqual([result.browser for result in results],
+                         self.browsers)
+
+    def test_map(self):
+        results = self.group.map(lambda browser, user: (browser.name, user),
+                                 ['admin', 'editor', 'reader'])
+
+        self.assertEqual(results.values, [('ann', 'admin'),
+                                          ('bob', 'editor'),
+                                          ('cy', 'reader')])
+
+        with self.assertRaises(ValueError):
+            self.group.map(lambda browser, user: None, ['admin'])
+
+    def test_browsers_run_in_parallel_threads_with_barrier(self):
+        events = []
+        lock = threading.Lock()
+
+        def step(browser):
+            with lock:
+                events.append(('before', browser.name))
+            self.group.wait()
+            with lock:
+                events.append(('after', browser.name))
+            return threading.current_thread().name
+
+        threads = self.group.run(step).values
+
+        self.assertEqual(len(set(threads)), 3)
+        self.assertEqual([event for event, name in events],
+                         ['before'] * 3 + ['after'] * 3)
+
+    def test_failures_are_collected_per_browser(self):
+        def step(browser):
+            if browser.name == 'bob':
+                raise KeyError('bob')
+            self.group.wait()
+            return browser.name
+
+        with self.assertRaises(FanOutException) as context:
+            self.group.run(step)
+
+        results = context.exception.results
+        self.assertEqual(len(results.failures), 3)
+        self.assertIsInstance(results[1].exception, KeyError)
+        self.assertIsInstance(results[0].exception, BrokenBarrierError)
+        self.assertIn('KeyError', str(context.exception))
+
+    def test_failures_without_raising(self):
+        group = BrowserGroup(self.browsers, raise_errors=False)
+        self.addCleanup(group.close)
+
+        results = group.run(lambda browser: 1 / len(browser.name[3:]))
+
+        self.assertEqual(len(results.failures), 3)
+        self.assertEqual(results.values, [None, None, None])
+
+    def test_wait_outside_a_step(self):
+        with self.assertRaises(RuntimeError):
+            self.group.wait()
+
+        self.group.run(lambda browser: browser.name)
+
+        with self.assertRaises(RuntimeError):
+            self.group.wait()
+
+
+class BarrierTestCase(unittest.TestCase):
+
+    def test_timeout_breaks_the_barrier(self):
+        barrier = Barrier(2)
+
+        with self.assertRaises(BrokenBarrierError):
+            barrier.wait(timeout=0.01)
+        self.assertTrue(barrier.broken)
+
+        with self.assertRaises(BrokenBarrierError):
+            barrier.wait()
+
+    def test_barrier_is_reusable(self):
+        barrier = Barrier(2, timeout=5)
+        passed = []
+
+        def wait_twice():
+            barrier.wait()
+            barrier.wait()
+            passed.append(True)
+
+        thread = threading.Thread(target=wait_twice)
+        thread.start()
+        barrier.wait()
+        barrier.wait()
+        thread.join()
+
+        self.assertEqual(passed, [True])
@@ -0,0 +1,99 @@
+import unittest
+
+from pyfunct import Page
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.instrumentation import (
+    CALL_LISTENERS,
+    CallStatistics,
+    LatencyHistogram,
+    add_call_listener,
+    remove_call_listener)
+
+
+class InstrumentedPage(Page):
+    page_name = 'instrumented page'
+
+    @property
+    def elements_selectors(self):
+        return [('search button', '//button', 'xpath')]
+
+
+class InstrumentedDriver(BaseBrowserDriver):
+
+    driver_name = 'instrumented_driver'
+
+    def get_element_by_xpath(self, selector):
+        return ['element']
+
+    def click(self, element):
+        if isinstance(element, str):
+            element = self.get_page_element(element)
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = InstrumentedDriver()
+        self.driver.switch_page('instrumented page')
+        self.records = []
+        add_call_listener(self.records.append)
+        self.addCleanup(remove_call_listener, self.records.append)
+
+    def test_nested_calls_are_recorded_with_alias_and_page(self):
+        self.driver.click('search button')
+
+        self.assertEqual(
+            [(record.method, record.alias, record.depth)
+             for record in self.records],
+            [('get_element_by_xpath', 'search button', 2),
+             ('get_page_element', 'search button', 1),
+             ('click', 'search button', 0)])
+
+        for record in self.records:
+            self.assertEqual(record.driver, 'instrumented_driver')
+            self.assertEqual(record.page, 'instrumented page')
+            self.assertGreaterEqual(record.duration, 0)
+
+    def test_calls_arent_timed_without_listeners(self):
+        remove_call_listener(self.records.append)
+        self.addCleanup(add_call_listener, self.records.append)
+
+        self.driver.click('search button')
+
+        self.assertEqual(CALL_LISTENERS, [])
+        self.assertEqual(self.records, [])
+
+    def test_call_statistics(self):
+        stats = CallStatistics()
+        add_call_listener(stats)
+        self.addCleanup(remove_call_listener, stats)
+
+        self.driver.click('search button')
+        self.driver.click('search button')
+        self.driver.get_element_by_xpath('//a')
+
+        self.assertEqual(stats.by_method['get_element_by_xpath'].count, 3)
+        self.assertEqual(stats.by_method['click'].count, 2)
+        self.assertEqual(stats.by_page['instrumented page'].count, 3)
+        self.assertEqual(
+            stats.by_element[('instrumented page', 'search button')].count, 2)
+        self.assertEqual(len(stats.slowest(2)), 2)
+
+        data = stats.as_dict()
+        self.assertEqual(data['elements'][0]['alias'], 'search button')
+        self.assertEqual(data['methods']['click']['count'], 2)
+
+
+class LatencyHistogramTestCase(unittest.TestCase):
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for duration in [0.002] * 90 + [0.3] * 9 + [42]:
+            histogram.add(duration)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.max, 42)
+        self.assertEqual(histogram.percentile(50), 0.0025)
+        self.assertEqual(histogram.percentile(95), 0.5)
+        self.assertEqual(histogram.percentile(100), 42)
+        self.assertAlmostEqual(histogram.mean, (0.18 + 2.7 + 42) / 100)
@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from pyfunct import config
+from pyfunct.ordering import (
+    PageLocalityTestLoader,
+    RecordedTest,
+    load_test_history,
+    order_by_page_locality)
+
+
+def build_test_cases():
+    """
+        Test cases are built here, instead of at module level, so they don't
+        get collected along with the ordering tests.
+    """
+
+    class CheckoutTestCase(unittest.TestCase):
+
+        def test_a_cart(self):
+            pass
+
+        def test_b_home(self):
+            pass
+
+        def test_c_cart_to_payment(self):
+            pass
+
+        def test_d_unknown(self):
+            pass
+
+        def test_e_payment(self):
+            pass
+
+    class SearchTestCase(unittest.TestCase):
+
+        def test_search(self):
+            pass
+
+    return CheckoutTestCase, SearchTestCase
+
+
+def test_names(suite):
+    return [test.id().split('.')[-1] for test in suite]
+
+
+class OrderByPageLocalityTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.checkout_case, self.search_case = build_test_cases()
+        prefix = self.checkout_case('test_a_cart').id().rsplit('.', 1)[0]
+        search_id = self.search_case('test_search').id()
+        self.history = {
+            prefix + '.test_a_cart': RecordedTest(['cart'], 1),
+            prefix + '.test_b_home': RecordedTest(['home'], 3),
+            prefix + '.test_c_cart_to_payment': RecordedTest(
+                ['cart', 'payment'], 2),
+            prefix + '.test_e_payment': RecordedTest(['payment'], 1),
+            search_id: RecordedTest(['home', 'results'], 1),
+        }
+
+    def test_tests_starting_on_the_same_page_run_together(self):
+        suite = unittest.TestLoader().loadTestsFromTestCase(
+            self.checkout_case)
+
+        ordered = order_by_page_locality(suite, self.history)
+
+        self.assertEqual(test_names(ordered), [
+            'test_a_cart', 'test_c_cart_to_payment', 'test_e_payment',
+            'test_b_home', 'test_d_unknown'])
+
+    def test_classes_are_kept_together(self):
+        loader = unittest.TestLoader()
+        suite = unittest.TestSuite([
+            loader.loadTestsFromTestCase(self.search_case),
+            loader.loadTestsFromTestCase(self.checkout_case),
+        ])
+
+        ordered = list(order_by_page_locality(suite, self.history))
+
+        classes = [test.__class__ for test in ordered]
+        self.assertEqual(classes, sorted(classes, key=classes.index))
+        self.assertEqual(len(ordered), 6)
+
+    def test_order_is_kept_without_history(self):
+        suite = unittest.TestLoader().loadTestsFromTestCase(
+            self.checkout_case)
+
+        ordered = order_by_page_locality(suite, {})
+
+        self.assertEqual(test_names(ordered), test_names(suite))
+
+
+class LoadTestHistoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'report.jsonl')
+
+    def test_latest_test_records_are_kept(self):
+        records = [
+            {'type': 'test', 'test': 'a', 'pages': ['home'], 'duration': 1},
+            {'type': 'call', 'test': 'a', 'method': 'click'},
+            {'type': 'test', 'test': 'a', 'pages': ['cart'], 'duration': 2},
+        ]
+        with open(self.path, 'w') as report:
+            for record in records:
+                report.write(json.dumps(record) + '\n')
+            report.write('{"type": "te')
+
+        self.assertEqual(load_test_history(self.path),
+                         {'a': RecordedTest(['cart'], 2)})
+
+    def test_missing_report(self):
+        self.assertEqual(load_test_history(self.path), {})
+
+    def test_loader_reads_report_path_by_default(self):
+        checkout_case, _ = build_test_cases()
+        test_id = checkout_case('test_e_payment').id()
+        with open(self.path, 'w') as report:
+            report.write(json.dumps({'type': 'test', 'test': test_id,
+                                     'pages': ['payment'],
+                                     'duration': 1}) + '\n')
+
+        with patch.object(config, 'report_path', self.path):
+            names = test_names(PageLocalityTestLoader().loadTestsFromTestCase(
+                checkout_case))
+
+        self.assertEqual(names[0], 'test_e_payment')
@@ -1,9 +1,17 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
 import unittest
 
-from pyfunct.pages import Page, REGISTERED_PAGES
+from mock import patch
+
+from pyfunct import config
+from pyfunct.pages import Page, REGISTERED_PAGES, selector_to_xpath
 
 from pyfunct.exceptions import SelectorTypeNotSupportedException, \
-     ExistentElementException
+     ExistentElementException, InvalidSelectorException
 
 
 class PagesTestCase(unittest.TestCase):
@@ -119,3 +127,172 @@ class PagesTestCase(unittest.TestCase):
               ('element-one', 'selector'),
               ('element-one', 'selector')
             ]
+
+
+class SelectorIndexTestCase(unittest.TestCase):
+
+    def test_selectors_are_compiled(self):
+        class CompiledPage(Page):
+            page_name = 'compiled_page'
+
+            @property
+            def elements_selectors(self):
+                return [
+                    ('title', '//h1', 'xpath'),
+                    ('search', 'form.search', 'css'),
+                    ('query', 'q', 'name'),
+                    ('rows', 'tr', 'tag'),
+                ]
+
+        index = REGISTERED_PAGES['compiled_page'].selector_index
+
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index['title'].xpath, '//h1')
+        self.assertIn("@class", index['search'].xpath)
+        self.assertIsNone(index['query'].xpath)
+        self.assertEqual(index['rows'].selector, 'tr')
+        self.assertEqual(index.selection_types,
+                         frozenset(['xpath', 'css', 'name', 'tag']))
+
+    def test_css_translation_is_cached(self):
+        self.assertIs(selector_to_xpath('div > p.cached', 'css'),
+                      selector_to_xpath('div > p.cached', 'css'))
+
+    def test_invalid_xpath_fails_at_page_creation(self):
+        with self.assertRaises(InvalidSelectorException):
+            class PageWithInvalidXpath(Page):
+                page_name = 'page_with_invalid_xpath'
+
+                @property
+                def elements_selectors(self):
+                    return [('broken', '//div[@id=', 'xpath')]
+
+    def test_invalid_css_fails_at_page_creation(self):
+        with self.assertRaises(InvalidSelectorException):
+            class PageWithInvalidCss(Page):
+                page_name = 'page_with_invalid_css'
+
+                @property
+                def elements_selectors(self):
+                    return [('broken', 'div[', 'css')]
+
+    def test_elements_registered_later_are_compiled(self):
+        class GrowingPage(Page):
+            page_name = 'growing_page'
+
+            @property
+            def elements_selectors(self):
+                return [('title', '//h1', 'xpath')]
+
+        GrowingPage.register_element('query', 'q', 'name')
+
+        self.assertEqual(sorted(GrowingPage.selector_index),
+                         ['query', 'title'])
+        self.assertEqual(GrowingPage.selector_index['query'].selector, 'q')
+        self.assertEqual(GrowingPage.selector_index.selection_types,
+                         frozenset(['name', 'xpath']))
+
+
+MANIFEST_PAGE_MODULE = """
+from pyfunct import Page
+
+class ManifestPage(Page):
+    page_name = 'manifest page'
+
+    @property
+    def elements_selectors(self):
+        return [('title', '//h1', 'xpath')]
+"""
+
+
+class LazyRegistrationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(config, 'lazy_page_registration', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_page_is_created_on_first_use(self):
+        created = []
+
+        class LazyPage(Page):
+            page_name = 'lazy page'
+
+            @property
+            def elements_selectors(self):
+                created.append(self)
+                return [('title', '//h1', 'xpath')]
+
+        self.assertEqual(created, [])
+        self.assertIn('lazy page', REGISTERED_PAGES)
+        self.assertNotIn('selector_index', vars(LazyPage))
+
+        page = REGISTERED_PAGES['lazy page']
+
+        self.assertEqual(created, [page])
+        self.assertIsInstance(page, LazyPage)
+        self.assertEqual(page.selector_index['title'].selector, '//h1')
+        self.assertIs(REGISTERED_PAGES['lazy page'], page)
+
+    def test_lazy_parent_is_created_first(self):
+
+        class LazyParentPage(Page):
+            page_name = 'lazy parent page'
+
+            @property
+            def elements_selectors(self):
+                return [('header', '//header', 'xpath')]
+
+        class LazyChildPage(LazyParentPage):
+            page_name = 'lazy child page'
+
+            @property
+            def elements_selectors(self):
+                return [('footer', '//footer', 'xpath')]
+
+        child = REGISTERED_PAGES['lazy child page']
+
+        self.assertEqual(sorted(child.selector_index),
+                         ['footer', 'header'])
+        self.assertIsInstance(REGISTERED_PAGES['lazy parent page'],
+                              LazyParentPage)
+
+    def test_invalid_lazy_page_fails_on_first_use(self):
+
+        class LazyInvalidPage(Page):
+            page_name = 'lazy invalid page'
+
+            @property
+            def elements_selectors(self):
+                return [('broken', '//div[', 'xpath')]
+
+        with self.assertRaises(InvalidSelectorException):
+            REGISTERED_PAGES['lazy invalid page']
+
+    def test_missing_page(self):
+        with self.assertRaises(KeyError):
+            REGISTERED_PAGES['page that was never registered']
+        self.assertIsNone(REGISTERED_PAGES.get('page that was never '
+                                               'registered'))
+
+    def test_manifest_imports_page_modules_on_demand(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'manifest_pages.py'), 'w') as f:
+            f.write(MANIFEST_PAGE_MODULE)
+        manifest_path = os.path.join(directory, 'pages.json')
+        with open(manifest_path, 'w') as f:
+            json.dump({'manifest page': 'manifest_pages'}, f)
+
+        sys.path.insert(0, directory)
+        self.addCleanup(sys.path.remove, directory)
+        self.addCleanup(sys.modules.pop, 'manifest_pages', None)
+
+        with patch.object(config, 'page_manifest', manifest_path):
+            self.assertIn('manifest page', REGISTERED_PAGES.page_names())
+            self.assertNotIn('manifest_pages', sys.modules)
+
+            page = REGISTERED_PAGES['manifest page']
+
+        self.assertIn('manifest_pages', sys.modules)
+        self.assertEqual(page.selector_index['title'].selector, '//h1')
@@ -0,0 +1,121 @@
+import unittest
+
+from mock import patch
+
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.pool import BrowserPool
+
+
+class PoolTestBrowserDriver(BaseBrowserDriver):
+    """
+        Browser Driver used for testing the pool, counting its launches.
+    """
+
+    driver_name = 'pool_testing_browser'
+
+    launch_count = 0
+
+    def __init__(self):
+        super(PoolTestBrowserDriver, self).__init__()
+        PoolTestBrowserDriver.launch_count += 1
+        self.quit_call_count = 0
+        self.clear_session_call_count = 0
+
+    def quit(self):
+        self.quit_call_count += 1
+
+    def clear_session(self):
+        self.clear_session_call_count += 1
+
+
+class BrowserPoolTestCase(unittest.TestCase):
+
+    driver_name = 'pool_testing_browser'
+
+    def setUp(self):
+        PoolTestBrowserDriver.launch_count = 0
+
+    def test_warm_launches_browsers_up_to_size(self):
+        pool = BrowserPool(size=2)
+
+        pool.warm(self.driver_name)
+        pool.warm(self.driver_name)
+
+        self.assertEqual(PoolTestBrowserDriver.launch_count, 2)
+
+    def test_checkout_uses_warm_browser(self):
+        pool = BrowserPool(size=1)
+        pool.warm(self.driver_name)
+
+        browser = pool.checkout(self.driver_name)
+
+        self.assertIsInstance(browser, PoolTestBrowserDriver)
+        self.assertEqual(PoolTestBrowserDriver.launch_count, 1)
+        self.assertTrue(pool.owns(browser))
+
+    def test_checkout_launches_when_no_idle_browser(self):
+        pool = BrowserPool(size=1)
+
+        first = pool.checkout(self.driver_name)
+        second = pool.checkout(self.driver_name)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(PoolTestBrowserDriver.launch_count, 2)
+
+    def test_checkin_clears_session_and_reuses_browser(self):
+        pool = BrowserPool(size=1)
+
+        browser = pool.checkout(self.driver_name)
+        pool.checkin(browser)
+
+        self.assertEqual(browser.clear_session_call_count, 1)
+        self.assertEqual(browser.quit_call_count, 0)
+        self.assertIs(pool.checkout(self.driver_name), browser)
+
+    def test_browser_cant_be_checked_in_twice(self):
+        pool = BrowserPool(size=1)
+
+        browser = pool.checkout(self.driver_name)
+        pool.checkin(browser)
+
+        with self.assertRaises(ValueError):
+            pool.checkin(browser)
+        self.assertEqual(pool.idle_count(self.driver_name), 1)
+
+    def test_browser_is_recycled_after_max_uses(self):
+        pool = BrowserPool(size=1, max_uses=2)
+
+        browser = pool.checkout(self.driver_name)
+        pool.checkin(browser)
+        self.assertIs(pool.checkout(self.driver_name), browser)
+        pool.checkin(browser)
+
+        self.assertEqual(browser.quit_call_count, 1)
+        self.assertFalse(pool.owns(browser))
+        self.assertIsNot(pool.checkout(self.driver_name), browser)
+
+    @patch('pyfunct.pool.time')
+    def test_idle_browser_is_recycled_after_max_age(self, mocked_time):
+        mocked_time.time.return_value = 100
+        pool = BrowserPool(size=1, max_age=60)
+
+        browser = pool.checkout(self.driver_name)
+        pool.checkin(browser)
+
+        mocked_time.time.return_value = 160
+
+        self.assertIsNot(pool.checkout(self.driver_name), browser)
+        self.assertEqual(browser.quit_call_count, 1)
+
+    def test_close_quits_all_browsers(self):
+        pool = BrowserPool(size=1)
+        pool.warm(self.driver_name)
+        checked_out = pool.checkout(self.driver_name)
+        idle = pool.checkout(self.driver_name)
+        pool.checkin(idle)
+
+        pool.close()
+
+        self.assertEqual(checked_out.quit_call_count, 1)
+        self.assertEqual(idle.quit_call_count, 1)
+        self.assertFalse(pool.owns(checked_out))
@@ -0,0 +1,179 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from pyfunct import FunctTestCase, Page, config
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.instrumentation import CALL_LISTENERS, CallRecord
+from pyfunct.reporting import JSONLReporter, OutcomeRecorder, get_reporter
+
+
+class ReportedPage(Page):
+    page_name = 'reported page'
+
+    def get_url(self):
+        return '/reported'
+
+
+class ReportingDriver(BaseBrowserDriver):
+
+    driver_name = 'reporting_driver'
+
+    def open_url(self, url):
+        pass
+
+    def wait_pageload(self, timeout=30):
+        pass
+
+    def clear_session(self):
+        pass
+
+    def close(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+class ReportedTestCase(FunctTestCase):
+
+    def opens_page(self):
+        self.browser.open_page('reported page')
+        self.browser.wait_pageload()
+
+    def fails(self):
+        self.fail('Failed on purpose')
+
+
+def read_records(path):
+    with open(path) as report:
+        return [json.loads(line) for line in report]
+
+
+class JSONLReporterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'report.jsonl')
+
+    def test_records_are_written_on_close(self):
+        reporter = JSONLReporter(self.path, flush_interval=0.01)
+        self.assertIn(reporter, CALL_LISTENERS)
+
+        reporter.start_test('tests.Test.test_one')
+        reporter(CallRecord('splinter', 'open_page', 'index', None, 0.5, 0))
+        reporter(CallRecord('splinter', 'open_url', 'index', None, 0.4, 1))
+        reporter(CallRecord('splinter', 'wait_for', 'index', None, 0.25, 0))
+        reporter.stop_test('success')
+        reporter.close()
+
+        self.assertNotIn(reporter, CALL_LISTENERS)
+        records = read_records(self.path)
+        self.assertEqual([record['type'] for record in records],
+                         ['call', 'call', 'call', 'test'])
+        self.assertEqual(records[2]['kind'], 'wait')
+        self.assertEqual(records[0]['test'], 'tests.Test.test_one')
+
+        test_record = records[-1]
+        self.assertEqual(test_record['outcome'], 'success')
+        self.assertEqual(test_record['pages'], ['index'])
+        self.assertEqual(test_record['drivers'], ['splinter'])
+        self.assertEqual(test_record['action_time'], 0.5)
+        self.assertEqual(test_record['wait_time'], 0.25)
+        self.assertEqual(test_record['calls'], 3)
+
+    def test_nested_waits_count_as_wait_time(self):
+        reporter = JSONLReporter(self.path, flush_interval=0.01)
+
+        reporter.start_test('tests.Test.test_one')
+        reporter(CallRecord('splinter', 'click', 'index', 'go', 0.25, 1))
+        reporter(CallRecord('splinter', 'wait_pageload', 'index', 'go', 1.5,
+                            1))
+        reporter(CallRecord('splinter', 'click_and_wait', 'index', 'go', 2.0,
+                            0))
+        reporter(CallRecord('splinter', 'wait', 'index', None, 0.5, 0))
+        reporter.stop_test('success')
+        reporter.close()
+
+        test_record = read_records(self.path)[-1]
+        self.assertEqual(test_record['wait_time'], 2.0)
+        self.assertEqual(test_record['action_time'], 0.5)
+
+    def test_retries_are_counted_by_test(self):
+        reporter = JSONLReporter(self.path, flush_interval=0.01)
+
+        reporter.start_test('tests.Test.test_one')
+        reporter.report_retry('splinter', 'click', 'submit')
+        reporter.report_retry('splinter', 'click', 'submit')
+        reporter.stop_test('success')
+        reporter.close()
+
+        test_record = read_records(self.path)[-1]
+        self.assertEqual(test_record['retries'], [
+            {'driver': 'splinter', 'action': 'click', 'alias': 'submit',
+             'count': 2}])
+
+    def test_launches_are_reported(self):
+        reporter = JSONLReporter(self.path, flush_interval=0.01)
+
+        reporter.start_test('tests.Test.test_one')
+        reporter.report_launch('splinter', 'chrome', 'ci', 1.5)
+        reporter.stop_test('success')
+        reporter.close()
+
+        launch, test = read_records(self.path)
+        self.assertEqual(launch['type'], 'launch')
+        self.assertEqual(launch['profile'], 'ci')
+        self.assertEqual(launch['test'], 'tests.Test.test_one')
+        self.assertEqual(test['launch_time'], 1.5)
+
+    def test_full_buffer_drops_records(self):
+        reporter = JSONLReporter(self.path, buffer_size=1)
+        reporter._closed.set()
+        reporter._writer.join()
+
+        reporter.emit({'type': 'call'})
+        reporter.emit({'type': 'call'})
+
+        self.assertEqual(reporter.dropped, 1)
+        reporter.close()
+
+    def test_function_test_cases_are_reported(self):
+        with patch.object(config, 'report_path', self.path), \
+                patch.object(config, 'default_driver_name',
+                             'reporting_driver'):
+            result = unittest.TestResult()
+            ReportedTestCase('opens_page').run(result)
+            ReportedTestCase('fails').run(result)
+            ReportedTestCase.tearDownClass()
+            get_reporter().close()
+
+        self.assertEqual(len(result.failures), 1)
+        tests = [record for record in read_records(self.path)
+                 if record['type'] == 'test']
+        self.assertEqual([(record['test'].split('.')[-1], record['outcome'])
+                          for record in tests],
+                         [('opens_page', 'success'),
+                          ('fails', 'failure')])
+        self.assertEqual(tests[0]['pages'], ['reported page'])
+        self.assertEqual(tests[0]['drivers'], ['reporting_driver'])
+
+
+class OutcomeRecorderTestCase(unittest.TestCase):
+
+    def test_keeps_first_failed_outcome(self):
+        result = unittest.TestResult()
+        recorder = OutcomeRecorder(result)
+
+        recorder.addSuccess(self)
+        recorder.addError(self, (None, None, None))
+        recorder.addFailure(self, (None, None, None))
+
+        self.assertEqual(recorder.outcome, 'error')
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(recorder.testsRun, 0)
@@ -0,0 +1,152 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from pyfunct import FunctTestCase, config
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.runner import ParallelTestRunner, shard_suite
+
+
+class RunnerTestBrowserDriver(BaseBrowserDriver):
+    """
+        Browser Driver used for testing the runner, without opening browsers.
+    """
+
+    driver_name = 'runner_testing_browser'
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def clear_session(self):
+        pass
+
+    @property
+    def page_source(self):
+        return '<html><body>Runner testing page</body></html>'
+
+
+def build_suite():
+    """
+        Test cases are built here, instead of at module level, so they don't
+        get collected along with the runner tests.
+    """
+
+    class FirstTestCase(FunctTestCase):
+
+        def test_uses_pooled_browser(self):
+            self.assertTrue(self.browser_pool.owns(self.browser))
+
+        def test_success(self):
+            pass
+
+        def test_failure(self):
+            self.fail('Failed on purpose')
+
+    class SecondTestCase(FunctTestCase):
+
+        def test_error(self):
+            raise ValueError('Raised on purpose')
+
+        @unittest.skip('Skipped on purpose')
+        def test_skip(self):
+            pass
+
+    loader = unittest.TestLoader()
+    return unittest.TestSuite([
+        loader.loadTestsFromTestCase(FirstTestCase),
+        loader.loadTestsFromTestCase(SecondTestCase),
+    ])
+
+
+class ShardSuiteTestCase(unittest.TestCase):
+
+    def test_shards_by_class_biggest_first(self):
+        shards = shard_suite(build_suite())
+
+        self.assertEqual([shard.countTestCases() for shard in shards], [3, 2])
+
+        for shard in shards:
+            self.assertEqual(len(set(test.__class__ for test in shard)), 1)
+
+    def test_empty_suite(self):
+        self.assertEqual(shard_suite(unittest.TestSuite()), [])
+
+
+class ParallelTestRunnerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        driver_patch = patch.object(config, 'default_driver_name',
+                                    'runner_testing_browser')
+        driver_patch.start()
+        self.addCleanup(driver_patch.stop)
+
+    def test_run_merges_results_from_workers(self):
+        stream = StringIO()
+        runner = ParallelTestRunner(stream=stream, processes=2,
+                                    driver_name='runner_testing_browser')
+
+        result = runner.run(build_suite())
+
+        self.assertEqual(result.testsRun, 5)
+        self.assertEqual(len(result.failures), 1)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(len(result.skipped), 1)
+        self.assertFalse(result.wasSuccessful())
+
+        failed_test, traceback = result.failures[0]
+        self.assertIn('test_failure', failed_test.id())
+        self.assertIn('Failed on purpose', traceback)
+
+        errored_test, traceback = result.errors[0]
+        self.assertIn('test_error', errored_test.id())
+        self.assertIn('ValueError', traceback)
+
+        output = stream.getvalue()
+        self.assertIn('FAILED (failures=1, errors=1)', output)
+        self.assertIn('using 2 processes', output)
+
+    def test_workers_write_their_reports(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'report.jsonl')
+        runner = ParallelTestRunner(stream=StringIO(), processes=2,
+                                    driver_name='runner_testing_browser')
+
+        with patch.object(config, 'report_path', path):
+            runner.run(build_suite())
+
+        with open(path) as report:
+            records = [json.loads(line) for line in report]
+        outcomes = sorted(record['outcome'] for record in records
+                          if record['type'] == 'test')
+        self.assertEqual(outcomes,
+                         ['error', 'failure', 'skip', 'success', 'success'])
+
+    def test_workers_write_artifacts_of_failed_tests(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        runner = ParallelTestRunner(stream=StringIO(), processes=2,
+                                    driver_name='runner_testing_browser')
+
+        with patch.object(config, 'artifacts_dir', directory):
+            runner.run(build_suite())
+
+        manifests = sorted(os.listdir(os.path.join(directory, 'tests')))
+        self.assertEqual([manifest.split('.')[-2] for manifest in manifests],
+                         ['test_failure', 'test_error'])
+        for manifest in manifests:
+            with open(os.path.join(directory, 'tests', manifest)) as fp:
+                self.assertEqual(list(json.load(fp)),
+                                 ['0-runner_testing_browser/page.html'])
@@ -0,0 +1,131 @@
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+
+from mock import Mock, patch
+
+from pyfunct import config
+from pyfunct.exceptions import InvalidConfigurationException
+from pyfunct.sessions import SessionStore, restores_session
+
+
+class SessionStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = SessionStore(self.directory, ttl=60)
+
+    def test_set_and_get(self):
+        state = {'url': 'http://localhost/', 'cookies': [{'name': 'a'}]}
+        self.store.set('login', state, result='admin')
+
+        entry = SessionStore(self.directory).get('login')
+
+        self.assertEqual(entry['state'], state)
+        self.assertEqual(entry['result'], 'admin')
+        self.assertIsNone(self.store.get('other'))
+
+    def test_expired_state(self):
+        self.store.set('login', {})
+
+        with patch('pyfunct.sessions.time.time',
+                   return_value=time.time() + 61):
+            self.assertIsNone(self.store.get('login'))
+        self.assertIsNone(self.store.get('login'))
+
+    def test_invalidate_and_clear(self):
+        self.store.set('one', {})
+        self.store.set('two', {})
+
+        self.store.invalidate('one')
+        self.assertIsNone(self.store.get('one'))
+        self.assertIsNotNone(self.store.get('two'))
+
+        self.store.clear()
+        self.assertIsNone(self.store.get('two'))
+
+    def test_defaults_from_config(self):
+        with patch.object(config, 'session_store_dir', self.directory), \
+                patch.object(config, 'session_ttl', 5):
+            store = SessionStore()
+
+        self.assertEqual(store.directory, self.directory)
+        self.assertEqual(store.ttl, 5)
+
+    def default_store(self):
+        with patch('tempfile.gettempdir', return_value=self.directory), \
+                patch.object(config, 'session_store_dir', None):
+            return SessionStore()
+
+    def test_default_directory_is_private(self):
+        store = self.default_store()
+        store.set('login', {})
+
+        user_directory = os.path.join(self.directory,
+                                      'pyfunct-%d' % os.getuid())
+        self.assertEqual(store.directory,
+                         os.path.join(user_directory, 'sessions'))
+        for directory in (user_directory, store.directory):
+            self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+        self.assertIsNotNone(store.get('login'))
+
+    def test_default_directory_of_another_user(self):
+        store = self.default_store()
+        store.set('login', {})
+
+        with patch('pyfunct.sessions.owned_by_user', return_value=False):
+            with self.assertRaises(InvalidConfigurationException):
+                store.get('login')
+            with self.assertRaises(InvalidConfigurationException):
+                store.set('login', {})
+
+    def test_configured_directory_isnt_checked(self):
+        with patch('pyfunct.sessions.owned_by_user', return_value=False):
+            self.store.set('login', {})
+            self.assertIsNotNone(self.store.get('login'))
+
+
+class RestoresSessionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.store = SessionStore(directory)
+
+        self.browser = Mock()
+        self.browser.driver_name = 'testing_browser'
+        self.browser.get_session_state.return_value = {'cookies': ['c']}
+
+    def test_action_runs_once_and_state_is_restored(self):
+        login = Mock(return_value='logged')
+        login.__name__ = 'login'
+        login = restores_session('login', store=self.store)(login)
+
+        self.assertEqual(login(self.browser), 'logged')
+        self.assertEqual(login(self.browser), 'logged')
+
+        self.assertEqual(self.browser.get_session_state.call_count, 1)
+        self.browser.restore_session_state.assert_called_once_with(
+            {'cookies': ['c']})
+
+    def test_key_function_and_driver_name(self):
+        calls = []
+
+        @restores_session(lambda user: 'login %s' % user, store=self.store)
+        def login(browser, user):
+            calls.append(user)
+
+        login(self.browser, 'admin')
+        login(self.browser, 'guest')
+        login(self.browser, 'admin')
+        self.assertEqual(calls, ['admin', 'guest'])
+
+        self.browser.driver_name = 'other_browser'
+        login(self.browser, 'admin')
+        self.assertEqual(calls, ['admin', 'guest', 'admin'])
+        self.assertIsNotNone(
+            self.store.get('testing_browser:login admin'))
@@ -0,0 +1,32 @@
+import unittest
+
+from pyfunct.snapshots import ElementSnapshot, FrozenDict, PageSnapshot
+
+
+class PageSnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot = PageSnapshot('index', 'http://localhost/', 'Home', {
+            'title': ElementSnapshot(True, True, 'Welcome', 1, None,
+                                     FrozenDict({'class': 'big'})),
+            'missing': ElementSnapshot(False, False, None, 0, None,
+                                       FrozenDict()),
+        })
+
+    def test_snapshot_is_a_mapping_of_aliases(self):
+        self.assertEqual(sorted(self.snapshot), ['missing', 'title'])
+        self.assertEqual(self.snapshot.text('title'), 'Welcome')
+        self.assertEqual(self.snapshot.attribute('title', 'class'), 'big')
+        self.assertEqual(self.snapshot.attribute('missing', 'class', ''), '')
+        with self.assertRaises(KeyError):
+            self.snapshot['unregistered']
+
+    def test_snapshot_cant_be_changed(self):
+        with self.assertRaises(AttributeError):
+            self.snapshot.url = 'http://localhost/other'
+        with self.assertRaises(AttributeError):
+            del self.snapshot.title
+        with self.assertRaises(TypeError):
+            self.snapshot['title'] = None
+        with self.assertRaises(TypeError):
+            self.snapshot['title'].attributes['class'] = 'small'
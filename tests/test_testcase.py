@@ -1,7 +1,16 @@
+import json
+import os
+import shutil
+import tempfile
 import unittest
 
-from pyfunct import FunctTestCase, BaseConfig, action
+from mock import patch
+
+from pyfunct import FunctTestCase, BaseConfig, action, config
 from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.instrumentation import CALL_LISTENERS
+from pyfunct import pool
+from pyfunct.pool import BrowserPool
 
 
 class TestBrowserDriver(BaseBrowserDriver):
@@ -58,6 +67,18 @@ class NonReuseTestCaseTester(FunctTestCase):
         pass
 
 
+class PooledTestCaseTester(FunctTestCase):
+
+    browser_pool = BrowserPool(size=1)
+
+    def runTest(self):
+        """
+            Overrides it to prevent running tests from the testcase, as it's being
+            tested.
+        """
+        pass
+
+
 class FunctTestCaseTestCase(unittest.TestCase):
 
     def tearDown(self):
@@ -193,3 +214,90 @@ class FunctTestCaseTestCase(unittest.TestCase):
 
         # assert that testcase keeps no browser
         self.assertEqual([], testcase.browsers)
+
+    def test_browsers_from_pool_are_checked_in(self):
+        testcase = PooledTestCaseTester()
+        testcase.setUp()
+
+        driver = testcase.create_browser()
+        pool = PooledTestCaseTester.browser_pool
+        self.assertTrue(pool.owns(testcase.browser))
+        self.assertTrue(pool.owns(driver))
+
+        testcase.tearDown()
+
+        # assert that the extra browser went back to the pool
+        self.assertEqual(driver.close_call_count, 0)
+        self.assertEqual(driver.clear_session_call_count, 1)
+        self.assertEqual([testcase.browser], testcase.browsers)
+
+        default_browser = testcase.browser
+        testcase.tearDownClass()
+
+        # assert that the default browser wasn't quitted, but checked in,
+        # without clearing its session again
+        self.assertEqual(default_browser.quit_call_count, 0)
+        self.assertEqual(default_browser.clear_session_call_count, 1)
+        self.assertTrue(pool.owns(default_browser))
+        self.assertEqual([], testcase.browsers)
+
+        # the pooled browsers are reused by the next test case
+        self.assertIn(PooledTestCaseTester().create_browser(),
+                      (driver, default_browser))
+
+    def test_default_pool(self):
+        with patch.object(config, 'use_browser_pool', True):
+            self.addCleanup(pool._default_pools.close)
+            default_pool = pool.get_default_pool()
+
+            testcase = TestCaseTester()
+            testcase.setUp()
+            browser = testcase.browser
+            self.assertTrue(default_pool.owns(browser))
+
+            testcase.tearDown()
+            testcase.tearDownClass()
+
+            self.assertEqual(browser.quit_call_count, 0)
+            self.assertIs(TestCaseTester().create_browser(), browser)
+
+    def test_default_pool_is_disabled_by_default(self):
+        self.assertIsNone(pool.get_default_pool())
+
+        testcase = TestCaseTester()
+        testcase.setUp()
+        browser = testcase.browser
+        testcase.tearDownClass()
+
+        self.assertEqual(browser.quit_call_count, 1)
+
+    def test_call_stats_are_dumped_per_test(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with patch.object(config, 'instrument_browser_calls', True), \
+                patch.object(config, 'call_stats_dir', directory):
+            testcase = TestCaseTester()
+            testcase.setUp()
+            testcase.browser.clear_session()
+            testcase.tearDown()
+
+        self.assertEqual(testcase.call_stats.by_method['clear_session'].count,
+                         1)
+
+        path = os.path.join(directory, '%s.json' % testcase.id())
+        with open(path) as stats_file:
+            stats = json.load(stats_file)
+        self.assertEqual(stats['test'], testcase.id())
+        self.assertEqual(stats['methods']['clear_session']['count'], 1)
+
+    def test_call_stats_stop_when_set_up_fails(self):
+        with patch.object(config, 'instrument_browser_calls', True):
+            testcase = TestCaseTester()
+            with patch.object(testcase, 'create_browser',
+                              side_effect=IOError('No browser')):
+                with self.assertRaises(IOError):
+                    testcase.setUp()
+            testcase.doCleanups()
+
+        self.assertNotIn(testcase.call_stats, CALL_LISTENERS)
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import Mock, patch
+
+from pyfunct.utils import ProcessLocal, makedirs
+
+
+class MakedirsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_creates_missing_parents(self):
+        path = os.path.join(self.directory, 'a', 'b')
+        makedirs(path)
+        self.assertTrue(os.path.isdir(path))
+
+    def test_existing_directory(self):
+        makedirs(self.directory)
+        self.assertTrue(os.path.isdir(self.directory))
+
+    def test_created_meanwhile(self):
+        path = os.path.join(self.directory, 'a')
+
+        def create(directory, mode):
+            os.mkdir(directory)
+            raise OSError('File exists')
+
+        with patch('os.makedirs', side_effect=create):
+            makedirs(path)
+        self.assertTrue(os.path.isdir(path))
+
+
+class ProcessLocalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.create = Mock(side_effect=lambda setting: Mock(name=setting))
+        self.close = Mock()
+        self.discard = Mock()
+        with patch('atexit.register'):
+            self.local = ProcessLocal(self.create, self.close, self.discard)
+
+    def test_reused_for_the_same_setting(self):
+        value = self.local.get('a')
+
+        self.assertIs(self.local.get('a'), value)
+        self.create.assert_called_once_with('a')
+
+    def test_empty_setting(self):
+        self.assertIsNone(self.local.get(None))
+        self.assertFalse(self.create.called)
+
+    def test_replaced_when_the_setting_changes(self):
+        value = self.local.get('a')
+
+        self.assertIsNot(self.local.get('b'), value)
+        self.close.assert_called_once_with(value)
+
+    def test_recreated_after_close(self):
+        value = self.local.get('a')
+        self.local.close()
+        self.local.close()
+
+        self.close.assert_called_once_with(value)
+        self.assertIsNot(self.local.get('a'), value)
+
+    def test_forked_process_gets_its_own(self):
+        value = self.local.get('a')
+
+        with patch('os.getpid', return_value=os.getpid() + 1):
+            self.local.close()
+            self.assertFalse(self.close.called)
+
+            self.assertIsNot(self.local.get('a'), value)
+        self.discard.assert_called_once_with(value)
+        self.assertFalse(self.close.called)
+
+    def test_registered_at_exit_once(self):
+        with patch('atexit.register') as register:
+            local = ProcessLocal(self.create, self.close)
+            local.get('a')
+            local.get('b')
+
+        register.assert_called_once_with(local.close)
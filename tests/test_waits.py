@@ -0,0 +1,137 @@
+import unittest
+
+from mock import Mock
+
+from pyfunct.browsers import BaseBrowserDriver
+from pyfunct.exceptions import WaitTimeoutException
+from pyfunct.waits import (
+    Condition,
+    element_present,
+    element_visible,
+    text_equals,
+    url_matches,
+    element_count,
+    backoff_intervals)
+
+
+class WaitTestBrowserDriver(BaseBrowserDriver):
+    """
+        Browser driver that doesn't sleep, recording the waits instead.
+    """
+
+    driver_name = 'wait_testing_browser'
+
+    def __init__(self):
+        super(WaitTestBrowserDriver, self).__init__()
+        self.waits = []
+        self.elements = {}
+
+    def wait(self, seconds):
+        self.waits.append(seconds)
+
+    def get_page_element(self, alias):
+        return self.elements.get(alias, [])
+
+    def is_element_visible(self, element):
+        return element[0]['visible']
+
+    def get_element_text(self, element):
+        return element[0]['text']
+
+
+class ConditionsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.browser = WaitTestBrowserDriver()
+        self.browser.elements['title'] = [{'visible': True, 'text': 'Hello'}]
+        self.browser.elements['hidden'] = [{'visible': False, 'text': ''}]
+
+    def test_element_present(self):
+        self.assertTrue(element_present('title')(self.browser))
+        self.assertFalse(element_present('missing')(self.browser))
+
+    def test_element_visible(self):
+        self.assertTrue(element_visible('title')(self.browser))
+        self.assertFalse(element_visible('hidden')(self.browser))
+        self.assertFalse(element_visible('missing')(self.browser))
+
+    def test_text_equals(self):
+        self.assertTrue(text_equals('title', 'Hello')(self.browser))
+        self.assertFalse(text_equals('title', 'Bye')(self.browser))
+        self.assertFalse(text_equals('missing', 'Hello')(self.browser))
+
+    def test_url_matches(self):
+        browser = Mock()
+        browser.page_url = 'http://localhost/article/3'
+
+        self.assertTrue(url_matches(r'/article/\d+$')(browser))
+        self.assertFalse(url_matches(r'/checkout')(browser))
+
+    def test_element_count(self):
+        self.assertTrue(element_count('title', 1)(self.browser))
+        self.assertTrue(element_count('missing', 0)(self.browser))
+        self.assertFalse(element_count('title', 2)(self.browser))
+
+    def test_combining_conditions(self):
+        present = element_present('title')
+        missing = element_present('missing')
+
+        self.assertTrue((present & ~missing)(self.browser))
+        self.assertFalse((present & missing)(self.browser))
+        self.assertTrue((missing | present)(self.browser))
+        self.assertEqual(str(present & ~missing),
+                         "(element 'title' present and "
+                         "not element 'missing' present)")
+
+    def test_backoff_intervals(self):
+        intervals = backoff_intervals(0.1, 2, 0.5)
+        self.assertEqual([next(intervals) for _ in range(5)],
+                         [0.1, 0.2, 0.4, 0.5, 0.5])
+
+
+class WaitForTestCase(unittest.TestCase):
+
+    def test_returns_condition_value_and_records_timing(self):
+        browser = WaitTestBrowserDriver()
+        results = iter([None, [], 'ready'])
+        condition = Condition(lambda browser: next(results), 'is ready')
+
+        value = browser.wait_for(condition, interval=0.1, backoff=2,
+                                 max_interval=1)
+
+        self.assertEqual(value, 'ready')
+        self.assertEqual(browser.waits, [0.1, 0.2])
+
+        timing = browser.wait_timings[-1]
+        self.assertEqual(timing.description, 'is ready')
+        self.assertEqual(timing.attempts, 3)
+        self.assertTrue(timing.satisfied)
+
+    def test_timeout(self):
+        browser = WaitTestBrowserDriver()
+        browser.wait = Mock()
+
+        with self.assertRaises(WaitTimeoutException) as context:
+            browser.wait_for(lambda browser: False, timeout=0)
+
+        self.assertFalse(context.exception.timing.satisfied)
+        self.assertEqual(context.exception.timing.attempts, 1)
+        self.assertEqual(browser.wait_timings[-1], context.exception.timing)
+        self.assertFalse(browser.wait.called)
+
+    def test_expired_deadline_checks_condition_once(self):
+        browser = WaitTestBrowserDriver()
+        condition = Mock(return_value=False)
+
+        with self.assertRaises(WaitTimeoutException):
+            browser.wait_for(condition, timeout=30, deadline=0)
+
+        condition.assert_called_once_with(browser)
+
+    def test_ignored_exceptions(self):
+        browser = WaitTestBrowserDriver()
+        condition = Mock(side_effect=[KeyError, 'ready'])
+
+        value = browser.wait_for(condition, ignored_exceptions=(KeyError, ))
+
+        self.assertEqual(value, 'ready')